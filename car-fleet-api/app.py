@@ -4,121 +4,298 @@ Car Fleet Management API - Flask Backend
 Orange DevOps Task - Python Programming Exercise
 """
 
-from flask import Flask, jsonify, send_from_directory
+import atexit
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask, g, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 
-from src import Agency, Car, CarsRentalService, RentalController
+from src import (
+    Agency,
+    Car,
+    CarsRentalService,
+    RedisCarRepository,
+    RentalController,
+    SqliteCarRepository,
+    connect_redis,
+    describe_redis,
+)
+from src.logging_config import configure_logging
+from src.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, HTTP_REQUESTS_IN_FLIGHT
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+logger = logging.getLogger(__name__)
 
 # Swagger UI configuration
 SWAGGER_URL = "/api/docs"  # URL for exposing Swagger UI
 API_URL = "/swagger.yaml"  # Our API specification file
 
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,
-    API_URL,
-    config={"app_name": "Car Fleet Management API"},
-)
-
-app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
-
-# Initialize the agency, service, and controller
-agency = Agency("Orange Car Rental")
-rental_service = CarsRentalService(agency, data_file="data/cars.json")
-rental_controller = RentalController(rental_service)
-
-# Load cars from JSON file
-success, error = rental_service.load_from_json()
-if success:
-    print(f"✓ Loaded {len(rental_service.get_all_cars())} cars from data/cars.json")
-else:
-    print(f"✗ Failed to load cars from JSON: {error}")
-    print("Using empty fleet")
-
-
-# Serve Swagger YAML file
-@app.route("/swagger.yaml")
-def swagger_spec():
-    """Serve the Swagger specification file."""
-    return send_from_directory(".", "swagger.yaml")
-
-
-# Route definitions - delegating to controller
-@app.route("/", methods=["GET"])
-def home():
-    """Home endpoint - API information."""
-    return rental_controller.get_home()
-
-
-@app.route("/api/cars", methods=["GET"])
-def get_all_cars():
-    """Get all cars in the fleet."""
-    return rental_controller.get_all_cars()
-
-
-@app.route("/api/cars/available", methods=["GET"])
-def get_available_cars():
-    """Get all available cars."""
-    return rental_controller.get_available_cars()
-
 
-@app.route("/api/cars/<registration>", methods=["GET"])
-def get_car(registration):
-    """Get details of a specific car."""
-    return rental_controller.get_car(registration)
-
-
-@app.route("/api/cars", methods=["POST"])
-def add_car():
-    """Add a new car to the fleet."""
-    return rental_controller.add_car()
-
-
-@app.route("/api/cars/<registration>/rent", methods=["PUT"])
-def rent_car(registration):
-    """Rent a car."""
-    return rental_controller.rent_car(registration)
-
-
-@app.route("/api/cars/<registration>/return", methods=["PUT"])
-def return_car(registration):
-    """Return a rented car."""
-    return rental_controller.return_car(registration)
-
-
-@app.route("/api/cars/<registration>", methods=["DELETE"])
-def delete_car(registration):
-    """Delete a car from the fleet."""
-    return rental_controller.delete_car(registration)
-
-
-@app.route("/api/stats", methods=["GET"])
-def get_stats():
-    """Get fleet statistics."""
-    return rental_controller.get_stats()
-
-
-@app.errorhandler(404)
-def not_found(error):
-    """Handle 404 errors."""
-    return jsonify({"success": False, "error": "Endpoint not found"}), 404
-
-
-@app.errorhandler(500)
-def internal_error(error):
-    """Handle 500 errors."""
-    return jsonify({"success": False, "error": "Internal server error"}), 500
+def load_settings(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read the app settings from the environment.
+
+    Args:
+        overrides (Optional[Dict[str, Any]]): Settings that win over the environment
+
+    Returns:
+        Dict[str, Any]: The settings
+    """
+    settings = {
+        "AGENCY_NAME": os.environ.get("AGENCY_NAME", "Orange Car Rental"),
+        # Storage backend: "json" (default), or "sqlite" or "redis", both seeded
+        # from the JSON file
+        "STORAGE_BACKEND": os.environ.get("STORAGE_BACKEND", "json"),
+        "DATA_FILE": "data/cars.json",
+        "SQLITE_PATH": os.environ.get("SQLITE_PATH", "data/cars.db"),
+        # redis://[[user]:password@]host[:port][/db]
+        "REDIS_URL": os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+        "REDIS_KEY_PREFIX": os.environ.get("REDIS_KEY_PREFIX", "car-fleet"),
+        "PERSISTENCE_MODE": os.environ.get("PERSISTENCE_MODE", "snapshot"),
+        "COMMIT_WINDOW_MS": float(os.environ.get("COMMIT_WINDOW_MS", "0")),
+        # Data file format written: "json" (default) or the compact "binary"
+        "SNAPSHOT_FORMAT": os.environ.get("SNAPSHOT_FORMAT", "json"),
+        # Serve binary snapshots before every car is built
+        "LAZY_LOAD": os.environ.get("LAZY_LOAD", "false").lower() in ("1", "true"),
+        # Reload the data file when another program changes it; 0 disables
+        "WATCH_INTERVAL_MS": float(os.environ.get("WATCH_INTERVAL_MS", "0")),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "INFO"),
+        "LOG_FORMAT": os.environ.get("LOG_FORMAT", "json"),
+        # False only when the server commits changes itself, as asgi.py does
+        "AUTO_COMMIT": True,
+    }
+    settings.update(overrides or {})
+    return settings
+
+
+def create_rental_service(settings: Dict[str, Any]) -> CarsRentalService:
+    """
+    Build the rental service and load the fleet from storage.
+
+    Args:
+        settings (Dict[str, Any]): Settings from load_settings
+
+    Returns:
+        CarsRentalService: The service, ready to use
+    """
+    if settings["STORAGE_BACKEND"] == "sqlite":
+        repository = SqliteCarRepository(
+            settings["SQLITE_PATH"], seed_file=settings["DATA_FILE"]
+        )
+        data_source = repository.db_file
+    elif settings["STORAGE_BACKEND"] == "redis":
+        repository = RedisCarRepository(
+            connect_redis(settings["REDIS_URL"]),
+            seed_file=settings["DATA_FILE"],
+            prefix=settings["REDIS_KEY_PREFIX"],
+        )
+        data_source = describe_redis(repository.redis)
+    else:
+        repository = None
+        data_source = settings["DATA_FILE"]
+
+    rental_service = CarsRentalService(
+        Agency(settings["AGENCY_NAME"]),
+        data_file=settings["DATA_FILE"],
+        persistence=settings["PERSISTENCE_MODE"],
+        commit_window=settings["COMMIT_WINDOW_MS"] / 1000,
+        repository=repository,
+        auto_commit=settings["AUTO_COMMIT"],
+        snapshot_format=settings["SNAPSHOT_FORMAT"],
+        lazy_load=settings["LAZY_LOAD"],
+        watch_interval=settings["WATCH_INTERVAL_MS"] / 1000,
+    )
+    atexit.register(rental_service.close)
+
+    # Load cars from storage
+    success, error = rental_service.load_from_json()
+    if success:
+        total_cars = rental_service.get_fleet_stats()["total_cars"]
+        logger.info("Loaded %d cars from %s", total_cars, data_source)
+    else:
+        logger.error(
+            "Failed to load cars from %s: %s; using empty fleet", data_source, error
+        )
+
+    return rental_service
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """
+    Build the Flask app with its own service and fleet.
+
+    Production servers call this once per worker process, e.g.
+    gunicorn -c gunicorn.conf.py, which serves "app:create_app()".
+
+    Args:
+        config (Optional[Dict[str, Any]]): Settings that win over the environment
+
+    Returns:
+        Flask: The configured app
+    """
+    app = Flask(__name__)
+    app.config.update(load_settings(config))
+    configure_logging(app.config["LOG_LEVEL"], app.config["LOG_FORMAT"])
+    CORS(app)  # Enable CORS for all routes
+
+    swaggerui_blueprint = get_swaggerui_blueprint(
+        SWAGGER_URL,
+        API_URL,
+        config={"app_name": "Car Fleet Management API"},
+    )
+    app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+
+    # Initialize the service and controller
+    rental_service = create_rental_service(app.config)
+    app.extensions["rental_service"] = rental_service
+    register_routes(app, RentalController(rental_service))
+    register_metrics(app)
+    return app
+
+
+def register_routes(app: Flask, controller: RentalController) -> None:
+    """
+    Map URLs to controller methods.
+
+    Args:
+        app (Flask): The app to add routes to
+        controller (RentalController): The controller handling the requests
+    """
+
+    # Serve Swagger YAML file
+    @app.route("/swagger.yaml")
+    def swagger_spec():
+        """Serve the Swagger specification file."""
+        return send_from_directory(".", "swagger.yaml")
+
+    # Route definitions - delegating to controller
+    @app.route("/", methods=["GET"])
+    def home():
+        """Home endpoint - API information."""
+        return controller.get_home()
+
+    @app.route("/api/cars", methods=["GET"])
+    def get_all_cars():
+        """Get all cars in the fleet."""
+        return controller.get_all_cars()
+
+    @app.route("/api/cars/available", methods=["GET"])
+    def get_available_cars():
+        """Get all available cars."""
+        return controller.get_available_cars()
+
+    @app.route("/api/cars/export", methods=["GET"])
+    def export_cars():
+        """Stream all cars as NDJSON or a chunked JSON array."""
+        return controller.export_cars()
+
+    @app.route("/api/cars/<registration>", methods=["GET"])
+    def get_car(registration):
+        """Get details of a specific car."""
+        return controller.get_car(registration)
+
+    @app.route("/api/cars", methods=["POST"])
+    def add_car():
+        """Add a new car to the fleet."""
+        return controller.add_car()
+
+    @app.route("/api/cars/batch", methods=["POST"])
+    def add_cars():
+        """Add a batch of cars."""
+        return controller.add_cars()
+
+    @app.route("/api/cars/batch/rent", methods=["PUT"])
+    def rent_cars():
+        """Rent a batch of cars."""
+        return controller.rent_cars()
+
+    @app.route("/api/cars/batch/return", methods=["PUT"])
+    def return_cars():
+        """Return a batch of cars."""
+        return controller.return_cars()
+
+    @app.route("/api/cars/<registration>/rent", methods=["PUT"])
+    def rent_car(registration):
+        """Rent a car."""
+        return controller.rent_car(registration)
+
+    @app.route("/api/cars/<registration>/return", methods=["PUT"])
+    def return_car(registration):
+        """Return a rented car."""
+        return controller.return_car(registration)
+
+    @app.route("/api/cars/<registration>", methods=["DELETE"])
+    def delete_car(registration):
+        """Delete a car from the fleet."""
+        return controller.delete_car(registration)
+
+    @app.route("/api/stats", methods=["GET"])
+    def get_stats():
+        """Get fleet statistics."""
+        return controller.get_stats()
+
+    @app.route("/metrics", methods=["GET"])
+    def get_metrics():
+        """Get Prometheus metrics."""
+        return controller.get_metrics()
+
+    @app.errorhandler(404)
+    def not_found(error):
+        """Handle 404 errors."""
+        return jsonify({"success": False, "error": "Endpoint not found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        """Handle 500 errors."""
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+
+def register_metrics(app: Flask) -> None:
+    """
+    Count and time every request, labelled by its route pattern.
+
+    Args:
+        app (Flask): The app to instrument
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_response_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(error):
+        if "request_start" not in g:
+            return
+        HTTP_REQUESTS_IN_FLIGHT.inc(amount=-1)
+
+        # The rule, not the path, so each car does not get its own series
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        status = str(g.get("response_status", 500))
+        HTTP_REQUESTS.inc(request.method, route, status)
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - g.request_start, request.method, route
+        )
 
 
 if __name__ == "__main__":
+    # Development server only; production runs gunicorn -c gunicorn.conf.py
+    app = create_app()
+    rental_service = app.extensions["rental_service"]
+
     print("\n" + "=" * 60)
     print("🚗 Car Fleet Management API Server")
     print("=" * 60)
     print(f"Agency: {rental_service.get_agency_name()}")
-    print(f"Initial fleet size: {len(rental_service.get_all_cars())} cars")
+    print(f"Initial fleet size: {rental_service.get_fleet_stats()['total_cars']} cars")
     print("Server starting on http://127.0.0.1:5000")
     print(f"Swagger UI available at http://127.0.0.1:5000{SWAGGER_URL}")
     print("=" * 60 + "\n")
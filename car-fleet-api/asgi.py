@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Car Fleet Management API - ASGI entry point
+Serves the same routes from an event loop, with persistence on a writer thread
+
+Run from the car-fleet-api directory:
+    uv run uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 5000
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from a2wsgi import WSGIMiddleware
+
+from app import create_app
+from src import AsyncGroupCommit, DurableWritesMiddleware
+
+
+def create_asgi_app(config: Optional[Dict[str, Any]] = None) -> DurableWritesMiddleware:
+    """
+    Build the ASGI app with its own service and fleet.
+
+    Requests run the Flask routes on a small thread pool, where changes only
+    touch memory. Write responses then wait on the event loop while a single
+    writer thread commits every change made so far, so threads never sit
+    waiting on disk.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Settings that win over the environment
+
+    Returns:
+        DurableWritesMiddleware: The ASGI app
+    """
+    app = create_app({**(config or {}), "AUTO_COMMIT": False})
+    repository = app.extensions["rental_service"].repository
+
+    return DurableWritesMiddleware(
+        WSGIMiddleware(app, workers=int(os.environ.get("ASGI_THREADS", "4"))),
+        AsyncGroupCommit(repository.commit),
+    )
@@ -0,0 +1,4 @@
+"""
+Car Fleet Benchmarks
+Standalone performance checks for the service and model layers
+"""
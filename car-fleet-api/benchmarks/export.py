@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Streaming export benchmark
+Compares time-to-first-byte and peak memory of GET /api/cars, which builds the
+whole body before sending, with the streaming GET /api/cars/export
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.export
+"""
+
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from flask import Flask
+
+from src import Agency, Car, CarsRentalService, RentalController
+
+FLEET_SIZES = [10_000, 100_000, 500_000]
+ENDPOINTS = {
+    "GET /api/cars": "/api/cars",
+    "export ndjson": "/api/cars/export",
+    "export json": "/api/cars/export?format=json",
+}
+
+
+def build_client(size, data_dir):
+    """
+    Build a minimal app serving a fleet of `size` cars.
+
+    Args:
+        size (int): Number of cars in the fleet
+        data_dir (str): Directory for the (unused) JSON data file
+
+    Returns:
+        FlaskClient: A test client for the app
+    """
+    agency = Agency("Benchmark Rental")
+    agency.load_cars(
+        Car("Renault", "Clio", 2022, f"BM-{i:07d}-XX") for i in range(size)
+    )
+    service = CarsRentalService(agency, data_file=str(Path(data_dir) / "cars.json"))
+    controller = RentalController(service)
+
+    app = Flask(__name__)
+    app.add_url_rule("/api/cars", view_func=controller.get_all_cars)
+    app.add_url_rule("/api/cars/export", view_func=controller.export_cars)
+    return app.test_client()
+
+
+def consume(client, url):
+    """
+    Request a URL and read the body piece by piece, as a slow client would.
+
+    Returns:
+        tuple[float, float, int]: (seconds to first byte, total seconds,
+            body bytes)
+    """
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    body = iter(response.response)
+    first = next(body)
+    first_byte = time.perf_counter() - start
+    size = len(first)
+    for piece in body:
+        size += len(piece)
+    response.close()
+    return first_byte, time.perf_counter() - start, size
+
+
+def peak_memory(client, url):
+    """
+    Measure the peak memory allocated while serving a URL.
+
+    Returns:
+        int: Peak bytes allocated above the starting point
+    """
+    tracemalloc.start()
+    consume(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    """Run the export comparison for each fleet size."""
+    print(
+        f"{'fleet size':>10} {'endpoint':>14} {'TTFB ms':>9} {'total ms':>9} "
+        f"{'body MB':>8} {'peak MB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in FLEET_SIZES:
+            client = build_client(size, data_dir)
+            for name, url in ENDPOINTS.items():
+                first_byte, total, body = consume(client, url)
+                peak = peak_memory(client, url)
+                print(
+                    f"{size:>10,} {name:>14} {first_byte * 1000:>9.1f} "
+                    f"{total * 1000:>9.0f} {body / 1e6:>8.1f} {peak / 1e6:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
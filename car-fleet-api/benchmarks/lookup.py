@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Registration lookup benchmark
+Shows that find_car_by_registration cost does not grow with fleet size
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.lookup
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src import Agency, Car, CarsRentalService
+
+FLEET_SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 100_000
+
+
+def build_service(size, data_dir):
+    """
+    Build a service around an agency holding `size` cars.
+
+    Args:
+        size (int): Number of cars in the fleet
+        data_dir (str): Directory for the (unused) JSON data file
+
+    Returns:
+        CarsRentalService: The populated service
+    """
+    agency = Agency("Benchmark Rental")
+    agency.load_cars(
+        Car("Renault", "Clio", 2022, f"BM-{i:06d}-XX") for i in range(size)
+    )
+    return CarsRentalService(agency, data_file=str(Path(data_dir) / "cars.json"))
+
+
+def time_lookups(service, registrations):
+    """
+    Time lookups of the given registrations.
+
+    Returns:
+        float: Mean nanoseconds per lookup
+    """
+    start = time.perf_counter_ns()
+    for registration in registrations:
+        service.find_car_by_registration(registration)
+    return (time.perf_counter_ns() - start) / len(registrations)
+
+
+def main():
+    """Run the lookup benchmark for each fleet size."""
+    rng = random.Random(42)
+
+    print(f"{'fleet size':>12} {'hit ns/op':>12} {'miss ns/op':>12}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in FLEET_SIZES:
+            service = build_service(size, data_dir)
+            # Lower-case keys exercise the case-normalised index path
+            hits = [f"bm-{rng.randrange(size):06d}-xx" for _ in range(LOOKUPS)]
+            misses = [f"ZZ-{i:06d}-ZZ" for i in range(LOOKUPS)]
+            hit_ns = time_lookups(service, hits)
+            miss_ns = time_lookups(service, misses)
+            print(f"{size:>12,} {hit_ns:>12.0f} {miss_ns:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Polling benchmark
+Shows what repeated polls of the read endpoints cost once the response cache
+and ETags are in place, compared with rebuilding the body every time
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.polling
+"""
+
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from flask import Flask
+
+from src import Agency, Car, CarsRentalService, RentalController
+
+FLEET_SIZE = 100_000
+POLLS = 50
+ENDPOINTS = ["/api/cars", "/api/cars/available", "/api/stats"]
+
+
+def build_app(data_dir):
+    """
+    Build a minimal app serving a fleet of FLEET_SIZE cars.
+
+    Returns:
+        tuple[FlaskClient, RentalController]: The test client and controller
+    """
+    agency = Agency("Benchmark Rental")
+    agency.load_cars(
+        Car("Renault", "Clio", 2000 + i % 25, f"BM-{i:07d}-XX")
+        for i in range(FLEET_SIZE)
+    )
+    service = CarsRentalService(agency, data_file=str(Path(data_dir) / "cars.json"))
+    controller = RentalController(service)
+
+    app = Flask(__name__)
+    app.add_url_rule("/api/cars", view_func=controller.get_all_cars)
+    app.add_url_rule("/api/cars/available", view_func=controller.get_available_cars)
+    app.add_url_rule("/api/stats", view_func=controller.get_stats)
+    return app.test_client(), controller
+
+
+def time_polls(poll):
+    """
+    Time repeated polls.
+
+    Returns:
+        float: Mean milliseconds per poll
+    """
+    start = time.perf_counter()
+    for _ in range(POLLS):
+        poll()
+    return (time.perf_counter() - start) / POLLS * 1000
+
+
+def main():
+    """Compare uncached, cached and conditional polls of each endpoint."""
+    print(f"Fleet size: {FLEET_SIZE:,} cars")
+    print(f"{'endpoint':>20} {'rebuilt ms':>11} {'cached ms':>10} {'304 ms':>8}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        client, controller = build_app(data_dir)
+        for url in ENDPOINTS:
+            etag = client.get(url).headers["ETag"]
+
+            def rebuilt(url=url):
+                controller.response_cache.clear()
+                client.get(url)
+
+            rebuilt_ms = time_polls(rebuilt)
+            cached_ms = time_polls(partial(client.get, url))
+            not_modified_ms = time_polls(
+                partial(client.get, url, headers={"If-None-Match": etag})
+            )
+            print(
+                f"{url:>20} {rebuilt_ms:>11.2f} {cached_ms:>10.2f} "
+                f"{not_modified_ms:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
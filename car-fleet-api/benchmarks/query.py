@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Filtered query benchmark
+Shows that indexed queries cost in proportion to their results, not the fleet
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.query
+"""
+
+import random
+import time
+from functools import partial
+
+from src import Agency, Car
+
+FLEET_SIZES = [1_000, 10_000, 100_000]
+BRANDS = ["Renault", "Peugeot", "Citroën", "Toyota", "Volkswagen"]
+MODELS = ["Clio", "208", "C3", "Yaris", "Golf", "Megane", "308", "Corolla"]
+QUERIES = {
+    # Rare brand: ~20 matches whatever the fleet size
+    "rare brand": dict(brand="Dacia"),
+    "brand+year>=2022+available": dict(brand="renault", year_min=2022, available=True),
+    "year 2010-2011": dict(year_min=2010, year_max=2011),
+}
+REPEAT = 20
+
+
+def build_agency(size, rng):
+    """
+    Build an agency holding `size` random cars plus 20 of a rare brand.
+
+    Args:
+        size (int): Number of common cars in the fleet
+        rng (random.Random): Source of randomness
+
+    Returns:
+        Agency: The populated agency
+    """
+    cars = [
+        Car(
+            rng.choice(BRANDS),
+            rng.choice(MODELS),
+            rng.randrange(2000, 2025),
+            f"BM-{i:06d}-XX",
+        )
+        for i in range(size)
+    ]
+    cars += [Car("Dacia", "Sandero", 2023, f"DA-{i:06d}-XX") for i in range(20)]
+    for car in cars:
+        car.availability = rng.random() < 0.7
+    agency = Agency("Benchmark Rental")
+    agency.load_cars(cars)
+    return agency
+
+
+def scan(agency, brand=None, model=None, year_min=None, year_max=None, available=None):
+    """Filter the fleet with a full scan, as clients had to before indexes."""
+    return [
+        car
+        for car in agency.cars
+        if (brand is None or car.brand.casefold() == brand.casefold())
+        and (model is None or car.model.casefold() == model.casefold())
+        and (year_min is None or car.year >= year_min)
+        and (year_max is None or car.year <= year_max)
+        and (available is None or car.availability == available)
+    ]
+
+
+def time_query(query, filters):
+    """
+    Time a query function.
+
+    Returns:
+        tuple[float, int]: (mean microseconds per query, number of results)
+    """
+    start = time.perf_counter_ns()
+    for _ in range(REPEAT):
+        result = query(**filters)
+    return (time.perf_counter_ns() - start) / REPEAT / 1000, len(result)
+
+
+def main():
+    """Run the query benchmark for each fleet size."""
+    rng = random.Random(42)
+
+    print(
+        f"{'fleet size':>12} {'query':>28} {'results':>9} "
+        f"{'index us':>10} {'scan us':>10}"
+    )
+    for size in FLEET_SIZES:
+        agency = build_agency(size, rng)
+        for name, filters in QUERIES.items():
+            index_us, results = time_query(agency.find_cars, filters)
+            scan_us, scanned = time_query(partial(scan, agency), filters)
+            assert results == scanned
+            print(
+                f"{size:>12,} {name:>28} {results:>9,} "
+                f"{index_us:>10.0f} {scan_us:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
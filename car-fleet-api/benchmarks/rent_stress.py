@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Concurrent rental stress test
+Many threads race to rent and return the same cars; each car must be rented
+exactly once per round and the persisted fleet must match memory afterwards.
+The Redis backend spreads the threads over several replicas sharing one store.
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.rent_stress
+"""
+
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from fakeredis import FakeRedis, FakeServer
+
+from src import (
+    Agency,
+    Car,
+    CarsRentalService,
+    RedisCarRepository,
+    SqliteCarRepository,
+)
+
+THREADS = 32
+CARS = 200
+ROUNDS = 3
+# Services sharing one in-process Redis server, as replicas share a real one
+REPLICAS = 3
+REDIS_SERVER = FakeServer()
+# fakeredis creates a database on first use without a lock, so threads racing
+# to use it first can end up with one each; create it up front
+FakeRedis(server=REDIS_SERVER).dbsize()
+
+
+def race(services, action, registrations):
+    """
+    Have every thread attempt `action` on every registration, in random order.
+
+    Args:
+        services (list[CarsRentalService]): The services under test; threads
+            take turns using each
+        action (str): Either "rent_car" or "return_car"
+        registrations (list[str]): Registrations to act on
+
+    Returns:
+        Counter: Number of successful calls per registration
+    """
+    successes = Counter()
+    counter_lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker(seed):
+        service = services[seed % len(services)]
+        order = list(registrations)
+        random.Random(seed).shuffle(order)
+        start.wait()
+        for registration in order:
+            success, _, _ = getattr(service, action)(registration)
+            if success:
+                with counter_lock:
+                    successes[registration] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return successes
+
+
+def open_service(backend, data_dir):
+    """
+    Open a service over the storage for one backend.
+
+    Args:
+        backend (str): "snapshot" or "journal" JSON persistence, "sqlite" or
+            "redis"
+        data_dir (str): Directory holding the backend's files
+
+    Returns:
+        CarsRentalService: A service with its storage loaded
+    """
+    if backend == "sqlite":
+        repository = SqliteCarRepository(str(Path(data_dir) / "stress.db"))
+        service = CarsRentalService(Agency("Stress Rental"), repository=repository)
+    elif backend == "redis":
+        redis = FakeRedis(server=REDIS_SERVER, decode_responses=True)
+        repository = RedisCarRepository(redis)
+        service = CarsRentalService(Agency("Stress Rental"), repository=repository)
+    else:
+        service = CarsRentalService(
+            Agency("Stress Rental"),
+            data_file=str(Path(data_dir) / f"{backend}.json"),
+            persistence=backend,
+            journal_max_records=500,
+        )
+    service.load_from_json()
+    return service
+
+
+def check(backend, data_dir):
+    """
+    Run the stress rounds for one storage backend.
+
+    Returns:
+        bool: True if no car was double-rented or double-returned
+    """
+    replicas = REPLICAS if backend == "redis" else 1
+    services = [open_service(backend, data_dir) for _ in range(replicas)]
+    service = services[0]
+    registrations = [f"ST-{i:04d}" for i in range(CARS)]
+    for registration in registrations:
+        service.repository.add(Car("Renault", "Clio", 2022, registration))
+
+    ok = True
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for action in ("rent_car", "return_car"):
+            successes = race(services, action, registrations)
+            doubles = [reg for reg in registrations if successes[reg] != 1]
+            if doubles:
+                print(f"  {action}: {len(doubles)} cars not changed exactly once")
+                ok = False
+    elapsed = time.perf_counter() - start
+
+    # Leave half the fleet rented and check the persisted state matches memory
+    race(services, "rent_car", registrations[::2])
+    expected = service.get_all_cars()
+    for replica in services:
+        replica.close()
+    reloaded = open_service(backend, data_dir)
+    if reloaded.get_all_cars() != expected:
+        print("  persisted fleet does not match memory")
+        ok = False
+    reloaded.close()
+
+    calls = ROUNDS * 2 * THREADS * CARS
+    print(f"  {backend}: {calls:,} calls in {elapsed:.2f}s")
+    return ok
+
+
+def main():
+    """Run the stress test against every storage backend."""
+    # Switch threads as often as possible to widen any check-then-act window
+    sys.setswitchinterval(1e-6)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as data_dir:
+        for backend in ("snapshot", "journal", "sqlite", "redis"):
+            ok = check(backend, data_dir) and ok
+
+    print("OK: no double rentals" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
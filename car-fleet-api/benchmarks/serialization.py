@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Car memory and serialisation benchmark
+Compares the slotted Car and direct JSON encoder with a plain __dict__ Car
+serialised through per-car dicts and json.dumps, as GET /api/cars used to
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.serialization
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+from src import Car
+from src.serialization import cars_to_json
+
+FLEET_SIZE = 100_000
+REPEATS = 5
+
+
+class DictCar:
+    """The previous Car layout: a plain class with a per-instance __dict__."""
+
+    def __init__(self, brand, model, year, registration):
+        self.brand = brand
+        self.model = model
+        self.year = year
+        self.registration = registration
+        self.availability = True
+
+
+def car_to_dict(car):
+    """Convert a car to a dict, as CarsRentalService.car_to_dict does."""
+    return {
+        "brand": car.brand,
+        "model": car.model,
+        "year": car.year,
+        "registration": car.registration,
+        "availability": car.availability,
+    }
+
+
+def dict_path(cars):
+    """Serialise through a dict per car, then json.dumps the whole list."""
+    return json.dumps(
+        [car_to_dict(car) for car in cars], separators=(",", ":"), sort_keys=True
+    )
+
+
+def direct_path(cars):
+    """Serialise straight from the records."""
+    return cars_to_json(cars)[1]
+
+
+def build_fleet(car_class):
+    """
+    Build a fleet and measure the memory it holds.
+
+    Returns:
+        tuple[list, int]: (cars, bytes allocated for them)
+    """
+    # Share field strings, as cars loaded from JSON mostly do, so the
+    # measurement is dominated by the per-car objects themselves
+    brands = ["Renault", "Peugeot", "Citroën"]
+    registrations = [f"BM-{i:06d}-XX" for i in range(FLEET_SIZE)]
+
+    gc.collect()
+    tracemalloc.start()
+    cars = [
+        car_class(brands[i % 3], "Clio", 2022, registrations[i])
+        for i in range(FLEET_SIZE)
+    ]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cars, allocated
+
+
+def best_time(func, cars):
+    """
+    Time the fastest of several runs.
+
+    Returns:
+        float: Seconds for the fastest run
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(cars)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the memory and throughput comparison."""
+    dict_cars, dict_bytes = build_fleet(DictCar)
+    slot_cars, slot_bytes = build_fleet(Car)
+
+    assert dict_path(dict_cars) == direct_path(slot_cars)
+
+    dict_seconds = best_time(dict_path, dict_cars)
+    direct_seconds = best_time(direct_path, slot_cars)
+
+    print(f"Fleet size: {FLEET_SIZE:,} cars")
+    print(f"{'':28} {'bytes/car':>10} {'cars/s':>12}")
+    print(
+        f"{'__dict__ Car + dict + dumps':28} {dict_bytes / FLEET_SIZE:>10.0f}"
+        f" {FLEET_SIZE / dict_seconds:>12,.0f}"
+    )
+    print(
+        f"{'slotted Car + direct JSON':28} {slot_bytes / FLEET_SIZE:>10.0f}"
+        f" {FLEET_SIZE / direct_seconds:>12,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
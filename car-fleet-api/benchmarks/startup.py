@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+Compares how long the JSON data file, an eagerly loaded binary snapshot and a
+lazily loaded one take before the fleet can serve lookups and full listings
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.startup
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from src import Agency, Car, CarsRentalService
+
+FLEET_SIZES = [10_000, 100_000, 1_000_000]
+# (name, snapshot format, lazy load)
+LOADERS = [
+    ("json", "json", False),
+    ("binary", "binary", False),
+    ("binary lazy", "binary", True),
+]
+BRANDS = ["Renault", "Peugeot", "Citroën", "Toyota"]
+
+
+def write_fleet(size, data_file, snapshot_format):
+    """
+    Write a fleet of `size` cars, about 70% available, to a data file.
+
+    Args:
+        size (int): Number of cars in the fleet
+        data_file (Path): The data file to write
+        snapshot_format (str): "json" or "binary"
+
+    Returns:
+        float: Size of the written file in MB
+    """
+    agency = Agency("Benchmark Rental")
+    cars = []
+    for i in range(size):
+        car = Car(BRANDS[i % len(BRANDS)], "Model", 2000 + i % 25, f"BM-{i:07d}-XX")
+        car.availability = i % 10 < 7
+        cars.append(car)
+    agency.load_cars(cars)
+    service = CarsRentalService(
+        agency, data_file=str(data_file), snapshot_format=snapshot_format
+    )
+    service.save_to_json()
+    return data_file.stat().st_size / 1e6
+
+
+def measure_startup(data_file, lazy_load):
+    """
+    Load a data file the way the app does at startup.
+
+    Returns:
+        tuple[float, float, float]: Seconds until the fleet was loaded, until a
+            lookup answered, and until a filtered listing answered
+    """
+    start = time.perf_counter()
+    service = CarsRentalService(
+        Agency("Benchmark Rental"), data_file=str(data_file), lazy_load=lazy_load
+    )
+    success, error = service.load_from_json()
+    if not success:
+        raise RuntimeError(error)
+    loaded = time.perf_counter() - start
+
+    service.find_car_by_registration("BM-0000042-XX")
+    lookup = time.perf_counter() - start
+
+    # Filtered queries need every car and the indexes
+    service.get_cars_page_json(None, 100, brand="Toyota")
+    listing = time.perf_counter() - start
+    service.close()
+    return loaded, lookup, listing
+
+
+def main():
+    """Run the startup comparison for each fleet size."""
+    print(
+        f"{'fleet size':>10} {'loader':>12} {'file MB':>8} {'loaded s':>9} "
+        f"{'lookup s':>9} {'listing s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in FLEET_SIZES:
+            files = {}
+            for snapshot_format in ("json", "binary"):
+                data_file = Path(data_dir) / f"cars-{snapshot_format}"
+                files[snapshot_format] = (
+                    data_file,
+                    write_fleet(size, data_file, snapshot_format),
+                )
+
+            for name, snapshot_format, lazy_load in LOADERS:
+                data_file, megabytes = files[snapshot_format]
+                loaded, lookup, listing = measure_startup(data_file, lazy_load)
+                print(
+                    f"{size:>10,} {name:>12} {megabytes:>8.1f} {loaded:>9.3f} "
+                    f"{lookup:>9.3f} {listing:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
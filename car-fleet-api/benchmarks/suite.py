@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite
+Drives read-heavy, write-heavy and mixed workloads against the service, the
+Flask app through its test client, and the app behind a real HTTP server, at
+fleet sizes from 100 to 1M cars. Reports throughput, p50/p99 latency and peak
+RSS as JSON, and can fail when results regress against a saved baseline.
+
+Each (target, fleet size) runs in a fresh process, so peak RSS belongs to that
+case alone. Operations and cars are drawn from a seeded generator, so two runs
+of the same code issue the same requests.
+
+Run from the car-fleet-api directory:
+    uv run python -m benchmarks.suite --output results.json
+    uv run python -m benchmarks.suite --sizes 100,10000 --duration 0.5
+    uv run python -m benchmarks.suite --baseline results.json
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+from src import Agency, Car, CarsRentalService
+
+TARGETS = ["service", "client", "server"]
+FLEET_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Operation mixes, as (operation, weight) pairs
+WORKLOADS = {
+    "lookup": [("get_car", 1)],
+    "read": [("get_car", 80), ("list_page", 15), ("stats", 5)],
+    "write": [("rent", 50), ("return", 50)],
+    "mixed": [
+        ("get_car", 72),
+        ("list_page", 13),
+        ("stats", 5),
+        ("rent", 5),
+        ("return", 5),
+    ],
+    "save": [("save", 1)],
+}
+
+BRANDS = ["Renault", "Peugeot", "Citroën", "Toyota", "Volkswagen"]
+MODELS = ["Clio", "208", "C3", "Yaris", "Golf", "Megane", "308", "Corolla"]
+PAGE_LIMIT = 100
+
+# Pre-generated operations per worker; cycled if a case outlasts them
+OPS_PER_WORKER = 100_000
+
+
+def build_fleet(size, seed):
+    """
+    Build a reproducible fleet of random cars, about 70% available.
+
+    Args:
+        size (int): Number of cars
+        seed (int): Seed for the random generator
+
+    Returns:
+        list[Car]: The cars
+    """
+    rng = random.Random(seed)
+    cars = []
+    for i in range(size):
+        car = Car(
+            rng.choice(BRANDS),
+            rng.choice(MODELS),
+            rng.randrange(2000, 2025),
+            f"BM-{i:07d}-XX",
+        )
+        car.availability = rng.random() < 0.7
+        cars.append(car)
+    return cars
+
+
+def plan_operations(workload, size, seed, count):
+    """
+    Draw a reproducible sequence of operations and the cars they target.
+
+    Args:
+        workload (str): Name of the operation mix in WORKLOADS
+        size (int): Number of cars in the fleet
+        seed (int): Seed for the random generator
+        count (int): Number of operations to draw
+
+    Returns:
+        list[tuple[str, str]]: (operation, registration) pairs
+    """
+    rng = random.Random(seed)
+    operations, weights = zip(*WORKLOADS[workload])
+    chosen = rng.choices(operations, weights=weights, k=count)
+    return [(op, f"BM-{rng.randrange(size):07d}-XX") for op in chosen]
+
+
+class ServiceDriver:
+    """Calls CarsRentalService directly."""
+
+    operations = {"get_car", "list_page", "stats", "rent", "return", "save"}
+
+    def __init__(self, service):
+        self.service = service
+
+    def __call__(self, op, registration):
+        """Run one operation; returns False on an unexpected failure."""
+        if op == "get_car":
+            self.service.find_car_by_registration(registration)
+        elif op == "list_page":
+            self.service.get_cars_page_json(None, PAGE_LIMIT)
+        elif op == "stats":
+            self.service.get_fleet_stats()
+        elif op == "rent":
+            self.service.rent_car(registration)
+        elif op == "return":
+            self.service.return_car(registration)
+        elif op == "save":
+            return self.service.save_to_json()[0]
+        return True
+
+
+# HTTP requests for each operation; 400 is an expected answer for renting a
+# rented car or returning an available one
+REQUESTS = {
+    "get_car": ("GET", "/api/cars/{registration}"),
+    "list_page": ("GET", f"/api/cars?limit={PAGE_LIMIT}"),
+    "stats": ("GET", "/api/stats"),
+    "rent": ("PUT", "/api/cars/{registration}/rent"),
+    "return": ("PUT", "/api/cars/{registration}/return"),
+}
+
+
+class ClientDriver:
+    """Sends requests through the Flask test client, without sockets."""
+
+    operations = set(REQUESTS)
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def __call__(self, op, registration):
+        """Run one operation; returns False on a server error."""
+        method, path = REQUESTS[op]
+        response = self.client.open(
+            path.format(registration=registration), method=method
+        )
+        response.close()
+        return response.status_code < 500
+
+
+class ServerDriver:
+    """Sends requests over a keep-alive HTTP connection to a real server."""
+
+    operations = set(REQUESTS)
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def __call__(self, op, registration):
+        """Run one operation; returns False on a server error."""
+        method, path = REQUESTS[op]
+        self.connection.request(method, path.format(registration=registration))
+        response = self.connection.getresponse()
+        response.read()
+        return response.status < 500
+
+
+def run_workload(drivers, workload, size, seed, duration):
+    """
+    Run a workload on every driver at once, each in its own thread, until the
+    time is up.
+
+    Args:
+        drivers (list): One driver per concurrent worker
+        workload (str): Name of the operation mix in WORKLOADS
+        size (int): Number of cars in the fleet
+        seed (int): Seed for the operation sequences
+        duration (float): Seconds to run for; every worker does at least one
+            operation
+
+    Returns:
+        dict: operations, errors, throughput and latency percentiles
+    """
+    plans = [
+        plan_operations(workload, size, seed + i, OPS_PER_WORKER)
+        for i in range(len(drivers))
+    ]
+    latencies = [[] for _ in drivers]
+    errors = [0] * len(drivers)
+    start_barrier = threading.Barrier(len(drivers) + 1)
+
+    def worker(index):
+        driver, plan, samples = drivers[index], plans[index], latencies[index]
+        start_barrier.wait()
+        i = 0
+        while True:
+            op, registration = plan[i % len(plan)]
+            began = time.perf_counter_ns()
+            try:
+                ok = driver(op, registration)
+            except Exception:
+                ok = False
+            samples.append(time.perf_counter_ns() - began)
+            if not ok:
+                errors[index] += 1
+            i += 1
+            if time.perf_counter() >= deadline:
+                break
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(drivers))]
+    for thread in threads:
+        thread.start()
+    began = time.perf_counter()
+    deadline = began + duration
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    samples = sorted(
+        sample for worker_samples in latencies for sample in worker_samples
+    )
+    return {
+        "operations": len(samples),
+        "errors": sum(errors),
+        "throughput_ops_s": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 0.50) / 1e6, 4),
+        "p99_ms": round(percentile(samples, 0.99) / 1e6, 4),
+    }
+
+
+def percentile(samples, fraction):
+    """Read a percentile from sorted samples (nearest rank)."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+
+def run_case(target, size, workloads, options):
+    """
+    Set up one target with a fleet and run the workloads against it.
+
+    Runs in a fresh worker process, so the fleet and peak RSS are its own.
+
+    Args:
+        target (str): "service", "client" or "server"
+        size (int): Number of cars in the fleet
+        workloads (list[str]): Workloads to run, in order
+        options (dict): duration, concurrency, persistence and seed
+
+    Returns:
+        list[dict]: One result per workload the target supports
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_file = str(Path(data_dir) / "cars.json")
+        setup_start = time.perf_counter()
+
+        agency = Agency("Benchmark Rental")
+        agency.load_cars(build_fleet(size, options["seed"]))
+        service = CarsRentalService(
+            agency, data_file=data_file, persistence=options["persistence"]
+        )
+        server = None
+        if target == "service":
+            drivers = [ServiceDriver(service)]
+        else:
+            # Seed the app's data file, then let it load the fleet as in production
+            service.save_to_json()
+            service.close()
+            from app import create_app
+
+            app = create_app(
+                {
+                    "DATA_FILE": data_file,
+                    "PERSISTENCE_MODE": options["persistence"],
+                    "LOG_LEVEL": "WARNING",
+                    "LOG_FORMAT": "text",
+                }
+            )
+            if target == "client":
+                drivers = [ClientDriver(app)]
+            else:
+                server = start_server(app)
+                drivers = [
+                    ServerDriver(server.server_port)
+                    for _ in range(options["concurrency"])
+                ]
+        setup_seconds = time.perf_counter() - setup_start
+
+        results = []
+        try:
+            for workload in workloads:
+                ops = {op for op, _ in WORKLOADS[workload]}
+                if not ops <= drivers[0].operations:
+                    continue
+                result = run_workload(
+                    drivers, workload, size, options["seed"], options["duration"]
+                )
+                results.append(
+                    {
+                        "target": target,
+                        "workload": workload,
+                        "fleet_size": size,
+                        "concurrency": len(drivers),
+                        **result,
+                        "peak_rss_mb": peak_rss_mb(),
+                        "setup_s": round(setup_seconds, 2),
+                    }
+                )
+        finally:
+            if server is not None:
+                server.shutdown()
+    return results
+
+
+def start_server(app):
+    """
+    Serve an app on a free local port from a background thread.
+
+    Returns:
+        BaseWSGIServer: The running server; call shutdown() to stop it
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    # The access log would dominate the request cost being measured
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+    server = make_server(
+        "127.0.0.1", 0, app, threaded=True, request_handler=KeepAliveHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def compare(results, baseline, tolerance):
+    """
+    Find cases that got slower than a baseline run by more than a tolerance.
+
+    Args:
+        results (list[dict]): Results of this run
+        baseline (list[dict]): Results of the baseline run
+        tolerance (float): Allowed fractional loss, e.g. 0.2 for 20%
+
+    Returns:
+        list[str]: One description per regression
+    """
+    previous = {(r["target"], r["workload"], r["fleet_size"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["target"], result["workload"], result["fleet_size"]))
+        if old is None:
+            continue
+        name = f"{result['target']}/{result['workload']}/{result['fleet_size']}"
+        if result["throughput_ops_s"] < old["throughput_ops_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {old['throughput_ops_s']} -> "
+                f"{result['throughput_ops_s']} ops/s"
+            )
+        if result["p99_ms"] > old["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {old['p99_ms']} -> {result['p99_ms']} ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+
+    def names(choices):
+        def parse(value):
+            items = [item.strip() for item in value.split(",") if item.strip()]
+            unknown = set(items) - set(choices)
+            if unknown:
+                raise argparse.ArgumentTypeError(
+                    f"unknown: {', '.join(sorted(unknown))} "
+                    f"(expected some of: {', '.join(choices)})"
+                )
+            return items
+
+        return parse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite", description=__doc__.split("\n")[1]
+    )
+    parser.add_argument(
+        "--targets", type=names(TARGETS), default=TARGETS, help="comma-separated"
+    )
+    parser.add_argument(
+        "--workloads",
+        type=names(list(WORKLOADS)),
+        default=list(WORKLOADS),
+        help="comma-separated",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=FLEET_SIZES,
+        help="comma-separated fleet sizes",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=2.0, help="seconds per workload"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="connections for the server target"
+    )
+    parser.add_argument(
+        "--persistence", choices=["snapshot", "journal"], default="journal"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed throughput loss or p99 growth against the baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run every (target, fleet size) case and report the results."""
+    args = parse_args(argv)
+    options = {
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "persistence": args.persistence,
+        "seed": args.seed,
+    }
+
+    results = []
+    print(
+        f"{'target':>8} {'workload':>8} {'fleet size':>10} {'ops/s':>10} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>8}",
+        file=sys.stderr,
+    )
+    for target in args.targets:
+        for size in args.sizes:
+            # A fresh process per case: peak RSS and heap state start clean
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                case = pool.submit(run_case, target, size, args.workloads, options)
+                for result in case.result():
+                    results.append(result)
+                    print(
+                        f"{target:>8} {result['workload']:>8} {size:>10,} "
+                        f"{result['throughput_ops_s']:>10,.0f} "
+                        f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                        f"{result['peak_rss_mb']:>8.0f}",
+                        file=sys.stderr,
+                    )
+
+    report = {
+        "meta": {
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            **options,
+        },
+        "results": results,
+    }
+    body = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(body + "\n")
+    else:
+        print(body)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
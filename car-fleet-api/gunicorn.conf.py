@@ -0,0 +1,42 @@
+"""
+Gunicorn configuration for the Car Fleet Management API
+Worker and thread counts come from the environment (see the ConfigMap)
+
+Run from the car-fleet-api directory:
+    uv run gunicorn -c gunicorn.conf.py
+"""
+
+import os
+
+wsgi_app = "app:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Threads share one process and therefore one fleet; each worker is a separate
+# process with its own copy of the fleet loaded from storage
+workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+
+# Workers would each serve and save their own fleet, overwriting each other's
+# changes in the JSON file; scale with threads, SQLite or Redis
+requested_workers = workers
+if os.environ.get("STORAGE_BACKEND", "json") == "json" and workers > 1:
+    workers = 1
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = timeout
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def on_starting(server):
+    """Report settings adjusted above, once gunicorn's logging is set up."""
+    if workers != requested_workers:
+        server.log.warning(
+            "GUNICORN_WORKERS=%d is not supported with the JSON store, using %d worker",
+            requested_workers,
+            workers,
+        )
@@ -4,8 +4,25 @@ Orange DevOps Task - Python Programming Exercise
 """
 
 from .agency import Agency
+from .async_commit import AsyncGroupCommit, DurableWritesMiddleware
 from .car import Car
 from .controller import RentalController
+from .redis_repository import RedisCarRepository, connect_redis, describe_redis
+from .repository import CarRepository, JsonCarRepository
 from .service import CarsRentalService
+from .sqlite_repository import SqliteCarRepository
 
-__all__ = ["Car", "Agency", "CarsRentalService", "RentalController"]
+__all__ = [
+    "Car",
+    "Agency",
+    "CarsRentalService",
+    "RentalController",
+    "CarRepository",
+    "JsonCarRepository",
+    "SqliteCarRepository",
+    "RedisCarRepository",
+    "connect_redis",
+    "describe_redis",
+    "AsyncGroupCommit",
+    "DurableWritesMiddleware",
+]
@@ -3,6 +3,21 @@ Agency class module
 Represents a car rental agency managing a fleet of cars
 """
 
+import heapq
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from .fleet_index import FleetIndex
+
+logger = logging.getLogger(__name__)
+
+# Car fields the fleet statistics are broken down by
+STAT_FIELDS = ("brand", "model", "year")
+
+# Snapshot rows built per lock hold when a lazy load builds the rest of the fleet
+LOAD_BATCH = 10_000
+
 
 class Agency:
     """Represents a car rental agency managing a fleet of cars."""
@@ -15,7 +30,376 @@ class Agency:
             name (str): The name of the agency
         """
         self.name = name
-        self.cars = []
+        # Registration-keyed index; insertion order doubles as fleet order
+        self._cars = {}
+        # Running counters, updated by every change so stats never scan the fleet
+        self._total = 0
+        self._available = 0
+        self._breakdowns = {field: {} for field in STAT_FIELDS}
+        self._index = FleetIndex()
+        # Bumped by every change and never reset, so equal versions mean equal fleets
+        self._version = 0
+
+        # Lazy loading (load_snapshot): cars still only in the snapshot are built
+        # on first lookup. _removed and _added track changes to the snapshot's
+        # membership, and _changes holds index updates made while load_all
+        # builds the indexes; it is None once they are built.
+        self._snapshot = None
+        self._removed = set()
+        self._added = []  # keys added since the snapshot, sorted
+        self._changes = None
+        # Guards _cars membership and the lazy state against concurrent lookups
+        self._load_lock = threading.Lock()
+        self._build_lock = threading.Lock()  # Held while load_all builds
+
+    @staticmethod
+    def _key(registration):
+        """Normalise a registration number into its index key."""
+        return registration.upper()
+
+    @property
+    def cars(self):
+        """Read-only view of all cars in the fleet, in insertion order."""
+        self.load_all()
+        return self._cars.values()
+
+    @property
+    def total_count(self):
+        """Number of cars in the fleet."""
+        return self._total
+
+    @property
+    def version(self):
+        """Number that changes whenever the fleet changes."""
+        return self._version
+
+    @property
+    def fully_loaded(self):
+        """Whether every car is built, i.e. no lazy snapshot is pending."""
+        return self._snapshot is None
+
+    @property
+    def available_count(self):
+        """Number of cars available for rent."""
+        return self._available
+
+    def breakdown(self, field):
+        """
+        Count cars per value of a field.
+
+        Args:
+            field (str): One of STAT_FIELDS
+
+        Returns:
+            dict: Maps each value to a (total, available) tuple
+        """
+        return {
+            value: (total, available)
+            for value, (total, available) in self._breakdowns[field].items()
+        }
+
+    def _tally(self, car, total, available):
+        """
+        Apply a change to the running counters.
+
+        Args:
+            car (Car): The car being added, removed, rented or returned
+            total (int): Change in the number of cars (-1, 0 or 1)
+            available (int): Change in the number of available cars
+        """
+        self._total += total
+        self._available += available
+        self._version += 1
+        for field, counts in self._breakdowns.items():
+            value = getattr(car, field)
+            entry = counts.get(value)
+            if entry is None:
+                entry = counts[value] = [0, 0]
+            entry[0] += total
+            entry[1] += available
+            if entry[0] == 0:
+                del counts[value]
+
+    def find_cars(
+        self, brand=None, model=None, year_min=None, year_max=None, available=None
+    ):
+        """
+        Find cars matching all given conditions using the secondary indexes.
+
+        Args:
+            brand (str): Brand to match (case-insensitive)
+            model (str): Model to match (case-insensitive)
+            year_min (int): Earliest year, inclusive
+            year_max (int): Latest year, inclusive
+            available (bool): Availability to match
+
+        Returns:
+            list: The matching cars, in fleet order
+        """
+        self.load_all()
+        return self._index.query(brand, model, year_min, year_max, available)
+
+    def find_cars_page(
+        self,
+        after,
+        limit,
+        brand=None,
+        model=None,
+        year_min=None,
+        year_max=None,
+        available=None,
+    ):
+        """
+        Find one page of matching cars, ordered by registration number.
+
+        Args:
+            after (str): Only return cars whose registration sorts after this
+                one (case-insensitive), or None to start from the beginning
+            limit (int): Maximum number of cars to return
+            brand, model, year_min, year_max, available: As for find_cars
+
+        Returns:
+            list: Up to `limit` matching cars
+        """
+        if after is not None:
+            after = self._key(after)
+        filters = (brand, model, year_min, year_max, available)
+        if self._snapshot is not None and all(f is None for f in filters):
+            return self._snapshot_page(after, limit)
+
+        self.load_all()
+        return self._index.page(
+            after, limit, brand, model, year_min, year_max, available
+        )
+
+    def get_car(self, registration):
+        """
+        Look up a car by registration number.
+
+        Args:
+            registration (str): The registration number (case-insensitive)
+
+        Returns:
+            Car: The matching car, or None if not found
+        """
+        key = self._key(registration)
+        # A miss only counts once no snapshot was set before or after reading
+        # _cars: lazy states set the snapshot first and drop it last
+        snapshot = self._snapshot
+        car = self._cars.get(key)
+        if car is None and (snapshot is not None or self._snapshot is not None):
+            with self._load_lock:
+                car = self._lookup(key)
+        return car
+
+    def remove_car(self, registration):
+        """
+        Remove a car from the fleet.
+
+        Args:
+            registration (str): The registration number (case-insensitive)
+
+        Returns:
+            Car: The removed car, or None if not found
+        """
+        key = self._key(registration)
+        with self._load_lock:
+            car = self._lookup(key)
+            if car is None:
+                return None
+            del self._cars[key]
+            if self._snapshot is not None:
+                self._removed.add(key)
+                position = bisect_left(self._added, key)
+                if position < len(self._added) and self._added[position] == key:
+                    del self._added[position]
+            self._update_index("remove", key, car)
+
+        self._tally(car, -1, -int(car.availability))
+        return car
+
+    def load_cars(self, cars):
+        """
+        Replace the whole fleet with the given cars.
+
+        Later entries win over earlier ones sharing a registration.
+
+        Args:
+            cars (Iterable[Car]): The cars to load
+        """
+        staged = Agency(self.name)
+        staged._cars = {self._key(car.registration): car for car in cars}
+        staged._index = FleetIndex(staged._cars.items())
+        for car in staged._cars.values():
+            staged._tally(car, 1, int(car.availability))
+        self.adopt(staged)
+
+    def load_snapshot(self, snapshot):
+        """
+        Replace the whole fleet with a binary snapshot's cars, building them lazily.
+
+        Lookups by registration, changes, counters and unfiltered pages work
+        straight away: each car is built on its first lookup. Everything else
+        waits for load_all, which builds the remaining cars and the indexes.
+
+        Args:
+            snapshot (FleetSnapshot): The snapshot to load; its registrations
+                must be unique, as write_snapshot guarantees
+        """
+        staged = Agency(self.name)
+        staged._reset_lazy_state(snapshot)
+        staged._total = len(snapshot)
+        staged._available, staged._breakdowns = snapshot.tallies()
+        self.adopt(staged)
+
+    def adopt(self, staged):
+        """
+        Replace the whole fleet with another agency's, in one step.
+
+        The other agency is built first, e.g. with load_cars, so nothing here
+        waits for the loading: lookups see the old fleet until the swap, and
+        the new one after it. A lazy build of the old fleet is abandoned.
+
+        Args:
+            staged (Agency): The agency to take the fleet from; it must not be
+                used afterwards
+        """
+        with self._load_lock:
+            self._cars = staged._cars
+            self._snapshot = staged._snapshot
+            self._removed = staged._removed
+            self._added = staged._added
+            self._changes = staged._changes
+            self._index = staged._index
+            self._total = staged._total
+            self._available = staged._available
+            self._breakdowns = staged._breakdowns
+            # Never reuse a version, so caches keyed on it stay correct
+            self._version += 1
+
+    def load_all(self):
+        """
+        Build what a lazy load deferred: the remaining cars, then the indexes.
+
+        Lookups and changes keep working meanwhile, waiting at most for one batch
+        of cars or for the indexes to be swapped in; queries wait for the build.
+        Returns at once if nothing was deferred.
+        """
+        if self._changes is None:
+            return
+
+        with self._build_lock:
+            if self._changes is None:
+                return  # Built by another thread while this one waited
+
+            snapshot = self._snapshot
+            keys = snapshot.keys
+            for start in range(0, len(keys), LOAD_BATCH):
+                with self._load_lock:
+                    if self._snapshot is not snapshot:
+                        return  # Replaced by adopt()
+                    cars, removed = self._cars, self._removed
+                    for row in range(start, min(start + LOAD_BATCH, len(keys))):
+                        key = keys[row]
+                        if key not in cars and key not in removed:
+                            cars[key] = snapshot.car(row)
+
+            # Put the fleet back in order, snapshot cars first, then queue index
+            # updates from here on while the indexes are built from this state
+            with self._load_lock:
+                if self._snapshot is not snapshot:
+                    return
+                ordered = {
+                    key: self._cars[key] for key in keys if key not in self._removed
+                }
+                for key, car in self._cars.items():
+                    ordered.setdefault(key, car)
+                self._cars = ordered
+                self._reset_lazy_state(None)
+                changes = self._changes = []
+                items = list(ordered.items())
+
+            index = FleetIndex(items)
+            with self._load_lock:
+                if self._changes is not changes:
+                    return
+                for method, key, car in self._changes:
+                    getattr(index, method)(key, car)
+                self._index = index
+                self._changes = None
+
+    def _reset_lazy_state(self, snapshot):
+        """Start lazy loading from a snapshot, or stop it if snapshot is None."""
+        self._snapshot = snapshot
+        self._removed = set()
+        self._added = []
+        self._changes = None if snapshot is None else []
+
+    def _lookup(self, key):
+        """
+        Find a car by index key, building it from the snapshot on first use.
+
+        Call with _load_lock held.
+
+        Args:
+            key (str): The car's index key
+
+        Returns:
+            Car: The car, or None if not found
+        """
+        car = self._cars.get(key)
+        if car is None and self._snapshot is not None and key not in self._removed:
+            row = self._snapshot.row(key)
+            if row is not None:
+                car = self._cars[key] = self._snapshot.car(row)
+        return car
+
+    def _update_index(self, method, key, car):
+        """
+        Apply a change to the secondary indexes, or queue it while they are built.
+
+        Call with _load_lock held. Before load_all starts building, changes are
+        dropped: the build indexes the cars as they are by then.
+
+        Args:
+            method (str): The FleetIndex method to call
+            key (str): The car's index key
+            car (Car): The car that changed
+        """
+        if self._changes is None:
+            getattr(self._index, method)(key, car)
+        elif self._snapshot is None:
+            self._changes.append((method, key, car))
+
+    def _snapshot_page(self, after, limit):
+        """
+        Page through a lazily loaded fleet by registration, without its indexes.
+
+        Args:
+            after (str): Only return cars whose key sorts after this, or None
+            limit (int): Maximum number of cars to return
+
+        Returns:
+            list: Up to `limit` cars, in ascending key order
+        """
+        keys, added = self._snapshot.sorted_keys, self._added
+        start = 0 if after is None else bisect_right(keys, after)
+        added = added if after is None else added[bisect_right(added, after) :]
+
+        page = []
+        previous = None
+        candidates = (keys[i] for i in range(start, len(keys)))
+        for key in heapq.merge(candidates, added):
+            # A car removed and added back is listed in both
+            if key == previous:
+                continue
+            previous = key
+            car = self.get_car(key)
+            if car is not None:
+                page.append(car)
+                if len(page) == limit:
+                    break
+        return page
 
     def add_car(self, car):
         """
@@ -27,16 +411,22 @@ class Agency:
         Returns:
             bool: True if successful, False otherwise
         """
-        # Check if registration already exists
-        for existing_car in self.cars:
-            if existing_car.registration == car.registration:
-                print(
-                    f"\nError: Car with registration {car.registration} already exists!"
-                )
-                return False
+        key = self._key(car.registration)
+
+        with self._load_lock:
+            # Check if registration already exists
+            exists = self._lookup(key) is not None
+            if not exists:
+                self._cars[key] = car
+                if self._snapshot is not None:
+                    insort(self._added, key)
+                self._update_index("add", key, car)
+        if exists:
+            logger.debug("Car with registration %s already exists", car.registration)
+            return False
 
-        self.cars.append(car)
-        print(f"\nCar {car.brand} {car.model} ({car.registration}) added successfully!")
+        self._tally(car, 1, int(car.availability))
+        logger.debug("Car %s %s (%s) added", car.brand, car.model, car.registration)
         return True
 
     def rent_car(self, registration):
@@ -49,19 +439,20 @@ class Agency:
         Returns:
             bool: True if successful, False otherwise
         """
-        for car in self.cars:
-            if car.registration == registration:
-                if car.is_available():
-                    car.availability = False
-                    print(
-                        f"\nCar {car.brand} {car.model} ({registration}) rented successfully!"
-                    )
-                    return True
-                else:
-                    print(f"\nError: Car {registration} is already rented!")
-                    return False
-
-        print(f"\nError: Car with registration {registration} not found!")
+        car = self.get_car(registration)
+        if car is None:
+            logger.debug("Car with registration %s not found", registration)
+            return False
+
+        if car.is_available():
+            car.availability = False
+            self._tally(car, 0, -1)
+            with self._load_lock:
+                self._update_index("update_availability", self._key(registration), car)
+            logger.debug("Car %s %s (%s) rented", car.brand, car.model, registration)
+            return True
+
+        logger.debug("Car %s is already rented", registration)
         return False
 
     def return_car(self, registration):
@@ -74,54 +465,47 @@ class Agency:
         Returns:
             bool: True if successful, False otherwise
         """
-        for car in self.cars:
-            if car.registration == registration:
-                if not car.is_available():
-                    car.availability = True
-                    print(
-                        f"\nCar {car.brand} {car.model} ({registration}) returned successfully!"
-                    )
-                    return True
-                else:
-                    print(f"\nError: Car {registration} is already available!")
-                    return False
-
-        print(f"\nError: Car with registration {registration} not found!")
+        car = self.get_car(registration)
+        if car is None:
+            logger.debug("Car with registration %s not found", registration)
+            return False
+
+        if not car.is_available():
+            car.availability = True
+            self._tally(car, 0, 1)
+            with self._load_lock:
+                self._update_index("update_availability", self._key(registration), car)
+            logger.debug("Car %s %s (%s) returned", car.brand, car.model, registration)
+            return True
+
+        logger.debug("Car %s is already available", registration)
         return False
 
     def display_available_cars(self):
-        """Display all cars that are available for rent."""
+        """Log all cars that are available for rent, as one INFO record."""
         available_cars = [car for car in self.cars if car.is_available()]
 
         if not available_cars:
-            print("\nNo cars available for rent.")
+            logger.info("No cars available for rent.")
             return
 
-        print(f"\n{'=' * 50}")
-        print(f"Available Cars at {self.name}")
-        print(f"{'=' * 50}")
-
+        lines = [f"Available Cars at {self.name}", "=" * 50]
         for car in available_cars:
-            print(f"{car.registration} - {car.brand} {car.model} ({car.year})")
-
-        print(f"{'=' * 50}")
-        print(f"Total available: {len(available_cars)}")
+            lines.append(f"{car.registration} - {car.brand} {car.model} ({car.year})")
+        lines += ["=" * 50, f"Total available: {len(available_cars)}"]
+        logger.info("\n".join(lines))
 
     def display_all_cars(self):
-        """Display all cars in the fleet with their status."""
+        """Log all cars in the fleet with their status, as one INFO record."""
         if not self.cars:
-            print("\nNo cars in the fleet.")
+            logger.info("No cars in the fleet.")
             return
 
-        print(f"\n{'=' * 50}")
-        print(f"All Cars at {self.name}")
-        print(f"{'=' * 50}")
-
+        lines = [f"All Cars at {self.name}", "=" * 50]
         for car in self.cars:
             status = "Available" if car.is_available() else "Rented"
-            print(
+            lines.append(
                 f"{car.registration} - {car.brand} {car.model} ({car.year}) - [{status}]"
             )
-
-        print(f"{'=' * 50}")
-        print(f"Total cars: {len(self.cars)}")
+        lines += ["=" * 50, f"Total cars: {len(self.cars)}"]
+        logger.info("\n".join(lines))
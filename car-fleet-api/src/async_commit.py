@@ -0,0 +1,165 @@
+"""
+Async Commit module
+Commits changes on a writer thread so ASGI requests wait for durability
+without holding a thread or blocking the event loop
+"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .commit import commit_outcome, tracking_changes
+from .service import PERSISTENCE_ERROR
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+logger = logging.getLogger(__name__)
+
+# Methods that never change the fleet
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AsyncGroupCommit:
+    """Runs a blocking commit function on one writer thread for asyncio callers."""
+
+    def __init__(self, commit: Callable[[], tuple[bool, Optional[str]]]):
+        """
+        Initialize the AsyncGroupCommit.
+
+        Args:
+            commit (Callable): Makes all changes so far durable and returns
+                (success, error_message)
+        """
+        self._commit = commit
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="fleet-writer"
+        )
+        self._waiters: List[asyncio.Future] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    async def commit(self) -> tuple[bool, Optional[str]]:
+        """
+        Wait until every change made before this call is durable.
+
+        Callers arriving while a commit is running share the next one, so a
+        burst of changes costs one write however many requests made it.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message) of the commit
+        """
+        if self._writer is None:
+            # Started lazily, as the event loop only exists once serving begins
+            self._wakeup = asyncio.Event()
+            self._writer = asyncio.create_task(self._write_loop())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._wakeup.set()
+        return await waiter
+
+    async def close(self) -> None:
+        """Finish pending commits and stop the writer thread."""
+        if self._writer is not None:
+            if self._waiters:
+                await self.commit()
+            self._writer.cancel()
+            self._writer = None
+        self._executor.shutdown(wait=True)
+
+    async def _write_loop(self) -> None:
+        """Commit on the writer thread whenever callers are waiting."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            waiters, self._waiters = self._waiters, []
+
+            try:
+                result = await loop.run_in_executor(self._executor, self._commit)
+            except Exception as e:
+                result = (False, f"Error committing changes: {str(e)}")
+            if not result[0]:
+                logger.error("%s: %s", PERSISTENCE_ERROR, result[1])
+
+            for waiter in waiters:
+                if not waiter.done():  # Cancelled if the client went away
+                    waiter.set_result(result)
+
+
+class DurableWritesMiddleware:
+    """ASGI middleware that sends write responses once their changes are durable."""
+
+    def __init__(self, app: ASGIApp, committer: AsyncGroupCommit):
+        """
+        Initialize the DurableWritesMiddleware.
+
+        Args:
+            app (ASGIApp): The app to wrap; it must not commit changes itself
+            committer (AsyncGroupCommit): Commits the changes the app makes
+        """
+        self.app = app
+        self.committer = committer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle one ASGI connection."""
+        if scope["type"] == "lifespan":
+            await self.app(scope, self._closing_on_shutdown(receive), send)
+            return
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffering the response lets the app's thread go as soon as the change
+        # is in memory; the wait for the commit happens here, on the event loop
+        messages: List[Message] = []
+
+        async def buffer(message: Message) -> None:
+            messages.append(message)
+
+        # The app's thread runs in a copy of this context, so the changes it
+        # makes are reported to this request
+        with tracking_changes() as changes:
+            await self.app(scope, receive, buffer)
+
+        # Rejected requests leave the fleet unchanged, so there is nothing to
+        # commit; a server error may come after some cars of a batch changed
+        if messages and not 400 <= messages[0].get("status", 500) < 500:
+            success, error = commit_outcome(changes, await self.committer.commit())
+            if not success:
+                messages = self._error_response(f"{PERSISTENCE_ERROR}: {error}")
+        for message in messages:
+            await send(message)
+
+    @staticmethod
+    def _error_response(error: str) -> List[Message]:
+        """Build the messages of a 500 JSON response reporting an error."""
+        body = json.dumps({"success": False, "error": error}).encode()
+        return [
+            {
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            },
+            {"type": "http.response.body", "body": body},
+        ]
+
+    def _closing_on_shutdown(self, receive: Receive) -> Receive:
+        """Wrap a lifespan receive so shutdown finishes pending commits first."""
+
+        async def receive_lifespan() -> Message:
+            message = await receive()
+            if message["type"] == "lifespan.shutdown":
+                await self.committer.close()
+            return message
+
+        return receive_lifespan
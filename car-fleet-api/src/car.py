@@ -3,10 +3,17 @@ Car class module
 Represents a car in the rental fleet
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 class Car:
     """Represents a car in the rental fleet."""
 
+    # No per-instance __dict__: large fleets need a fraction of the memory
+    __slots__ = ("brand", "model", "year", "registration", "availability")
+
     def __init__(self, brand, model, year, registration):
         """
         Initialize a Car object.
@@ -24,15 +31,16 @@ class Car:
         self.availability = True
 
     def display_details(self):
-        """Display the car's information."""
+        """Log the car's information, as one INFO record."""
         status = "Available" if self.availability else "Rented"
-        print(f"\n{'=' * 50}")
-        print(f"Registration: {self.registration}")
-        print(f"Brand: {self.brand}")
-        print(f"Model: {self.model}")
-        print(f"Year: {self.year}")
-        print(f"Status: {status}")
-        print(f"{'=' * 50}")
+        logger.info(
+            "Registration: %s\nBrand: %s\nModel: %s\nYear: %s\nStatus: %s",
+            self.registration,
+            self.brand,
+            self.model,
+            self.year,
+            status,
+        )
 
     def is_available(self):
         """
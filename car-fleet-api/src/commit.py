@@ -0,0 +1,160 @@
+"""
+Group Commit module
+Coalesces concurrent durability requests so a burst of changes pays for one fsync
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class TrackedChange:
+    """A change made in memory before it was committed, and how to undo it."""
+
+    __slots__ = ("registration", "undo", "error")
+
+    def __init__(self, registration: str, undo: Callable[[], Any]):
+        self.registration = registration
+        self.undo = undo
+        # Set if the commit meant to hold the change failed and it was undone
+        self.error: Optional[str] = None
+
+
+# The changes made by the current caller, when it asked for them to be tracked.
+# Context variables follow the caller onto the thread an ASGI server runs it on.
+_tracked_changes: ContextVar[Optional[List[TrackedChange]]] = ContextVar(
+    "tracked_changes", default=None
+)
+
+
+@contextmanager
+def tracking_changes() -> Iterator[List[TrackedChange]]:
+    """
+    Collect the changes a storage backend reports while in this context.
+
+    A nested context adds to the list of the outer one.
+
+    Yields:
+        List[TrackedChange]: The changes made so far, oldest first
+    """
+    changes = _tracked_changes.get()
+    if changes is not None:
+        yield changes
+        return
+
+    changes = []
+    token = _tracked_changes.set(changes)
+    try:
+        yield changes
+    finally:
+        _tracked_changes.reset(token)
+
+
+def track_change(change: TrackedChange) -> None:
+    """Report a change to the caller tracking its changes, if any."""
+    changes = _tracked_changes.get()
+    if changes is not None:
+        changes.append(change)
+
+
+def commit_outcome(
+    changes: List[TrackedChange], result: tuple[bool, Optional[str]]
+) -> tuple[bool, Optional[str]]:
+    """
+    Judge a commit by the changes one caller made, rather than by the batch.
+
+    Once a commit has returned, every change made before it has been kept or
+    undone. A caller whose changes were all kept succeeded even if its batch
+    failed; without tracked changes, the batch's result is all there is.
+
+    Args:
+        changes (List[TrackedChange]): The caller's changes
+        result (tuple[bool, Optional[str]]): (success, error_message) of the
+            commit the caller waited for
+
+    Returns:
+        tuple[bool, Optional[str]]: (success, error_message) for the caller
+    """
+    if not changes:
+        return result
+    for change in changes:
+        if change.error is not None:
+            return False, change.error
+    return True, None
+
+
+class _Batch:
+    """The callers sharing one commit, and its outcome once it is done."""
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = False
+        self.result: tuple[bool, Optional[str]] = (False, "Commit did not complete")
+
+
+class GroupCommit:
+    """Batches concurrent commit requests into a single call to a commit function."""
+
+    def __init__(
+        self,
+        commit: Callable[[], tuple[bool, Optional[str]]],
+        window: float = 0.0,
+    ):
+        """
+        Initialize the GroupCommit.
+
+        Args:
+            commit (Callable): Makes all changes so far durable and returns
+                (success, error_message)
+            window (float): Seconds the leading caller waits for others to join
+                its batch before committing; 0 commits immediately
+        """
+        self._commit = commit
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending = _Batch()
+        self._leader = False
+
+    def commit(self) -> tuple[bool, Optional[str]]:
+        """
+        Block until every change made before this call is durable.
+
+        Callers join the pending batch. The first becomes the leader and
+        commits on behalf of everyone who joins before it starts; later callers
+        join the next batch. Each caller reports its own batch's outcome, even
+        if further batches complete before it wakes.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message) of the batch
+        """
+        with self._cond:
+            batch = self._pending
+            while not batch.done:
+                if not self._leader:
+                    self._leader = True
+                    break
+                self._cond.wait()
+            else:
+                return batch.result
+
+        # Only the leader replaces the pending batch, so it is still ours
+        result: tuple[bool, Optional[str]] = (False, "Commit did not complete")
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self._cond:
+                self._pending = _Batch()
+            result = self._commit()
+        finally:
+            with self._cond:
+                if self._pending is batch:
+                    self._pending = _Batch()
+                batch.result = result
+                batch.done = True
+                self._leader = False
+                self._cond.notify_all()
+
+        return result
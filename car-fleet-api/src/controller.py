@@ -3,11 +3,28 @@ Rental Controller module
 Controller layer that handles HTTP requests and responses for car rental operations
 """
 
-from typing import Any, Tuple
+import json
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
 
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 
-from .service import CarsRentalService
+from .metrics import FLEET_CARS, REGISTRY
+from .response_cache import ResponseCache
+from .serialization import CAR_FIELDS
+from .service import PERSISTENCE_ERROR, CarsRentalService
+
+# Page size bounds for paginated car listings
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+# Largest batch accepted by the bulk endpoints
+MAX_BATCH_SIZE = 10_000
+
+# Export formats and their content types
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 class RentalController:
@@ -21,6 +38,7 @@ class RentalController:
             rental_service (CarsRentalService): The service instance to use
         """
         self.rental_service = rental_service
+        self.response_cache = ResponseCache()
 
     def get_home(self) -> Tuple[Any, int]:
         """
@@ -36,39 +54,303 @@ class RentalController:
                 "agency": self.rental_service.get_agency_name(),
                 "endpoints": {
                     "GET /": "API information",
-                    "GET /api/cars": "Get all cars",
-                    "GET /api/cars/available": "Get available cars",
+                    "GET /api/cars": "Get all cars (filter, page)",
+                    "GET /api/cars/available": "Get available cars (filter, page)",
+                    "GET /api/cars/export": "Stream all cars as NDJSON or JSON",
                     "GET /api/cars/<registration>": "Get car details",
                     "POST /api/cars": "Add a new car",
+                    "POST /api/cars/batch": "Add many cars",
                     "PUT /api/cars/<registration>/rent": "Rent a car",
                     "PUT /api/cars/<registration>/return": "Return a car",
+                    "PUT /api/cars/batch/rent": "Rent many cars",
+                    "PUT /api/cars/batch/return": "Return many cars",
                     "DELETE /api/cars/<registration>": "Delete a car",
                     "GET /api/stats": "Get fleet statistics",
+                    "GET /metrics": "Prometheus metrics",
                 },
             }
         ), 200
 
     def get_all_cars(self) -> Tuple[Any, int]:
         """
-        Get all cars in the fleet.
+        Get all cars in the fleet, optionally filtered by query parameters.
+
+        Passing limit or cursor returns one page ordered by registration.
 
         Returns:
             Tuple[Any, int]: JSON response and status code
         """
-        cars = self.rental_service.get_all_cars()
-        return jsonify({"success": True, "count": len(cars), "cars": cars}), 200
+        return self._cached(self._get_all_cars, self._list_query())
+
+    def _get_all_cars(self) -> Tuple[Any, int]:
+        """Build the get_all_cars response."""
+        filters, error = self._car_filters()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        return self._list_cars(filters, available_only=False)
 
     def get_available_cars(self) -> Tuple[Any, int]:
         """
-        Get all available cars.
+        Get all available cars, optionally filtered by query parameters.
+
+        Passing limit or cursor returns one page ordered by registration.
 
         Returns:
             Tuple[Any, int]: JSON response and status code
         """
-        available_cars = self.rental_service.get_available_cars()
-        return jsonify(
-            {"success": True, "count": len(available_cars), "cars": available_cars}
-        ), 200
+        return self._cached(self._get_available_cars, self._list_query())
+
+    def _get_available_cars(self) -> Tuple[Any, int]:
+        """Build the get_available_cars response."""
+        filters, error = self._car_filters()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        filters.pop("available", None)
+        return self._list_cars(filters, available_only=True)
+
+    def _cached(
+        self, build: Callable[[], Tuple[Any, int]], query: Optional[Hashable] = ()
+    ) -> Tuple[Any, int]:
+        """
+        Serve a read endpoint from the response cache, with ETag support.
+
+        The body is rebuilt only when the fleet version has changed since it
+        was cached; clients sending a matching If-None-Match get 304.
+
+        Args:
+            build (Callable[[], Tuple[Any, int]]): Builds the response and status
+            query (Optional[Hashable]): The parsed query the response depends
+                on, or None if it is invalid and the response not worth caching
+
+        Returns:
+            Tuple[Any, int]: JSON response (possibly 304) and status code
+        """
+        if query is None:
+            return build()
+
+        # Read the version first: a change made while building makes the
+        # cached body newer than its version, never older
+        version = self.rental_service.get_fleet_version()
+        key = (request.endpoint, query)
+        entry = self.response_cache.get(key, version)
+
+        if entry is None:
+            response, status = build()
+            if status != 200:
+                return response, status
+            entry = self.response_cache.put(
+                key, version, response.get_data(), response.mimetype
+            )
+
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        # Let clients keep the body but revalidate it on every use
+        response.headers["Cache-Control"] = "no-cache"
+        response.make_conditional(request)
+        return response, response.status_code
+
+    def _list_query(self) -> Optional[Tuple[Any, ...]]:
+        """
+        Parse the query of a car listing into a response cache key.
+
+        Parameters the listing ignores, their order and repeats are left out,
+        so URLs asking for the same cars share one cached body.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: (filters, fields, page), or None if the
+                query is invalid
+        """
+        filters, error = self._car_filters()
+        fields, fields_error = self._car_fields()
+        if error or fields_error:
+            return None
+
+        page = None
+        if "limit" in request.args or "cursor" in request.args:
+            try:
+                limit = int(request.args.get("limit", DEFAULT_PAGE_LIMIT))
+            except ValueError:
+                return None
+            page = (limit, request.args.get("cursor"))
+        return tuple(sorted(filters.items())), fields and tuple(fields), page
+
+    def _list_cars(
+        self, filters: Dict[str, Any], available_only: bool
+    ) -> Tuple[Any, int]:
+        """
+        Build a car list response, paginated if limit or cursor is given.
+
+        Args:
+            filters (Dict[str, Any]): Filters parsed by _car_filters
+            available_only (bool): Only list available cars
+
+        Returns:
+            Tuple[Any, int]: JSON response and status code
+        """
+        fields, error = self._car_fields()
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        if "limit" not in request.args and "cursor" not in request.args:
+            if available_only:
+                count, cars_json = self.rental_service.get_available_cars_json(
+                    fields, **filters
+                )
+            else:
+                count, cars_json = self.rental_service.get_all_cars_json(
+                    fields, **filters
+                )
+            return self._cars_response(count, cars_json), 200
+
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            return jsonify(
+                {
+                    "success": False,
+                    "error": f"Invalid limit value: {request.args['limit']} "
+                    f"(expected 1 to {MAX_PAGE_LIMIT})",
+                }
+            ), 400
+
+        if available_only:
+            filters["available"] = True
+        count, cars_json, next_cursor = self.rental_service.get_cars_page_json(
+            request.args.get("cursor"), limit, fields, **filters
+        )
+        return self._cars_response(count, cars_json, next_cursor, paginated=True), 200
+
+    def _cars_response(
+        self,
+        count: int,
+        cars_json: str,
+        next_cursor: Optional[str] = None,
+        paginated: bool = False,
+    ) -> Any:
+        """
+        Wrap a pre-encoded JSON array of cars in the usual list response.
+
+        The body matches what jsonify would produce, without building a dict
+        per car first.
+
+        Args:
+            count (int): Number of cars in the array
+            cars_json (str): JSON array text of the cars
+            next_cursor (Optional[str]): Cursor for the next page, if any
+            paginated (bool): Include next_cursor (null on the last page)
+
+        Returns:
+            Any: The JSON response
+        """
+        if paginated:
+            body = (
+                f'{{"cars":{cars_json},"count":{count},'
+                f'"next_cursor":{json.dumps(next_cursor)},"success":true}}\n'
+            )
+        else:
+            body = f'{{"cars":{cars_json},"count":{count},"success":true}}\n'
+        return current_app.response_class(body, mimetype="application/json")
+
+    def export_cars(self) -> Tuple[Any, int]:
+        """
+        Stream the fleet, optionally filtered, in registration order.
+
+        format=ndjson (default) writes one car per line; format=json writes the
+        usual list response as a chunked JSON array. Cars are encoded a chunk
+        at a time as the response is sent, so memory use does not grow with
+        the fleet.
+
+        Returns:
+            Tuple[Any, int]: Streaming response and status code
+        """
+        export_format = request.args.get("format", "ndjson")
+        filters, error = self._car_filters()
+        if not error:
+            fields, error = self._car_fields()
+        if not error and export_format not in EXPORT_FORMATS:
+            error = f"Invalid format value: {export_format}"
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        chunks = self.rental_service.iter_cars_json(fields, **filters)
+        if export_format == "ndjson":
+            body = ("\n".join(chunk) + "\n" for chunk in chunks)
+        else:
+            body = self._stream_cars_response(chunks)
+        mimetype = EXPORT_FORMATS[export_format]
+        return current_app.response_class(body, mimetype=mimetype), 200
+
+    @staticmethod
+    def _stream_cars_response(chunks: Iterator[List[str]]) -> Iterator[str]:
+        """
+        Write the usual list response around a stream of car chunks.
+
+        Args:
+            chunks (Iterator[List[str]]): JSON object texts of cars, per chunk
+
+        Yields:
+            str: Pieces of the response body
+        """
+        yield '{"cars":['
+        count = 0
+        for chunk in chunks:
+            yield ("," if count else "") + ",".join(chunk)
+            count += len(chunk)
+        yield f'],"count":{count},"success":true}}\n'
+
+    def _car_fields(self) -> Tuple[Optional[List[str]], Optional[str]]:
+        """
+        Read the car field projection from the query string.
+
+        Returns:
+            Tuple[Optional[List[str]], Optional[str]]: (fields or None for all
+                fields, error_message)
+        """
+        if "fields" not in request.args:
+            return None, None
+
+        fields = [f.strip() for f in request.args["fields"].split(",") if f.strip()]
+        if not fields or any(field not in CAR_FIELDS for field in fields):
+            return None, (
+                f"Invalid fields value: {request.args['fields']} "
+                f"(expected some of: {', '.join(CAR_FIELDS)})"
+            )
+        return fields, None
+
+    def _car_filters(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Read car filters from the query string.
+
+        Supported parameters are brand, model, year_min, year_max and
+        available (true/false).
+
+        Returns:
+            Tuple[Dict[str, Any], Optional[str]]: (filters, error_message)
+        """
+        filters: Dict[str, Any] = {}
+
+        for name in ("brand", "model"):
+            if name in request.args:
+                filters[name] = request.args[name]
+
+        for name in ("year_min", "year_max"):
+            if name in request.args:
+                try:
+                    filters[name] = int(request.args[name])
+                except ValueError:
+                    return {}, f"Invalid {name} value: {request.args[name]}"
+
+        if "available" in request.args:
+            value = request.args["available"].lower()
+            if value not in ("true", "false", "1", "0"):
+                return {}, f"Invalid available value: {request.args['available']}"
+            filters["available"] = value in ("true", "1")
+
+        return filters, None
 
     def get_car(self, registration: str) -> Tuple[Any, int]:
         """
@@ -128,7 +410,8 @@ class RentalController:
                     }
                 ), 201
             else:
-                return jsonify({"success": False, "error": error}), 400
+                status_code = self._error_status(error)
+                return jsonify({"success": False, "error": error}), status_code
 
         except ValueError:
             return jsonify(
@@ -158,9 +441,7 @@ class RentalController:
                 }
             ), 200
 
-        # Determine status code based on error
-        status_code = 404 if "not found" in error.lower() else 400
-        return jsonify({"success": False, "error": error}), status_code
+        return jsonify({"success": False, "error": error}), self._error_status(error)
 
     def return_car(self, registration: str) -> Tuple[Any, int]:
         """
@@ -183,9 +464,109 @@ class RentalController:
                 }
             ), 200
 
-        # Determine status code based on error
-        status_code = 404 if "not found" in error.lower() else 400
-        return jsonify({"success": False, "error": error}), status_code
+        return jsonify({"success": False, "error": error}), self._error_status(error)
+
+    def add_cars(self) -> Tuple[Any, int]:
+        """
+        Add a batch of cars from {"cars": [...]}.
+
+        Returns:
+            Tuple[Any, int]: JSON response with per-car results and status code
+        """
+        cars, error = self._batch_items("cars")
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        return self._batch_response(self.rental_service.add_cars(cars))
+
+    def rent_cars(self) -> Tuple[Any, int]:
+        """
+        Rent a batch of cars from {"registrations": [...]}.
+
+        Returns:
+            Tuple[Any, int]: JSON response with per-car results and status code
+        """
+        registrations, error = self._batch_items("registrations")
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        return self._batch_response(self.rental_service.rent_cars(registrations))
+
+    def return_cars(self) -> Tuple[Any, int]:
+        """
+        Return a batch of cars from {"registrations": [...]}.
+
+        Returns:
+            Tuple[Any, int]: JSON response with per-car results and status code
+        """
+        registrations, error = self._batch_items("registrations")
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        return self._batch_response(self.rental_service.return_cars(registrations))
+
+    def _batch_items(self, key: str) -> Tuple[List[Any], Optional[str]]:
+        """
+        Read the list of items of a batch request body.
+
+        Args:
+            key (str): Name of the list in the JSON body
+
+        Returns:
+            Tuple[List[Any], Optional[str]]: (items, error_message)
+        """
+        data = request.get_json(silent=True)
+        items = data.get(key) if isinstance(data, dict) else None
+
+        if not isinstance(items, list):
+            return [], f'Request body must be a JSON object with a "{key}" array'
+        if not items:
+            return [], f'"{key}" must not be empty'
+        if len(items) > MAX_BATCH_SIZE:
+            return [], f"Batches are limited to {MAX_BATCH_SIZE} items"
+        return items, None
+
+    def _batch_response(self, results: List[Dict[str, Any]]) -> Tuple[Any, int]:
+        """
+        Summarise per-item batch results.
+
+        Args:
+            results (List[Dict[str, Any]]): One result per item, in order
+
+        Returns:
+            Tuple[Any, int]: JSON response and status code
+        """
+        succeeded = sum(1 for result in results if result["success"])
+        # Changes the server could not save make the batch a server error
+        lost = any(
+            self._error_status(result["error"]) == 500
+            for result in results
+            if not result["success"]
+        )
+        return jsonify(
+            {
+                "success": succeeded == len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results,
+            }
+        ), 500 if lost else 200
+
+    @staticmethod
+    def _error_status(error: str) -> int:
+        """
+        Choose the status code for a change the service refused.
+
+        Args:
+            error (str): The service's error message
+
+        Returns:
+            int: 500 if the change could not be persisted, 404 if the car does
+                not exist, 400 otherwise
+        """
+        if error.startswith(PERSISTENCE_ERROR):
+            return 500
+        return 404 if "not found" in error.lower() else 400
 
     def delete_car(self, registration: str) -> Tuple[Any, int]:
         """
@@ -208,7 +589,7 @@ class RentalController:
                 }
             ), 200
 
-        return jsonify({"success": False, "error": error}), 404
+        return jsonify({"success": False, "error": error}), self._error_status(error)
 
     def get_stats(self) -> Tuple[Any, int]:
         """
@@ -217,5 +598,23 @@ class RentalController:
         Returns:
             Tuple[Any, int]: JSON response and status code
         """
+        return self._cached(self._get_stats)
+
+    def _get_stats(self) -> Tuple[Any, int]:
+        """Build the get_stats response."""
         stats = self.rental_service.get_fleet_stats()
         return jsonify({"success": True, "stats": stats}), 200
+
+    def get_metrics(self) -> Tuple[Any, int]:
+        """
+        Get request, service and persistence metrics in the Prometheus format.
+
+        Returns:
+            Tuple[Any, int]: Text response and status code
+        """
+        total_cars, available_cars = self.rental_service.get_fleet_counts()
+        FLEET_CARS.set(available_cars, "available")
+        FLEET_CARS.set(total_cars - available_cars, "rented")
+
+        body = REGISTRY.render()
+        return current_app.response_class(body, content_type=METRICS_CONTENT_TYPE), 200
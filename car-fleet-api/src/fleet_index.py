@@ -0,0 +1,264 @@
+"""
+Fleet Index module
+Secondary indexes over the fleet so filtered queries only touch matching cars
+"""
+
+import heapq
+import sys
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional
+
+from .car import Car
+
+
+class FleetIndex:
+    """Brand, model, year and availability indexes over an agency's cars."""
+
+    # Cars are numbered in insertion order and every bucket maps that sequence
+    # number to the car. Brand, model and year buckets only change on
+    # add/remove, so they stay in fleet order; results drawn from several
+    # buckets or from an availability bucket are put back in order by number.
+
+    def __init__(self, cars: Iterable[tuple[str, Car]] = ()):
+        """
+        Initialize a FleetIndex.
+
+        Args:
+            cars (Iterable[tuple[str, Car]]): (key, car) pairs to index, in
+                fleet order
+        """
+        self._seq: Dict[str, int] = {}  # key -> sequence number
+        self._next = 0
+        self._all: Dict[int, Car] = {}
+        self._brands: Dict[str, Dict[int, Car]] = {}  # casefolded brand
+        self._models: Dict[str, Dict[int, Car]] = {}  # casefolded model
+        self._years: Dict[int, Dict[int, Car]] = {}
+        self._sorted_years: List[int] = []  # distinct years, ascending
+        self._availability: Dict[bool, Dict[int, Car]] = {True: {}, False: {}}
+
+        for key, car in cars:
+            self._add(key, car)
+        # Keys in ascending order, for registration-keyed pagination
+        self._sorted_keys: List[str] = sorted(self._seq)
+
+    def add(self, key: str, car: Car) -> None:
+        """
+        Index a car newly added to the fleet.
+
+        Args:
+            key (str): The car's index key (normalised registration)
+            car (Car): The car to index
+        """
+        self._add(key, car)
+        insort(self._sorted_keys, key)
+
+    def _add(self, key: str, car: Car) -> None:
+        """Index a car everywhere but the sorted key list."""
+        seq = self._seq[key] = self._next
+        self._next += 1
+        self._all[seq] = car
+        self._brands.setdefault(car.brand.casefold(), {})[seq] = car
+        self._models.setdefault(car.model.casefold(), {})[seq] = car
+        if car.year not in self._years:
+            self._years[car.year] = {}
+            insort(self._sorted_years, car.year)
+        self._years[car.year][seq] = car
+        self._availability[bool(car.availability)][seq] = car
+
+    def remove(self, key: str, car: Car) -> None:
+        """
+        Drop a car removed from the fleet.
+
+        Args:
+            key (str): The car's index key (normalised registration)
+            car (Car): The car to drop
+        """
+        seq = self._seq.pop(key)
+        del self._all[seq]
+        del self._sorted_keys[bisect_left(self._sorted_keys, key)]
+        self._discard(self._brands, car.brand.casefold(), seq)
+        self._discard(self._models, car.model.casefold(), seq)
+        if self._discard(self._years, car.year, seq):
+            del self._sorted_years[bisect_left(self._sorted_years, car.year)]
+        self._availability[bool(car.availability)].pop(seq, None)
+
+    def update_availability(self, key: str, car: Car) -> None:
+        """
+        Move a car to the availability bucket matching its current state.
+
+        Args:
+            key (str): The car's index key (normalised registration)
+            car (Car): The car whose availability just changed
+        """
+        seq = self._seq[key]
+        self._availability[not car.availability].pop(seq, None)
+        self._availability[bool(car.availability)][seq] = car
+
+    def query(
+        self,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """
+        Find the cars matching every given condition, in fleet order.
+
+        Candidates come from the most selective index; the other conditions
+        are checked per candidate, so the cost follows that index's size
+        rather than the fleet's.
+
+        Args:
+            brand (Optional[str]): Brand to match (case-insensitive)
+            model (Optional[str]): Model to match (case-insensitive)
+            year_min (Optional[int]): Earliest year, inclusive
+            year_max (Optional[int]): Latest year, inclusive
+            available (Optional[bool]): Availability to match
+
+        Returns:
+            List[Car]: The matching cars
+        """
+        sources = self._sources(brand, model, year_min, year_max, available)
+        if not sources:
+            return list(self._all.values())
+
+        # Draw candidates from the smallest source, then intersect with the
+        # others by sequence number so no car attributes are compared
+        chosen = min(sources, key=lambda name: self._size(sources[name]))
+        buckets, ordered = sources.pop(chosen)
+        seqs = [seq for bucket in buckets for seq in bucket]
+        seqs = self._intersect(seqs, sources, year_min, year_max)
+
+        if not ordered:
+            seqs.sort()
+        return [self._all[seq] for seq in seqs]
+
+    def page(
+        self,
+        after: Optional[str],
+        limit: int,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """
+        Find matching cars ordered by key, starting after a given key.
+
+        Pages walk the sorted key list from the cursor, checking filters as
+        they go, unless the filters are selective enough that collecting all
+        matches through query() is cheaper.
+
+        Args:
+            after (Optional[str]): Only return cars whose key sorts after this
+            limit (int): Maximum number of cars to return
+            brand, model, year_min, year_max, available: As for query()
+
+        Returns:
+            List[Car]: Up to `limit` matching cars, in ascending key order
+        """
+        sources = self._sources(brand, model, year_min, year_max, available)
+        keys = self._sorted_keys
+        start = 0 if after is None else bisect_right(keys, after)
+
+        if not sources:
+            return [self._all[self._seq[key]] for key in keys[start : start + limit]]
+
+        # Walking visits about limit * fleet / matches keys per page, while
+        # query() visits every candidate of the smallest index
+        estimate = min(self._size(source) for source in sources.values())
+        if estimate * estimate <= limit * len(keys):
+            matches = self.query(brand, model, year_min, year_max, available)
+            if after is not None:
+                matches = [car for car in matches if car.registration.upper() > after]
+            return heapq.nsmallest(
+                limit, matches, key=lambda car: car.registration.upper()
+            )
+
+        seqs: List[int] = []
+        while start < len(keys) and len(seqs) < limit:
+            batch = [self._seq[key] for key in keys[start : start + limit]]
+            seqs += self._intersect(batch, sources, year_min, year_max)
+            start += limit
+        return [self._all[seq] for seq in seqs[:limit]]
+
+    def _sources(
+        self,
+        brand: Optional[str],
+        model: Optional[str],
+        year_min: Optional[int],
+        year_max: Optional[int],
+        available: Optional[bool],
+    ) -> Dict[str, tuple[List[Dict[int, Car]], bool]]:
+        """
+        Look up the index buckets for each given condition.
+
+        Returns:
+            Dict[str, tuple[List[Dict[int, Car]], bool]]: Maps each condition to
+                (buckets holding every car that meets it, whether those buckets
+                are already in fleet order)
+        """
+        sources: Dict[str, tuple[List[Dict[int, Car]], bool]] = {}
+        if brand is not None:
+            sources["brand"] = ([self._brands.get(brand.casefold(), {})], True)
+        if model is not None:
+            sources["model"] = ([self._models.get(model.casefold(), {})], True)
+        if year_min is not None or year_max is not None:
+            low = 0 if year_min is None else bisect_left(self._sorted_years, year_min)
+            high = (
+                len(self._sorted_years)
+                if year_max is None
+                else bisect_right(self._sorted_years, year_max)
+            )
+            years = self._sorted_years[low:high]
+            sources["year"] = ([self._years[year] for year in years], len(years) <= 1)
+        if available is not None:
+            sources["available"] = ([self._availability[available]], False)
+        return sources
+
+    @staticmethod
+    def _size(source: tuple[List[Dict[int, Car]], bool]) -> int:
+        """Count the cars in a source's buckets."""
+        return sum(len(bucket) for bucket in source[0])
+
+    def _intersect(
+        self,
+        seqs: List[int],
+        sources: Dict[str, tuple[List[Dict[int, Car]], bool]],
+        year_min: Optional[int],
+        year_max: Optional[int],
+    ) -> List[int]:
+        """
+        Keep the sequence numbers of cars found in every source, in order.
+
+        Returns:
+            List[int]: The surviving sequence numbers
+        """
+        for name, (buckets, _) in sources.items():
+            if name == "year":
+                # Most year ranges span several buckets; the car's year is cheaper
+                low = year_min if year_min is not None else -sys.maxsize
+                high = year_max if year_max is not None else sys.maxsize
+                seqs = [seq for seq in seqs if low <= self._all[seq].year <= high]
+            else:
+                seqs = [seq for seq in seqs if seq in buckets[0]]
+        return seqs
+
+    @staticmethod
+    def _discard(index: Dict, value, seq: int) -> bool:
+        """
+        Remove a car from one bucket of an index, dropping the bucket if empty.
+
+        Returns:
+            bool: True if the bucket was dropped
+        """
+        bucket = index.get(value)
+        if bucket is None:
+            return False
+        bucket.pop(seq, None)
+        if not bucket:
+            del index[value]
+            return True
+        return False
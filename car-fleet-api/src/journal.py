@@ -0,0 +1,154 @@
+"""
+Fleet Journal module
+Append-only log of fleet mutations, periodically compacted into the JSON snapshot
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from .metrics import PERSISTENCE_WRITE_DURATION, PERSISTENCE_WRITTEN_BYTES
+
+
+class FleetJournal:
+    """Append-only journal of car mutations stored next to the JSON snapshot."""
+
+    # Each line is one compact record: {"op": "put", "car": {...}} with the full
+    # car state, or {"op": "del", "registration": ...}. Records carry state, not
+    # deltas, so replaying a journal over a snapshot that contains it is harmless.
+
+    def __init__(
+        self,
+        path: str,
+        max_records: int = 1000,
+        max_bytes: int = 4 * 1024 * 1024,
+    ):
+        """
+        Initialize the FleetJournal.
+
+        Args:
+            path (str): Path to the active journal file
+            max_records (int): Record count that triggers compaction
+            max_bytes (int): Journal size in bytes that triggers compaction
+        """
+        self.path = Path(path)
+        # Journal frozen by an in-flight compaction, replayed until it is done
+        self.rotated_path = self.path.with_name(self.path.name + ".1")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.bytes = 0
+        self._file = None
+
+    def exists(self) -> bool:
+        """Check whether any journal file is present on disk."""
+        return self.path.exists() or self.rotated_path.exists()
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield journal records, oldest first.
+
+        Lines that cannot be decoded (e.g. a write torn by a crash) are skipped.
+        Replaying also resets the size counters to match the active journal.
+
+        Yields:
+            Dict[str, Any]: The decoded journal records
+        """
+        self.records = 0
+        self.bytes = 0
+
+        for path in (self.rotated_path, self.path):
+            if not path.exists():
+                continue
+
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if path == self.path:
+                        self.records += 1
+                        self.bytes += len(line.encode())
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """
+        Append one record to the journal.
+
+        Args:
+            record (Dict[str, Any]): The record to append
+
+        Returns:
+            bool: True if the journal has grown past a compaction threshold
+        """
+        if self._file is None:
+            self._open()
+
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+
+        size = len(line.encode())
+        self.records += 1
+        self.bytes += size
+        PERSISTENCE_WRITTEN_BYTES.inc("journal", amount=size)
+        return self.needs_compaction()
+
+    def needs_compaction(self) -> bool:
+        """Check whether the journal has reached a compaction threshold."""
+        return self.records >= self.max_records or self.bytes >= self.max_bytes
+
+    def rotate(self) -> bool:
+        """
+        Freeze the active journal so a snapshot can supersede it.
+
+        Returns:
+            bool: True if rotated, False if a previous rotation is still pending
+        """
+        if self.rotated_path.exists():
+            return False
+
+        self.sync()
+        self.close()
+        if self.path.exists():
+            os.replace(self.path, self.rotated_path)
+
+        self.records = 0
+        self.bytes = 0
+        return True
+
+    def sync(self) -> None:
+        """Flush appended records to stable storage."""
+        if self._file is not None:
+            start = time.perf_counter()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            PERSISTENCE_WRITE_DURATION.observe(time.perf_counter() - start, "journal")
+
+    def discard_rotated(self) -> None:
+        """Delete the frozen journal once its snapshot is safely written."""
+        self.rotated_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close the active journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> None:
+        """Open the active journal for appending, repairing a torn last line."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        torn = False
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+
+        self._file = open(self.path, "a", encoding="utf-8")
+
+        # Terminate a partial record left by a crash so the next one is readable
+        if torn:
+            self._file.write("\n")
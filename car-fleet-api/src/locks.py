@@ -0,0 +1,62 @@
+"""
+Keyed Locks module
+Per-registration locks so operations on different cars never contend
+"""
+
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+
+
+class KeyedLocks:
+    """Hands out one lock per key, created on demand and dropped once unused."""
+
+    def __init__(self):
+        """Initialize the KeyedLocks."""
+        self._mutex = threading.Lock()
+        # key -> [lock, number of threads holding or waiting for it]
+        self._locks: dict[str, list] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        """
+        Hold the lock for a key for the duration of a with-block.
+
+        Args:
+            key (str): The key to lock, e.g. a normalised registration number
+        """
+        with self._mutex:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+
+        entry[0].acquire()
+        try:
+            yield
+        finally:
+            entry[0].release()
+            with self._mutex:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    @contextmanager
+    def hold_many(self, keys: Iterable[str]) -> Iterator[None]:
+        """
+        Hold the locks for several keys for the duration of a with-block.
+
+        Locks are taken in sorted order, so two overlapping batches cannot
+        deadlock each other or a single-key holder.
+
+        Args:
+            keys (Iterable[str]): The keys to lock; duplicates are ignored
+        """
+        with ExitStack() as stack:
+            for key in sorted(set(keys)):
+                stack.enter_context(self.hold(key))
+            yield
+
+    def __len__(self) -> int:
+        """Number of keys currently locked or waited on."""
+        return len(self._locks)
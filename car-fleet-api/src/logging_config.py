@@ -0,0 +1,93 @@
+"""
+Logging Configuration module
+Leveled, structured logging written by a background thread, so callers only
+pay for putting a record on a queue
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_FORMATS = ("json", "text")
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a record.
+
+        Args:
+            record (logging.LogRecord): The record to format
+
+        Returns:
+            str: One line of JSON
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = "INFO", log_format: str = "json") -> None:
+    """
+    Route all logging through a queue to a thread that writes to stdout.
+
+    Logging calls then only format the message and enqueue it; the write to
+    stdout happens on the listener thread. Calling this again, e.g. for a
+    second app in the same process, only changes the level.
+
+    Args:
+        level (str): Minimum level to log, e.g. "INFO" or "debug"
+        log_format (str): "json" for one JSON object per line, or "text"
+    """
+    global _listener
+
+    if log_format not in LOG_FORMATS:
+        raise ValueError(
+            f"Unknown log format {log_format!r}, "
+            f"expected one of: {', '.join(LOG_FORMATS)}"
+        )
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    # Stopping drains the queue, so records logged during shutdown are kept
+    atexit.register(_listener.stop)
@@ -0,0 +1,302 @@
+"""
+Metrics module
+Counters, gauges and histograms rendered in the Prometheus text format
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable)
+M = TypeVar("M", bound="Metric")
+
+# Upper bounds in seconds, from in-memory lookups to full snapshot writes
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    """A named metric with one value per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """
+        Initialize the Metric.
+
+        Args:
+            name (str): Metric name, e.g. car_fleet_http_requests_total
+            documentation (str): One-line description shown as HELP
+            labels (Sequence[str]): Label names; values are passed positionally
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def render(self) -> List[str]:
+        """
+        Render the metric as Prometheus text exposition lines.
+
+        Returns:
+            List[str]: HELP and TYPE lines followed by one line per sample
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+    def _samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """List (sample name, label pairs, value) for every series."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, self._pairs(key), value) for key, value in values]
+
+    def _pairs(self, values: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        """Pair label names with a series' label values."""
+        return tuple(zip(self.labels, values))
+
+
+class Counter(Metric):
+    """A value that only goes up, such as requests served."""
+
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Add to the counter.
+
+        Args:
+            *label_values (str): One value per label, in order
+            amount (float): How much to add
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down, such as requests in flight."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the gauge to a value."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Add to the gauge; pass a negative amount to subtract."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Histogram(Metric):
+    """Observations counted into buckets, such as request durations."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ):
+        """
+        Initialize the Histogram.
+
+        Args:
+            name (str): Metric name, e.g. car_fleet_http_request_duration_seconds
+            documentation (str): One-line description shown as HELP
+            labels (Sequence[str]): Label names; values are passed positionally
+            buckets (Sequence[float]): Bucket upper bounds, ascending
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # Per series: the count in each bucket, +Inf last, followed by the sum
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): The observed value, e.g. seconds taken
+            *label_values (str): One value per label, in order
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def timed(self, *label_values: str) -> Callable[[F], F]:
+        """
+        Decorate a function to observe how long each call takes.
+
+        Args:
+            *label_values (str): One value per label, in order
+
+        Returns:
+            Callable: The decorator
+        """
+
+        def decorator(func: F) -> F:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *label_values)
+
+            return wrapper
+
+        return decorator
+
+    def _samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """List bucket, sum and count samples for every series."""
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+
+        samples = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for key, values in series:
+            pairs = self._pairs(key)
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                samples.append(
+                    (f"{self.name}_bucket", pairs + (("le", bound),), cumulative)
+                )
+            samples.append((f"{self.name}_sum", pairs, values[-1]))
+            samples.append((f"{self.name}_count", pairs, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """The set of metrics exposed together at /metrics."""
+
+    def __init__(self):
+        """Initialize an empty MetricsRegistry."""
+        self._metrics: List[Metric] = []
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        """Create and register a Counter."""
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        """Create and register a Gauge."""
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Histogram:
+        """Create and register a Histogram with duration buckets."""
+        return self._register(Histogram(name, documentation, labels))
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition body, ending in a newline
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: M) -> M:
+        """Add a metric to the registry and return it."""
+        self._metrics.append(metric)
+        return metric
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Format label pairs as {name="value",...}."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, dropping the fraction of whole numbers."""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process-wide metrics, shared by every app and service in the process
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "car_fleet_http_requests_total",
+    "HTTP requests handled, by method, route and status code",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "car_fleet_http_request_duration_seconds",
+    "Time spent handling HTTP requests, by method and route",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "car_fleet_http_requests_in_flight",
+    "HTTP requests currently being handled",
+)
+SERVICE_CALL_DURATION = REGISTRY.histogram(
+    "car_fleet_service_call_duration_seconds",
+    "Time spent in rental service operations, including waits for durability",
+    ("operation",),
+)
+PERSISTENCE_WRITE_DURATION = REGISTRY.histogram(
+    "car_fleet_persistence_write_duration_seconds",
+    "Time spent writing and syncing the data files, by kind of write",
+    ("kind",),
+)
+PERSISTENCE_WRITTEN_BYTES = REGISTRY.counter(
+    "car_fleet_persistence_written_bytes_total",
+    "Bytes written to the data files, by kind of write",
+    ("kind",),
+)
+FLEET_CARS = REGISTRY.gauge(
+    "car_fleet_cars",
+    "Cars in the fleet, by state",
+    ("state",),
+)
+FLEET_RELOADS = REGISTRY.counter(
+    "car_fleet_reloads_total",
+    "Reloads of a data file changed on disk, by result",
+    ("result",),
+)
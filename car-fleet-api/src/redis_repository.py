@@ -0,0 +1,600 @@
+"""
+Redis Repository module
+Car storage shared by every replica through a Redis server, with a local read
+cache per replica that pub/sub messages keep up to date
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_right
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from redis import Redis
+from redis.client import PubSub
+from redis.exceptions import RedisError, WatchError
+
+from .agency import STAT_FIELDS
+from .car import Car
+from .repository import CarRepository, car_from_record, car_to_record
+
+logger = logging.getLogger(__name__)
+
+# Attempts at a compare-and-set before giving up, when other replicas keep
+# changing the same car in between
+MAX_CAS_ATTEMPTS = 50
+
+# Stats hash field holding the fleet totals, like car_stats' ('', '') row
+_FLEET_TOTALS = json.dumps(["", ""])
+
+# A Redis command and its arguments, as queued on a transaction
+Command = tuple[Any, ...]
+
+
+def connect_redis(url: str) -> Redis:
+    """
+    Connect to the Redis server a URL names.
+
+    Args:
+        url (str): redis://[[user]:password@]host[:port][/db], or rediss://
+            for TLS
+
+    Returns:
+        Redis: A client decoding replies to strings; connections are opened
+            on first use
+    """
+    return Redis.from_url(url, decode_responses=True)
+
+
+def describe_redis(redis: Redis) -> str:
+    """Describe the server a client talks to, without credentials."""
+    kwargs = redis.connection_pool.connection_kwargs
+    if "path" in kwargs:
+        return f"unix://{kwargs['path']}?db={kwargs.get('db', 0)}"
+    return (
+        f"redis://{kwargs.get('host', 'localhost')}:{kwargs.get('port', 6379)}"
+        f"/{kwargs.get('db', 0)}"
+    )
+
+
+class RedisCarRepository(CarRepository):
+    """Stores cars in Redis, caching reads until another replica changes them."""
+
+    # Keys, all under the prefix:
+    # - car:<REGISTRATION>: the stored car record, as JSON
+    # - registrations: sorted set of upper-cased registrations, all scored 0,
+    #   so pages are ZRANGEBYLEX ranges
+    # - order: the same registrations scored by `seq`, for insertion order
+    # - stats:total, stats:available: hashes of counts per [field, value]
+    # - version: change counter
+    # Every change is a WATCH/MULTI/EXEC transaction on the car's key that
+    # also updates the counters and version and publishes the registration on
+    # the changes channel, so each replica can drop it from its cache.
+
+    def __init__(
+        self,
+        redis: Redis,
+        seed_file: Optional[str] = None,
+        prefix: str = "car-fleet",
+        local_cache: bool = True,
+        ping_interval: float = 5.0,
+    ):
+        """
+        Initialize the RedisCarRepository.
+
+        Args:
+            redis (Redis): A client decoding replies to strings, e.g. from
+                connect_redis
+            seed_file (Optional[str]): JSON data file imported into a store that
+                has never held any cars, on load
+            prefix (str): Prefix of every key and channel, so several fleets can
+                share a Redis database
+            local_cache (bool): Cache reads in this process, relying on pub/sub
+                to learn of changes made by other replicas
+            ping_interval (float): Seconds of pub/sub silence after which the
+                server is pinged; the cache is dropped if it stays silent
+        """
+        self.redis = redis
+        self.seed_file = Path(seed_file) if seed_file else None
+        self.prefix = prefix
+        self.local_cache = local_cache
+        self.ping_interval = ping_interval
+        self._channel = f"{prefix}:changes"
+
+        # The cache is only used while the subscriber is connected, as it
+        # would miss changes otherwise. Loads that overlap an invalidation
+        # (a change to `_epoch`) are not stored, as they may predate it.
+        self._cache_lock = threading.Lock()
+        self._cache_ready = False
+        self._epoch = 0
+        self._cars: Dict[str, Car] = {}
+        self._fleet: Dict[str, Any] = {}  # Whole-fleet results, e.g. counts
+
+        self._closing = threading.Event()
+        self._subscription: Optional[PubSub] = None
+        self._listener: Optional[threading.Thread] = None
+
+    def load(self) -> tuple[bool, Optional[str]]:
+        """
+        Start following changes, seeding a new store from the JSON data file.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if self.local_cache and self._listener is None:
+            self._listener = threading.Thread(
+                target=self._listen, name="fleet-cache-invalidation", daemon=True
+            )
+            self._listener.start()
+
+        try:
+            if self.seed_file is not None and self.seed_file.exists():
+                with open(self.seed_file, "r") as f:
+                    data = json.load(f)
+                self._seed(data.get("cars", []))
+            else:
+                self.redis.ping()
+            return True, None
+        except json.JSONDecodeError as e:
+            return False, f"Invalid JSON format: {str(e)}"
+        except (RedisError, OSError) as e:
+            return False, f"Error connecting to {describe_redis(self.redis)}: {str(e)}"
+        except Exception as e:
+            return False, f"Error loading data: {str(e)}"
+
+    def save(self) -> tuple[bool, Optional[str]]:
+        """Every change is written to Redis as it happens; nothing to save."""
+        return True, None
+
+    def get(self, registration: str) -> Optional[Car]:
+        """
+        Look up a car, from the cache if possible.
+
+        Raises:
+            OSError: If the car is not cached and Redis cannot be reached
+        """
+        key = registration.upper()
+        with self._cache_lock:
+            car = self._cars.get(key)
+            epoch = self._epoch
+        if car is not None:
+            return car
+
+        try:
+            record = self.redis.get(self._key("car", key))
+        except RedisError as e:
+            raise OSError(f"Redis error: {str(e)}") from e
+        if record is None:
+            return None
+        car = car_from_record(json.loads(record))
+        with self._cache_lock:
+            if self._cache_ready and self._epoch == epoch:
+                self._cars[key] = car
+        return car
+
+    def all(self) -> List[Car]:
+        """Get every car in the fleet, in insertion order."""
+        return list(self._cached("fleet", self._load_fleet))
+
+    def available(self) -> List[Car]:
+        """Get every available car in the fleet."""
+        return self.find(available=True)
+
+    def find(
+        self,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Filter the cached fleet; Redis keeps no secondary indexes."""
+        matches = _matcher(brand, model, year_min, year_max, available)
+        return [car for car in self._cached("fleet", self._load_fleet) if matches(car)]
+
+    def find_page(
+        self,
+        after: Optional[str],
+        limit: int,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Page through the cached fleet, or the registrations set if uncached."""
+        filtered = any(
+            value is not None for value in (brand, model, year_min, year_max, available)
+        )
+        with self._cache_lock:
+            cached = "by_registration" in self._fleet
+        if not filtered and not cached:
+            # Reads only one page, so a cold replica answers at once
+            low = "-" if after is None else f"({after.upper()}"
+            keys = self.redis.zrangebylex(
+                self._key("registrations"), low, "+", start=0, num=limit
+            )
+            return self._load_cars(keys)
+
+        registrations, cars = self._cached("by_registration", self._load_sorted)
+        start = 0 if after is None else bisect_right(registrations, after.upper())
+        matches = _matcher(brand, model, year_min, year_max, available)
+        page: List[Car] = []
+        for car in islice(cars, start, None):
+            if matches(car):
+                page.append(car)
+                if len(page) == limit:
+                    break
+        return page
+
+    def counts(self) -> tuple[int, int]:
+        """Read the fleet totals kept by every change."""
+        return self._cached("counts", self._load_counts)
+
+    def breakdowns(self) -> Dict[str, Dict[Any, tuple[int, int]]]:
+        """Read the per-field counts kept by every change."""
+        breakdowns = self._cached("breakdowns", self._load_breakdowns)
+        return {field: dict(counts) for field, counts in breakdowns.items()}
+
+    def version(self) -> int:
+        """Read the change counter shared by every replica."""
+        return self._cached("version", self._load_version)
+
+    def add(self, car: Car) -> bool:
+        """
+        Add a car unless another replica already has its registration.
+
+        Raises:
+            OSError: If Redis cannot be reached or the change keeps conflicting
+        """
+        key = car.registration.upper()
+        record = car_to_record(car)
+
+        def insert(current: Optional[Dict[str, Any]]):
+            if current is not None:
+                return None, False
+            # Taken only for a car that is missing, so duplicates use no number
+            seq = self.redis.incr(self._key("seq"))
+            return [
+                ("SET", self._key("car", key), json.dumps(record)),
+                ("ZADD", self._key("registrations"), 0, key),
+                ("ZADD", self._key("order"), seq, key),
+                *self._stat_commands(record, 1, int(record["availability"])),
+            ], True
+
+        return self._compare_and_set(key, insert)
+
+    def set_availability(self, registration: str, availability: bool) -> Optional[Car]:
+        """
+        Rent or return a car, failing if any replica already did.
+
+        Raises:
+            OSError: If Redis cannot be reached or the change keeps conflicting
+        """
+        key = registration.upper()
+
+        def update(current: Optional[Dict[str, Any]]):
+            if current is None or current.get("availability", True) == availability:
+                return None, None
+            record = {**current, "availability": availability}
+            return [
+                ("SET", self._key("car", key), json.dumps(record)),
+                *self._stat_commands(record, 0, 1 if availability else -1),
+            ], car_from_record(record)
+
+        return self._compare_and_set(key, update)
+
+    def remove(self, registration: str) -> Optional[Car]:
+        """
+        Remove a car, returning what was removed.
+
+        Raises:
+            OSError: If Redis cannot be reached or the change keeps conflicting
+        """
+        key = registration.upper()
+
+        def delete(current: Optional[Dict[str, Any]]):
+            if current is None:
+                return None, None
+            return [
+                ("DEL", self._key("car", key)),
+                ("ZREM", self._key("registrations"), key),
+                ("ZREM", self._key("order"), key),
+                *self._stat_commands(
+                    current, -1, -int(current.get("availability", True))
+                ),
+            ], car_from_record(current)
+
+        return self._compare_and_set(key, delete)
+
+    def close(self) -> None:
+        """Stop following changes and close idle connections."""
+        self._closing.set()
+        subscription = self._subscription
+        if subscription is not None and subscription.connection is not None:
+            # Wakes the listener, which then closes the subscription itself
+            subscription.connection.disconnect()
+        if self._listener is not None:
+            self._listener.join()
+        self.redis.close()
+
+    def _key(self, *parts: str) -> str:
+        """Build a key under the prefix."""
+        return ":".join((self.prefix, *parts))
+
+    def _stat_commands(
+        self, record: Dict[str, Any], total: int, available: int
+    ) -> List[Command]:
+        """
+        Build the commands that adjust the counters for one car.
+
+        Args:
+            record (Dict[str, Any]): The car's stored record
+            total (int): Change to the number of cars
+            available (int): Change to the number of available cars
+
+        Returns:
+            List[Command]: HINCRBY commands for the fleet and each field
+        """
+        commands: List[Command] = []
+        fields = [_FLEET_TOTALS]
+        fields += [json.dumps([field, record[field]]) for field in STAT_FIELDS]
+        for name, amount in (("total", total), ("available", available)):
+            if amount:
+                stats = self._key("stats", name)
+                commands += [("HINCRBY", stats, field, amount) for field in fields]
+        return commands
+
+    def _compare_and_set(
+        self,
+        key: str,
+        change: Callable[[Optional[Dict[str, Any]]], tuple[Optional[list], Any]],
+    ) -> Any:
+        """
+        Change one car atomically, retrying if another replica changes it first.
+
+        Args:
+            key (str): The car's upper-cased registration
+            change (Callable): Given the car's current record, or None, returns
+                (commands to run, result) or (None, result) to change nothing
+
+        Returns:
+            Any: The result `change` returned for the state it was applied to
+
+        Raises:
+            OSError: If Redis fails, including when the car kept changing for
+                MAX_CAS_ATTEMPTS attempts, so the service reports it like any
+                other storage failure
+        """
+        car_key = self._key("car", key)
+        try:
+            for _ in range(MAX_CAS_ATTEMPTS):
+                with self.redis.pipeline() as pipe:
+                    try:
+                        pipe.watch(car_key)
+                        current = pipe.get(car_key)
+                        commands, result = change(
+                            json.loads(current) if current else None
+                        )
+                        if commands is None:
+                            return result  # Leaving the pipeline unwatches
+
+                        pipe.multi()
+                        for command in commands:
+                            pipe.execute_command(*command)
+                        pipe.incr(self._key("version"))
+                        pipe.publish(self._channel, key)
+                        pipe.execute()
+                    except WatchError:
+                        continue  # The car changed after WATCH; retry on its new state
+                self._invalidate(key)
+                return result
+        except RedisError as e:
+            raise OSError(f"Redis error: {str(e)}") from e
+        raise OSError(
+            f"Car {key} kept changing; gave up after {MAX_CAS_ATTEMPTS} attempts"
+        )
+
+    def _seed(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Import cars into a store that has never held any, in one transaction.
+
+        Replicas starting together may all try; the version key is watched,
+        so only the first to commit imports anything.
+
+        Args:
+            records (List[Dict[str, Any]]): Stored car records
+        """
+        version_key = self._key("version")
+        # Keyed by the upper-cased registration, which the records also take,
+        # as every lookup and change does
+        fleet = {
+            record["registration"].upper(): {
+                **car_to_record(car_from_record(record)),
+                "registration": record["registration"].upper(),
+            }
+            for record in records
+        }
+        with self.redis.pipeline() as pipe:
+            try:
+                pipe.watch(version_key)
+                if pipe.get(version_key) is not None or not fleet:
+                    return
+
+                pipe.multi()
+                totals: Counter = Counter()
+                for seq, (key, record) in enumerate(fleet.items(), start=1):
+                    pipe.set(self._key("car", key), json.dumps(record))
+                    pipe.zadd(self._key("registrations"), {key: 0})
+                    pipe.zadd(self._key("order"), {key: seq})
+                    for command in self._stat_commands(
+                        record, 1, int(record["availability"])
+                    ):
+                        totals[command[1], command[2]] += command[3]
+                for (stats, field), amount in totals.items():
+                    pipe.hincrby(stats, field, amount)
+                pipe.incrby(self._key("seq"), len(fleet))
+                pipe.incr(version_key)
+                pipe.publish(self._channel, "*")
+                pipe.execute()
+                logger.info(
+                    "Seeded %d cars into %s", len(fleet), describe_redis(self.redis)
+                )
+            except WatchError:
+                pass  # Another replica seeded the store first
+        self._reset_cache(self._cache_ready)
+
+    def _cached(self, name: str, load: Callable[[], Any]) -> Any:
+        """
+        Get a whole-fleet result from the cache, loading it on a miss.
+
+        Args:
+            name (str): The result's cache entry
+            load (Callable[[], Any]): Reads the result from Redis
+
+        Returns:
+            Any: The result, which callers must not modify
+        """
+        with self._cache_lock:
+            if name in self._fleet:
+                return self._fleet[name]
+            epoch = self._epoch
+
+        value = load()
+        with self._cache_lock:
+            if self._cache_ready and self._epoch == epoch:
+                self._fleet[name] = value
+        return value
+
+    def _invalidate(self, key: str) -> None:
+        """Drop one car, or every car for "*", and all whole-fleet results."""
+        with self._cache_lock:
+            self._epoch += 1
+            self._fleet.clear()
+            if key == "*":
+                self._cars.clear()
+            else:
+                self._cars.pop(key, None)
+
+    def _reset_cache(self, ready: bool) -> None:
+        """Empty the cache, and enable or disable it."""
+        with self._cache_lock:
+            self._epoch += 1
+            self._cache_ready = ready
+            self._cars.clear()
+            self._fleet.clear()
+
+    def _listen(self) -> None:
+        """Drop cached cars as replicas change them, reconnecting as needed."""
+        while not self._closing.is_set():
+            self._subscription = self.redis.pubsub()
+            try:
+                self._subscription.subscribe(self._channel)
+            except RedisError as e:
+                logger.warning("Cannot subscribe to %s: %s", self._channel, e)
+                self._subscription.close()
+                self._subscription = None
+                self._closing.wait(self.ping_interval)
+                continue
+
+            try:
+                # Changes made while unsubscribed were missed, so start empty
+                self._reset_cache(ready=True)
+                ping_pending = False
+                while not self._closing.is_set():
+                    message = self._subscription.get_message(timeout=self.ping_interval)
+                    if message is None:
+                        # A silent connection is pinged, and one that stays
+                        # silent is treated as lost, so a dead server is noticed
+                        if ping_pending:
+                            raise RedisError("No reply from server")
+                        self._subscription.ping()
+                        ping_pending = True
+                        continue
+
+                    ping_pending = False
+                    if message["type"] == "message":
+                        self._invalidate(message["data"])
+            except (RedisError, OSError) as e:
+                if not self._closing.is_set():
+                    logger.warning("Lost subscription to %s: %s", self._channel, e)
+            finally:
+                self._reset_cache(ready=False)
+                self._subscription.close()
+                self._subscription = None
+
+    def _load_cars(self, keys: List[str]) -> List[Car]:
+        """Read the cars with the given registrations, skipping removed ones."""
+        cars = []
+        for start in range(0, len(keys), 1000):
+            chunk = [self._key("car", key) for key in keys[start : start + 1000]]
+            for record in self.redis.mget(chunk) if chunk else ():
+                if record is not None:
+                    cars.append(car_from_record(json.loads(record)))
+        return cars
+
+    def _load_fleet(self) -> List[Car]:
+        """Read every car, in insertion order."""
+        return self._load_cars(self.redis.zrange(self._key("order"), 0, -1))
+
+    def _load_sorted(self) -> tuple[List[str], List[Car]]:
+        """Order the cached fleet by registration, for paging."""
+        cars = sorted(
+            self._cached("fleet", self._load_fleet),
+            key=lambda car: car.registration.upper(),
+        )
+        return [car.registration.upper() for car in cars], cars
+
+    def _load_counts(self) -> tuple[int, int]:
+        """Read the fleet totals."""
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hget(self._key("stats", "total"), _FLEET_TOTALS)
+            pipe.hget(self._key("stats", "available"), _FLEET_TOTALS)
+            total, available = pipe.execute()
+        return int(total or 0), int(available or 0)
+
+    def _load_breakdowns(self) -> Dict[str, Dict[Any, tuple[int, int]]]:
+        """Read the per-field counts."""
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._key("stats", "total"))
+            pipe.hgetall(self._key("stats", "available"))
+            totals, available_counts = pipe.execute()
+        result: Dict[str, Dict[Any, tuple[int, int]]] = {
+            field: {} for field in STAT_FIELDS
+        }
+        for name, total in totals.items():
+            field, value = json.loads(name)
+            # Counters of removed values stay behind at zero
+            if field and int(total) > 0:
+                result[field][value] = (int(total), int(available_counts.get(name, 0)))
+        return result
+
+    def _load_version(self) -> int:
+        """Read the change counter."""
+        return int(self.redis.get(self._key("version")) or 0)
+
+
+def _matcher(
+    brand: Optional[str],
+    model: Optional[str],
+    year_min: Optional[int],
+    year_max: Optional[int],
+    available: Optional[bool],
+) -> Callable[[Car], bool]:
+    """Build a test for the find() conditions, matching brand and model in any case."""
+    brand = brand.casefold() if brand is not None else None
+    model = model.casefold() if model is not None else None
+
+    def matches(car: Car) -> bool:
+        return (
+            (brand is None or car.brand.casefold() == brand)
+            and (model is None or car.model.casefold() == model)
+            and (year_min is None or car.year >= year_min)
+            and (year_max is None or car.year <= year_max)
+            and (available is None or car.availability == available)
+        )
+
+    return matches
@@ -0,0 +1,876 @@
+"""
+Car Repository module
+Storage layer behind the service, with the JSON file store as the default backend
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .agency import STAT_FIELDS, Agency
+from .car import Car
+from .commit import GroupCommit, TrackedChange, track_change
+from .journal import FleetJournal
+from .metrics import (
+    FLEET_RELOADS,
+    PERSISTENCE_WRITE_DURATION,
+    PERSISTENCE_WRITTEN_BYTES,
+)
+from .snapshot import is_binary_snapshot, read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+PERSISTENCE_MODES = ("snapshot", "journal")
+SNAPSHOT_FORMATS = ("json", "binary")
+
+
+def car_to_record(car: Car) -> Dict[str, Any]:
+    """
+    Convert a Car object to its stored representation.
+
+    Args:
+        car (Car): The car object to convert
+
+    Returns:
+        Dict[str, Any]: The car's fields as stored on disk
+    """
+    return {
+        "brand": car.brand,
+        "model": car.model,
+        "year": car.year,
+        "registration": car.registration,
+        "availability": car.availability,
+    }
+
+
+def car_from_record(car_data: Dict[str, Any]) -> Car:
+    """
+    Build a Car object from its stored representation.
+
+    Args:
+        car_data (Dict[str, Any]): The stored car fields
+
+    Returns:
+        Car: The rebuilt car
+    """
+    car = Car(
+        car_data["brand"],
+        car_data["model"],
+        car_data["year"],
+        car_data["registration"],
+    )
+    car.availability = car_data.get("availability", True)
+    return car
+
+
+class CarRepository(ABC):
+    """Interface for car storage backends used by CarsRentalService."""
+
+    # Backends only need to be safe against concurrent changes to *different*
+    # cars; the service serialises changes to the same registration itself.
+
+    @abstractmethod
+    def load(self) -> tuple[bool, Optional[str]]:
+        """
+        Prepare the store for use, e.g. read the fleet or create tables.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+
+    @abstractmethod
+    def save(self) -> tuple[bool, Optional[str]]:
+        """
+        Write the whole fleet to durable storage.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+
+    @abstractmethod
+    def get(self, registration: str) -> Optional[Car]:
+        """
+        Look up a car by registration number.
+
+        Args:
+            registration (str): The registration number (case-insensitive)
+
+        Returns:
+            Optional[Car]: The car, or None if not found
+        """
+
+    @abstractmethod
+    def all(self) -> List[Car]:
+        """Get every car in the fleet, in insertion order."""
+
+    @abstractmethod
+    def available(self) -> List[Car]:
+        """Get every available car in the fleet, in insertion order."""
+
+    @abstractmethod
+    def find(
+        self,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """
+        Find the cars matching every given condition, in insertion order.
+
+        Args:
+            brand (Optional[str]): Brand to match (case-insensitive)
+            model (Optional[str]): Model to match (case-insensitive)
+            year_min (Optional[int]): Earliest year, inclusive
+            year_max (Optional[int]): Latest year, inclusive
+            available (Optional[bool]): Availability to match
+
+        Returns:
+            List[Car]: The matching cars
+        """
+
+    @abstractmethod
+    def find_page(
+        self,
+        after: Optional[str],
+        limit: int,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """
+        Find one page of matching cars, ordered by registration number.
+
+        Args:
+            after (Optional[str]): Only return cars whose registration sorts
+                after this one (case-insensitive); None starts at the beginning
+            limit (int): Maximum number of cars to return
+            brand, model, year_min, year_max, available: As for find()
+
+        Returns:
+            List[Car]: Up to `limit` matching cars
+        """
+
+    @abstractmethod
+    def counts(self) -> tuple[int, int]:
+        """
+        Count the fleet.
+
+        Returns:
+            tuple[int, int]: (total_cars, available_cars)
+        """
+
+    @abstractmethod
+    def breakdowns(self) -> Dict[str, Dict[Any, tuple[int, int]]]:
+        """
+        Count cars per brand, model and year.
+
+        Returns:
+            Dict[str, Dict[Any, tuple[int, int]]]: For each field in STAT_FIELDS,
+                maps each value to (total_cars, available_cars)
+        """
+
+    @abstractmethod
+    def version(self) -> int:
+        """
+        Get the fleet's version, for change detection.
+
+        Returns:
+            int: A number that changes whenever any car is added, removed,
+                rented or returned, including by other processes sharing the store
+        """
+
+    @abstractmethod
+    def add(self, car: Car) -> bool:
+        """
+        Add a car unless its registration is already taken.
+
+        Args:
+            car (Car): The car to add
+
+        Returns:
+            bool: True if added, False if the registration already exists
+        """
+
+    @abstractmethod
+    def set_availability(self, registration: str, availability: bool) -> Optional[Car]:
+        """
+        Change a car's availability if it is not already in that state.
+
+        This is a compare-and-set: it fails if the car is missing or another
+        writer already made the same change.
+
+        Args:
+            registration (str): The registration number (case-insensitive)
+            availability (bool): The new availability
+
+        Returns:
+            Optional[Car]: The updated car, or None if nothing changed
+        """
+
+    @abstractmethod
+    def remove(self, registration: str) -> Optional[Car]:
+        """
+        Remove a car from the fleet.
+
+        Args:
+            registration (str): The registration number (case-insensitive)
+
+        Returns:
+            Optional[Car]: The removed car, or None if not found
+        """
+
+    def commit(self) -> tuple[bool, Optional[str]]:
+        """
+        Wait until all changes made so far are durable.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        return True, None
+
+    def compact(self) -> tuple[bool, Optional[str]]:
+        """
+        Reclaim space used by incremental change logs, if the backend has any.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        return True, None
+
+    def close(self) -> None:
+        """Release files, connections and background work."""
+
+
+class JsonCarRepository(CarRepository):
+    """Keeps the fleet in an Agency and persists it to a JSON or binary file."""
+
+    def __init__(
+        self,
+        agency: Agency,
+        data_file: str = "data/cars.json",
+        persistence: str = "snapshot",
+        journal_max_records: int = 1000,
+        journal_max_bytes: int = 4 * 1024 * 1024,
+        commit_window: float = 0.0,
+        snapshot_format: str = "json",
+        lazy_load: bool = False,
+        watch_interval: float = 0.0,
+    ):
+        """
+        Initialize the JsonCarRepository.
+
+        Args:
+            agency (Agency): The agency holding the in-memory fleet
+            data_file (str): Path to the JSON data file
+            persistence (str): "snapshot" rewrites the data file on every change,
+                "journal" appends to a journal compacted into the data file
+            journal_max_records (int): Journal records that trigger compaction
+            journal_max_bytes (int): Journal size in bytes that triggers compaction
+            commit_window (float): Seconds to gather concurrent changes into one
+                write and fsync; 0 commits each change as soon as possible
+            snapshot_format (str): Format the data file is written in, "json" or
+                the compact "binary"; either is read, whatever this says
+            lazy_load (bool): Load binary snapshots lazily: serve lookups at once
+                and build the rest of the fleet on a background thread
+            watch_interval (float): Seconds between checks of the data file for
+                changes made by other programs, which are then loaded without a
+                restart; 0 never checks
+        """
+        if persistence not in PERSISTENCE_MODES:
+            raise ValueError(
+                f"Unknown persistence mode {persistence!r}, "
+                f"expected one of: {', '.join(PERSISTENCE_MODES)}"
+            )
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(
+                f"Unknown snapshot format {snapshot_format!r}, "
+                f"expected one of: {', '.join(SNAPSHOT_FORMATS)}"
+            )
+
+        self.agency = agency
+        self.data_file = Path(data_file)
+        self.persistence = persistence
+        self.snapshot_format = snapshot_format
+        self.lazy_load = lazy_load
+        self.watch_interval = watch_interval
+        self.journal = (
+            FleetJournal(
+                self.data_file.with_suffix(".journal"),
+                max_records=journal_max_records,
+                max_bytes=journal_max_bytes,
+            )
+            if persistence == "journal"
+            else None
+        )
+        self._compaction: Optional[threading.Thread] = None
+        self._warmup: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        # (mtime, size, inode) of the data file as last loaded or written, and
+        # of the last version that failed to load
+        self._file_signature: Optional[tuple[int, int, int]] = None
+        self._rejected_signature: Optional[tuple[int, int, int]] = None
+
+        # Lock order: fleet lock alone, or write lock -> fleet lock
+        self._fleet_lock = threading.RLock()  # Guards fleet membership and counters
+        self._write_lock = threading.RLock()  # Serialises journal and file writes
+        self._committer = GroupCommit(
+            self.save if self.journal is None else self._sync_journal,
+            window=commit_window,
+        )
+        # Snapshot mode: changes made since the last snapshot was captured,
+        # undone if the snapshot holding them cannot be written
+        self._unsaved: List[TrackedChange] = []
+
+    def load(self) -> tuple[bool, Optional[str]]:
+        """
+        Load cars from the data file, replaying the journal on top.
+
+        Starts watching the data file for changes if a watch interval is set,
+        even if it is missing or invalid for now.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        try:
+            has_journal = self.journal is not None and self.journal.exists()
+            if not self.data_file.exists() and not has_journal:
+                return False, f"Data file {self.data_file} not found"
+            return self._reload(self._signature())
+        finally:
+            self._start_watching()
+
+    def reload_if_changed(self) -> tuple[bool, Optional[str]]:
+        """
+        Load the data file again if another program changed it.
+
+        The new fleet is read in the calling thread while requests keep using
+        the current one, then swapped in at once. As on a restart, journalled
+        changes are replayed on top of the file. A missing file is ignored.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message); success
+                without a reload if the file is unchanged
+        """
+        signature = self._signature()
+        if signature is None or signature in (
+            self._file_signature,
+            self._rejected_signature,
+        ):
+            return True, None
+
+        success, error = self._reload(signature)
+        if not success:
+            FLEET_RELOADS.inc("failed")
+        elif self._file_signature == signature:
+            FLEET_RELOADS.inc("reloaded")
+            logger.info(
+                "Reloaded %d cars from %s", self.agency.total_count, self.data_file
+            )
+        return success, error
+
+    def save(self) -> tuple[bool, Optional[str]]:
+        """
+        Save cars to the data file.
+
+        If the file cannot be written, the changes made since the last save
+        are undone, so the fleet in memory stays the one on disk.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        # Capture and write under one lock so an older snapshot never lands last
+        with self._write_lock:
+            # Convert under the fleet lock too, so the snapshot holds exactly
+            # the changes it takes from the unsaved list
+            with self._fleet_lock:
+                data = {"cars": [car_to_record(car) for car in self.agency.cars]}
+                captured, self._unsaved = self._unsaved, []
+
+            success, error = self._write_snapshot(data)
+            if not success and captured:
+                self._undo_unsaved(captured, error)
+            return success, error
+
+    def get(self, registration: str) -> Optional[Car]:
+        """Look up a car by registration number."""
+        return self.agency.get_car(registration)
+
+    def all(self) -> List[Car]:
+        """Take a stable copy of the fleet to iterate over."""
+        with self._fleet_lock:
+            return list(self.agency.cars)
+
+    def available(self) -> List[Car]:
+        """Get every available car in the fleet, via the availability index."""
+        return self.find(available=True)
+
+    def find(
+        self,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Query the agency's secondary indexes."""
+        with self._fleet_lock:
+            return self.agency.find_cars(brand, model, year_min, year_max, available)
+
+    def find_page(
+        self,
+        after: Optional[str],
+        limit: int,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Page through the agency's registration-ordered index."""
+        with self._fleet_lock:
+            return self.agency.find_cars_page(
+                after, limit, brand, model, year_min, year_max, available
+            )
+
+    def counts(self) -> tuple[int, int]:
+        """Read the agency's running counters."""
+        with self._fleet_lock:
+            return self.agency.total_count, self.agency.available_count
+
+    def breakdowns(self) -> Dict[str, Dict[Any, tuple[int, int]]]:
+        """Read the agency's running per-field counters."""
+        with self._fleet_lock:
+            return {field: self.agency.breakdown(field) for field in STAT_FIELDS}
+
+    def version(self) -> int:
+        """Read the agency's change counter."""
+        return self.agency.version
+
+    def add(self, car: Car) -> bool:
+        """
+        Add a car and journal it.
+
+        Raises:
+            OSError: If the journal cannot be written; the car is not added
+        """
+        with self._fleet_lock:
+            added = self.agency.add_car(car)
+            if added:
+                self._track(
+                    car.registration, partial(self.agency.remove_car, car.registration)
+                )
+        if added:
+            success, error = self._record({"op": "put", "car": car_to_record(car)})
+            if not success:
+                with self._fleet_lock:
+                    self.agency.remove_car(car.registration)
+                raise OSError(error)
+        return added
+
+    def set_availability(self, registration: str, availability: bool) -> Optional[Car]:
+        """
+        Rent or return a car and journal the change.
+
+        Raises:
+            OSError: If the journal cannot be written; the car is left as it was
+        """
+        car = self.agency.get_car(registration)
+        if car is None or car.availability == availability:
+            return None
+
+        with self._fleet_lock:
+            changed = self._change_availability(car.registration, availability)
+            if not changed:
+                return None
+            self._track(
+                car.registration,
+                partial(self._change_availability, car.registration, not availability),
+            )
+
+        success, error = self._record({"op": "put", "car": car_to_record(car)})
+        if not success:
+            self._change_availability(car.registration, not availability)
+            raise OSError(error)
+        return car
+
+    def remove(self, registration: str) -> Optional[Car]:
+        """
+        Remove a car and journal the deletion.
+
+        Raises:
+            OSError: If the journal cannot be written; the car is not removed
+        """
+        with self._fleet_lock:
+            car = self.agency.remove_car(registration)
+            if car is not None:
+                self._track(car.registration, partial(self.agency.add_car, car))
+        if car is not None:
+            success, error = self._record(
+                {"op": "del", "registration": car.registration}
+            )
+            if not success:
+                with self._fleet_lock:
+                    self.agency.add_car(car)
+                raise OSError(error)
+        return car
+
+    def _change_availability(self, registration: str, availability: bool) -> bool:
+        """Rent or return a car in memory; True if its availability changed."""
+        # The fleet lock is only held briefly, to keep the counters consistent
+        with self._fleet_lock:
+            if availability:
+                return self.agency.return_car(registration)
+            return self.agency.rent_car(registration)
+
+    def _track(self, registration: str, undo: Callable[[], Any]) -> None:
+        """
+        Remember how to undo a change until a snapshot holds it.
+
+        Called under the fleet lock, together with the change, so the change
+        is in exactly the snapshot that takes it from the unsaved list. In
+        journal mode a change is undone when it cannot be journalled instead.
+
+        Args:
+            registration (str): The registration number of the changed car
+            undo (Callable): Puts the car back as it was
+        """
+        if self.journal is None:
+            change = TrackedChange(registration, undo)
+            self._unsaved.append(change)
+            track_change(change)
+
+    def _undo_unsaved(self, captured: List[TrackedChange], error: str) -> None:
+        """
+        Undo the changes of a snapshot that could not be written.
+
+        Later changes to the same cars were made on top of them, so they are
+        undone first, whichever snapshot was going to hold them.
+
+        Args:
+            captured (List[TrackedChange]): The snapshot's changes, oldest first
+            error (str): Why the snapshot failed, reported to the changes' callers
+        """
+        with self._fleet_lock:
+            registrations = {change.registration for change in captured}
+            later = [c for c in self._unsaved if c.registration in registrations]
+            self._unsaved = [
+                c for c in self._unsaved if c.registration not in registrations
+            ]
+            for change in reversed(captured + later):
+                change.undo()
+                change.error = error
+
+    def commit(self) -> tuple[bool, Optional[str]]:
+        """
+        Wait until all recorded changes are durable.
+
+        Concurrent callers share one commit, and a commit window gathers bursts
+        into a single write.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        return self._committer.commit()
+
+    def compact(self) -> tuple[bool, Optional[str]]:
+        """
+        Fold the journal into the JSON snapshot.
+
+        The journal is rotated and the fleet captured in the calling thread, while
+        the snapshot is written in the background. In snapshot mode this is the
+        same as save.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if self.journal is None:
+            return self.save()
+
+        with self._write_lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return True, None  # Already compacting, next threshold retries
+
+            try:
+                # A False result means a previous compaction never finished; its
+                # journal is covered by this snapshot too, so it is discarded after
+                self.journal.rotate()
+            except OSError as e:
+                return False, f"Error rotating journal: {str(e)}"
+
+            # Changes journalled before the rotation are already in memory, so
+            # capturing after it covers everything the rotated journal holds
+            data = {"cars": [car_to_record(car) for car in self.all()]}
+            self._compaction = threading.Thread(
+                target=self._write_compacted_snapshot,
+                args=(data,),
+                name="fleet-journal-compaction",
+                daemon=True,
+            )
+            self._compaction.start()
+            return True, None
+
+    def close(self) -> None:
+        """Wait for pending background work and close the journal."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        if self._warmup is not None:
+            self._warmup.join()
+        if self._compaction is not None:
+            self._compaction.join()
+        if self.journal is not None:
+            with self._write_lock:
+                self.journal.close()
+
+    def _reload(
+        self, signature: Optional[tuple[int, int, int]]
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Read the data file into a new fleet and swap it in.
+
+        If the file changes again while it is read, nothing is swapped in and
+        the signature is left for the next check to reload.
+
+        Args:
+            signature (Optional[tuple[int, int, int]]): The data file's
+                signature, taken before reading it
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        staged, error = self._stage_data_file()
+        if staged is None:
+            self._rejected_signature = signature
+            return False, error
+
+        with self._write_lock:
+            if self._signature() != signature:
+                return True, None
+            if self.journal is not None and self.journal.exists():
+                self._replay_journal(staged)
+            lazy = not staged.fully_loaded
+            with self._fleet_lock:
+                self.agency.adopt(staged)
+                # Unsaved changes were made to the fleet just replaced
+                for change in self._unsaved:
+                    change.error = "Data file changed on disk; change discarded"
+                self._unsaved = []
+            self._file_signature = signature
+
+        if lazy:
+            # Any warm-up of the previous fleet stops by itself
+            self._warmup = threading.Thread(
+                target=self.agency.load_all, name="fleet-warmup", daemon=True
+            )
+            self._warmup.start()
+        return True, None
+
+    def _stage_data_file(self) -> tuple[Optional[Agency], Optional[str]]:
+        """
+        Read the data file into a new agency, leaving the current fleet alone.
+
+        Returns:
+            tuple[Optional[Agency], Optional[str]]: (the loaded agency, None), or
+                (None, error_message)
+        """
+        staged = Agency(self.agency.name)
+        try:
+            if not self.data_file.exists():
+                return staged, None  # Only the journal holds cars so far
+            if is_binary_snapshot(self.data_file):
+                snapshot = read_snapshot(self.data_file)
+                if self.lazy_load:
+                    staged.load_snapshot(snapshot)
+                else:
+                    staged.load_cars(snapshot.cars())
+                return staged, None
+
+            with open(self.data_file, "r") as f:
+                data = json.load(f)
+            staged.load_cars(car_from_record(car) for car in data.get("cars", []))
+            return staged, None
+        except json.JSONDecodeError as e:
+            return None, f"Invalid JSON format: {str(e)}"
+        except ValueError as e:
+            return None, f"Invalid snapshot: {str(e)}"
+        except Exception as e:
+            return None, f"Error loading data: {str(e)}"
+
+    def _signature(self) -> Optional[tuple[int, int, int]]:
+        """Identify the data file's current version, or None if it is missing."""
+        try:
+            stat = self.data_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _start_watching(self) -> None:
+        """Start the thread that reloads the data file, if watching is enabled."""
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+
+        self._watcher = threading.Thread(
+            target=self._watch, name="fleet-file-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        """Poll the data file until the repository is closed."""
+        while not self._stop_watching.wait(self.watch_interval):
+            try:
+                success, error = self.reload_if_changed()
+            except Exception as e:
+                success, error = False, str(e)
+            if not success:
+                logger.error("Failed to reload %s: %s", self.data_file, error)
+
+    def _replay_journal(self, agency: Agency) -> None:
+        """
+        Apply journalled changes to a loaded fleet, oldest first.
+
+        Args:
+            agency (Agency): The agency holding the fleet read from the data file
+        """
+        for record in self.journal.replay():
+            if record.get("op") == "del":
+                agency.remove_car(record["registration"])
+                continue
+            if record.get("op") != "put":
+                continue
+
+            car = car_from_record(record["car"])
+            current = agency.get_car(car.registration)
+            if current is not None:
+                as_journalled = {
+                    **car_to_record(current),
+                    "availability": car.availability,
+                }
+                if as_journalled == car_to_record(car):
+                    # The same car, so only its availability can have changed
+                    if car.availability and not current.availability:
+                        agency.return_car(car.registration)
+                    elif current.availability and not car.availability:
+                        agency.rent_car(car.registration)
+                    continue
+                agency.remove_car(car.registration)
+            agency.add_car(car)
+
+    def _write_snapshot(self, data: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """
+        Write fleet data to the data file, in the configured format.
+
+        Args:
+            data (Dict[str, Any]): The snapshot to write
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if self.watch_interval > 0 and self._signature() != self._file_signature:
+            # Left for the watcher to load; in journal mode the journal is kept
+            return False, "Data file changed on disk; not overwriting it"
+
+        start = time.perf_counter()
+        try:
+            # Ensure directory exists
+            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temp file next to the data file and rename it into place,
+            # so a crash mid-write never leaves a truncated snapshot behind
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.data_file.parent,
+                prefix=f".{self.data_file.name}.",
+                suffix=".tmp",
+            )
+            try:
+                binary = self.snapshot_format == "binary"
+                with os.fdopen(fd, "wb" if binary else "w") as f:
+                    if binary:
+                        write_snapshot(f, data["cars"])
+                    else:
+                        json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    written = f.tell()
+                os.replace(tmp_path, self.data_file)
+                self._file_signature = self._signature()
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+            self._fsync_directory(self.data_file.parent)
+            PERSISTENCE_WRITE_DURATION.observe(time.perf_counter() - start, "snapshot")
+            PERSISTENCE_WRITTEN_BYTES.inc("snapshot", amount=written)
+            return True, None
+        except Exception as e:
+            return False, f"Error saving data: {str(e)}"
+
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        """Persist a rename by syncing its directory entry, where supported."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_journal(self) -> tuple[bool, Optional[str]]:
+        """
+        Flush the journal to stable storage.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        try:
+            with self._write_lock:
+                self.journal.sync()
+            return True, None
+        except OSError as e:
+            return False, f"Error syncing journal: {str(e)}"
+
+    def _write_compacted_snapshot(self, data: Dict[str, Any]) -> None:
+        """Write a compaction snapshot, then drop the journal it supersedes."""
+        with self._write_lock:
+            success, _ = self._write_snapshot(data)
+            if success:
+                self.journal.discard_rotated()
+
+    def _record(self, record: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """
+        Journal a single mutation; a no-op in snapshot mode.
+
+        Called while the service holds the car's lock, so records for one car
+        reach the journal in the same order as the changes they describe.
+
+        Args:
+            record (Dict[str, Any]): Journal record describing the mutation
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if self.journal is None:
+            return True, None
+
+        try:
+            with self._write_lock:
+                compaction_due = self.journal.append(record)
+        except OSError as e:
+            return False, f"Error writing journal: {str(e)}"
+
+        if compaction_due:
+            self.compact()
+        return True, None
@@ -0,0 +1,113 @@
+"""
+Response Cache module
+Serialised read responses kept per request until the fleet version changes
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+# Total size of the bodies kept, in bytes
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Largest body kept; bigger ones are rebuilt on every request. A full listing
+# of 100k cars is about 10 MiB.
+DEFAULT_MAX_ENTRY_BYTES = 32 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    """A serialised response body and the fleet version it was built from."""
+
+    version: int
+    body: bytes
+    mimetype: str
+    etag: str
+
+
+class ResponseCache:
+    """LRU cache of response bodies bounded by their total size."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+    ):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            max_bytes (int): Total size of the bodies kept before the least
+                recently used are dropped
+            max_entry_bytes (int): Bodies larger than this are never kept
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        """
+        Look up a response built at the given fleet version.
+
+        Args:
+            key (Hashable): The endpoint and the parsed query it was built for
+            version (int): The current fleet version
+
+        Returns:
+            Optional[CachedResponse]: The cached response, or None if missing
+                or built from another version
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(
+        self, key: Hashable, version: int, body: bytes, mimetype: str
+    ) -> CachedResponse:
+        """
+        Store a response body, tagging it with a hash of its content.
+
+        The ETag depends only on the body, so workers holding the same fleet
+        agree on it even though their version counters differ. Bodies over
+        max_entry_bytes are tagged but not stored.
+
+        Args:
+            key (Hashable): The endpoint and the parsed query it was built for
+            version (int): The fleet version read before building the body
+            body (bytes): The serialised response body
+            mimetype (str): The response content type
+
+        Returns:
+            CachedResponse: The entry, stored or not
+        """
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = CachedResponse(version, body, mimetype, etag)
+        with self._lock:
+            # An outdated body is useless, whether or not this one is kept
+            self._discard(key)
+            if len(body) > self.max_entry_bytes:
+                return entry
+
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= len(dropped.body)
+        return entry
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key: Hashable) -> None:
+        """Drop one entry, if present; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
@@ -0,0 +1,101 @@
+"""
+Serialization module
+Writes cars straight to JSON text without building an intermediate dict per car
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+from functools import partial
+from typing import Callable, Iterable, Optional, Sequence
+
+from .car import Car
+
+# Car fields in the order they are written, matching jsonify's sorted keys
+CAR_FIELDS = ("availability", "brand", "model", "registration", "year")
+
+
+def _encode(value) -> str:
+    """Encode a single JSON value, with fast paths for the types cars hold."""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    if type(value) is int:
+        return str(value)
+    return json.dumps(value)
+
+
+def car_to_json(car: Car) -> str:
+    """
+    Encode a car as a compact JSON object.
+
+    Keys are sorted, matching what Flask's jsonify produces for car_to_dict.
+
+    Args:
+        car (Car): The car to encode
+
+    Returns:
+        str: The JSON object text
+    """
+    return (
+        f'{{"availability":{_encode(car.availability)},'
+        f'"brand":{_encode(car.brand)},'
+        f'"model":{_encode(car.model)},'
+        f'"registration":{_encode(car.registration)},'
+        f'"year":{_encode(car.year)}}}'
+    )
+
+
+def car_fields_to_json(car: Car, fields: Sequence[str]) -> str:
+    """
+    Encode selected fields of a car as a compact JSON object.
+
+    Args:
+        car (Car): The car to encode
+        fields (Sequence[str]): Field names from CAR_FIELDS, in CAR_FIELDS order
+
+    Returns:
+        str: The JSON object text
+    """
+    return (
+        "{"
+        + ",".join(f'"{field}":{_encode(getattr(car, field))}' for field in fields)
+        + "}"
+    )
+
+
+def car_encoder(fields: Optional[Sequence[str]] = None) -> Callable[[Car], str]:
+    """
+    Pick the function that encodes one car, optionally projected onto fields.
+
+    Args:
+        fields (Optional[Sequence[str]]): Only include these fields; None
+            includes all of them
+
+    Returns:
+        Callable[[Car], str]: Encodes a car as a JSON object text
+    """
+    if fields is None:
+        return car_to_json
+    return partial(car_fields_to_json, fields=[f for f in CAR_FIELDS if f in fields])
+
+
+def cars_to_json(
+    cars: Iterable[Car], fields: Optional[Sequence[str]] = None
+) -> tuple[int, str]:
+    """
+    Encode cars as a compact JSON array.
+
+    Args:
+        cars (Iterable[Car]): The cars to encode
+        fields (Optional[Sequence[str]]): Only include these fields; None
+            includes all of them
+
+    Returns:
+        tuple[int, str]: (number of cars, JSON array text)
+    """
+    encode = car_encoder(fields)
+    items = [encode(car) for car in cars]
+    return len(items), "[" + ",".join(items) + "]"
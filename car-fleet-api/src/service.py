@@ -3,83 +3,113 @@ Car Rental Service module
 Service layer that abstracts business logic between Car and Agency
 """
 
-import json
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import logging
+from typing import Any, Dict, Iterator, List, Optional
 
 from .agency import Agency
 from .car import Car
+from .commit import TrackedChange, commit_outcome, tracking_changes
+from .locks import KeyedLocks
+from .metrics import SERVICE_CALL_DURATION
+from .repository import CarRepository, JsonCarRepository
+from .serialization import car_encoder, cars_to_json
+
+logger = logging.getLogger(__name__)
+
+# Start of the error for a change that was made but could not be persisted
+PERSISTENCE_ERROR = "Failed to persist changes"
 
 
 class CarsRentalService:
     """Service layer for car rental operations."""
 
-    def __init__(self, agency: Agency, data_file: str = "data/cars.json"):
+    def __init__(
+        self,
+        agency: Agency,
+        data_file: str = "data/cars.json",
+        persistence: str = "snapshot",
+        journal_max_records: int = 1000,
+        journal_max_bytes: int = 4 * 1024 * 1024,
+        commit_window: float = 0.0,
+        repository: Optional[CarRepository] = None,
+        auto_commit: bool = True,
+        snapshot_format: str = "json",
+        lazy_load: bool = False,
+        watch_interval: float = 0.0,
+    ):
         """
         Initialize the CarsRentalService.
 
         Args:
             agency (Agency): The agency instance to manage
             data_file (str): Path to the JSON data file
+            persistence (str): "snapshot" rewrites the data file on every change,
+                "journal" appends to a journal compacted into the data file
+            journal_max_records (int): Journal records that trigger compaction
+            journal_max_bytes (int): Journal size in bytes that triggers compaction
+            commit_window (float): Seconds to gather concurrent changes into one
+                write and fsync; 0 commits each change as soon as possible
+            repository (Optional[CarRepository]): Storage backend to use instead
+                of the JSON file store configured by the arguments above
+            auto_commit (bool): Wait for each change to be durable before
+                returning; False leaves repository.commit() to the caller
+            snapshot_format (str): Format the data file is written in, "json" or
+                the compact "binary"
+            lazy_load (bool): Build cars from binary snapshots on demand, so the
+                fleet is served before it is fully loaded
+            watch_interval (float): Seconds between checks of the data file for
+                changes made by other programs; 0 never checks
         """
         self.agency = agency
-        self.data_file = Path(data_file)
-
+        self.auto_commit = auto_commit
+        self.repository = repository or JsonCarRepository(
+            agency,
+            data_file=data_file,
+            persistence=persistence,
+            journal_max_records=journal_max_records,
+            journal_max_bytes=journal_max_bytes,
+            commit_window=commit_window,
+            snapshot_format=snapshot_format,
+            lazy_load=lazy_load,
+            watch_interval=watch_interval,
+        )
+
+        # Serialises changes to one car; storage handles everything else
+        self._car_locks = KeyedLocks()
+
+    @SERVICE_CALL_DURATION.timed("load_from_json")
     def load_from_json(self) -> tuple[bool, Optional[str]]:
         """
-        Load cars from JSON file.
+        Load cars from storage (the JSON file by default).
 
         Returns:
             tuple[bool, Optional[str]]: (success, error_message)
         """
-        try:
-            if not self.data_file.exists():
-                return False, f"Data file {self.data_file} not found"
-
-            with open(self.data_file, "r") as f:
-                data = json.load(f)
-
-            # Clear existing cars
-            self.agency.cars.clear()
-
-            # Load cars from JSON
-            for car_data in data.get("cars", []):
-                car = Car(
-                    car_data["brand"],
-                    car_data["model"],
-                    car_data["year"],
-                    car_data["registration"],
-                )
-                car.availability = car_data.get("availability", True)
-                self.agency.cars.append(car)
-
-            return True, None
-        except json.JSONDecodeError as e:
-            return False, f"Invalid JSON format: {str(e)}"
-        except Exception as e:
-            return False, f"Error loading data: {str(e)}"
+        return self.repository.load()
 
+    @SERVICE_CALL_DURATION.timed("save_to_json")
     def save_to_json(self) -> tuple[bool, Optional[str]]:
         """
-        Save cars to JSON file.
+        Save cars to storage (the JSON file by default).
 
         Returns:
             tuple[bool, Optional[str]]: (success, error_message)
         """
-        try:
-            # Ensure directory exists
-            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        return self.repository.save()
 
-            # Convert cars to dictionary format
-            data = {"cars": [self.car_to_dict(car) for car in self.agency.cars]}
+    @SERVICE_CALL_DURATION.timed("compact")
+    def compact(self) -> tuple[bool, Optional[str]]:
+        """
+        Fold incremental change logs, such as the journal, into storage.
 
-            # Write to file
-            with open(self.data_file, "w") as f:
-                json.dump(data, f, indent=2)
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        return self.repository.compact()
 
-            return True, None
-        except Exception as e:
-            return False, f"Error saving data: {str(e)}"
+    def close(self) -> None:
+        """Wait for pending background work and release storage."""
+        self.repository.close()
 
     def get_agency_name(self) -> str:
         """Get the agency name."""
@@ -110,7 +140,7 @@ class CarsRentalService:
         Returns:
             List[Dict[str, Any]]: List of all cars as dictionaries
         """
-        return [self.car_to_dict(car) for car in self.agency.cars]
+        return [self.car_to_dict(car) for car in self.repository.all()]
 
     def get_available_cars(self) -> List[Dict[str, Any]]:
         """
@@ -119,8 +149,127 @@ class CarsRentalService:
         Returns:
             List[Dict[str, Any]]: List of available cars as dictionaries
         """
-        return [self.car_to_dict(car) for car in self.agency.cars if car.is_available()]
+        return [self.car_to_dict(car) for car in self.repository.available()]
+
+    @SERVICE_CALL_DURATION.timed("get_all_cars_json")
+    def get_all_cars_json(
+        self, fields: Optional[List[str]] = None, **filters: Any
+    ) -> tuple[int, str]:
+        """
+        Get all cars in the fleet, encoded directly as a JSON array.
+
+        Args:
+            fields (Optional[List[str]]): Only include these car fields
+            **filters: Optional brand, model, year_min, year_max and available
+                conditions, answered from the repository's indexes
+
+        Returns:
+            tuple[int, str]: (number of cars, JSON array text)
+        """
+        if filters:
+            return cars_to_json(self.repository.find(**filters), fields)
+        return cars_to_json(self.repository.all(), fields)
+
+    @SERVICE_CALL_DURATION.timed("get_available_cars_json")
+    def get_available_cars_json(
+        self, fields: Optional[List[str]] = None, **filters: Any
+    ) -> tuple[int, str]:
+        """
+        Get all available cars, encoded directly as a JSON array.
+
+        Args:
+            fields (Optional[List[str]]): Only include these car fields
+            **filters: Optional brand, model, year_min and year_max conditions
+
+        Returns:
+            tuple[int, str]: (number of cars, JSON array text)
+        """
+        if filters:
+            return cars_to_json(self.repository.find(available=True, **filters), fields)
+        return cars_to_json(self.repository.available(), fields)
+
+    @SERVICE_CALL_DURATION.timed("get_cars_page_json")
+    def get_cars_page_json(
+        self,
+        cursor: Optional[str],
+        limit: int,
+        fields: Optional[List[str]] = None,
+        **filters: Any,
+    ) -> tuple[int, str, Optional[str]]:
+        """
+        Get one page of cars ordered by registration, encoded as a JSON array.
+
+        Args:
+            cursor (Optional[str]): next_cursor from the previous page, or None
+                for the first page
+            limit (int): Maximum number of cars in the page
+            fields (Optional[List[str]]): Only include these car fields
+            **filters: Optional brand, model, year_min, year_max and available
+                conditions
 
+        Returns:
+            tuple[int, str, Optional[str]]: (number of cars, JSON array text,
+                cursor for the next page or None on the last page)
+        """
+        # One extra car tells whether another page follows
+        cars = self.repository.find_page(cursor, limit + 1, **filters)
+        next_cursor = (
+            cars[limit - 1].registration.upper() if len(cars) > limit else None
+        )
+        count, cars_json = cars_to_json(cars[:limit], fields)
+        return count, cars_json, next_cursor
+
+    def iter_cars_json(
+        self,
+        fields: Optional[List[str]] = None,
+        chunk_size: int = 500,
+        **filters: Any,
+    ) -> Iterator[List[str]]:
+        """
+        Walk the fleet in registration order, encoding one chunk of cars at a time.
+
+        Each chunk is fetched as a page, so only one chunk is held in memory
+        and no lock is held between chunks. Cars added or removed during the
+        walk may or may not be included; no car is yielded twice.
+
+        Args:
+            fields (Optional[List[str]]): Only include these car fields
+            chunk_size (int): Cars fetched and encoded per chunk
+            **filters: Optional brand, model, year_min, year_max and available
+                conditions
+
+        Yields:
+            List[str]: JSON object texts of the next chunk of cars
+        """
+        encode = car_encoder(fields)
+        cursor = None
+        while True:
+            cars = self.repository.find_page(cursor, chunk_size, **filters)
+            if cars:
+                yield [encode(car) for car in cars]
+            if len(cars) < chunk_size:
+                return
+            cursor = cars[-1].registration.upper()
+
+    def get_fleet_counts(self) -> tuple[int, int]:
+        """
+        Count the fleet, without the breakdowns of get_fleet_stats.
+
+        Returns:
+            tuple[int, int]: (total_cars, available_cars)
+        """
+        return self.repository.counts()
+
+    def get_fleet_version(self) -> int:
+        """
+        Get a number that changes whenever the fleet changes.
+
+        Returns:
+            int: The fleet version
+        """
+        return self.repository.version()
+
+    @SERVICE_CALL_DURATION.timed("find_car_by_registration")
     def find_car_by_registration(self, registration: str) -> Optional[Dict[str, Any]]:
         """
         Find a car by its registration number.
@@ -131,12 +280,10 @@ class CarsRentalService:
         Returns:
             Optional[Dict[str, Any]]: Car dictionary if found, None otherwise
         """
-        registration = registration.upper()
-        for car in self.agency.cars:
-            if car.registration == registration:
-                return self.car_to_dict(car)
-        return None
+        car = self.repository.get(registration)
+        return self.car_to_dict(car) if car else None
 
+    @SERVICE_CALL_DURATION.timed("add_car")
     def add_car(
         self, brand: str, model: str, year: int, registration: str
     ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
@@ -155,18 +302,14 @@ class CarsRentalService:
         """
         registration = registration.upper()
 
-        # Check if car already exists
-        if self.find_car_by_registration(registration):
-            return False, None, f"Car with registration {registration} already exists"
-
-        # Create and add the car
-        car = Car(brand, model, year, registration)
-        if self.agency.add_car(car):
-            self.save_to_json()  # Auto-save
-            return True, self.car_to_dict(car), None
+        with tracking_changes() as changes, self._car_locks.hold(registration):
+            result = self._add_car_locked(brand, model, year, registration)
 
-        return False, None, "Failed to add car"
+        result = self._committed(result, changes)
+        self._log_result("added", registration, result)
+        return result
 
+    @SERVICE_CALL_DURATION.timed("rent_car")
     def rent_car(
         self, registration: str
     ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
@@ -182,23 +325,15 @@ class CarsRentalService:
         """
         registration = registration.upper()
 
-        # Check if car exists
-        car_dict = self.find_car_by_registration(registration)
-        if not car_dict:
-            return False, None, f"Car with registration {registration} not found"
-
-        # Check if car is available
-        if not car_dict["availability"]:
-            return False, None, f"Car {registration} is already rented"
-
-        # Rent the car
-        if self.agency.rent_car(registration):
-            self.save_to_json()  # Auto-save
-            updated_car = self.find_car_by_registration(registration)
-            return True, updated_car, None
+        # Hold the car's lock so the check and the change happen as one step
+        with tracking_changes() as changes, self._car_locks.hold(registration):
+            result = self._set_availability_locked(registration, False)
 
-        return False, None, "Failed to rent car"
+        result = self._committed(result, changes)
+        self._log_result("rented", registration, result)
+        return result
 
+    @SERVICE_CALL_DURATION.timed("return_car")
     def return_car(
         self, registration: str
     ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
@@ -214,23 +349,323 @@ class CarsRentalService:
         """
         registration = registration.upper()
 
-        # Check if car exists
-        car_dict = self.find_car_by_registration(registration)
-        if not car_dict:
+        # Hold the car's lock so the check and the change happen as one step
+        with tracking_changes() as changes, self._car_locks.hold(registration):
+            result = self._set_availability_locked(registration, True)
+
+        result = self._committed(result, changes)
+        self._log_result("returned", registration, result)
+        return result
+
+    @SERVICE_CALL_DURATION.timed("add_cars")
+    def add_cars(self, cars: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add a batch of cars, persisting once for the whole batch.
+
+        Every item is validated before any is added; invalid items, duplicates
+        of existing cars and repeats within the batch fail individually
+        without affecting the rest.
+
+        Args:
+            cars (List[Dict[str, Any]]): Cars with brand, model, year and
+                registration fields
+
+        Returns:
+            List[Dict[str, Any]]: One result per item, in order, with the
+                registration and either the added car or an error
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cars)
+        valid = []
+        for i, data in enumerate(cars):
+            error = self._car_data_error(data)
+            if error:
+                registration = (
+                    data.get("registration") if isinstance(data, dict) else None
+                )
+                results[i] = self._batch_result(registration, (False, None, error))
+            else:
+                valid.append((i, data, data["registration"].upper()))
+
+        item_changes: List[List[TrackedChange]] = [[] for _ in cars]
+        with (
+            tracking_changes() as changes,
+            self._car_locks.hold_many(registration for _, _, registration in valid),
+        ):
+            for i, data, registration in valid:
+                start = len(changes)
+                result = self._add_car_locked(
+                    data["brand"], data["model"], int(data["year"]), registration
+                )
+                results[i] = self._batch_result(registration, result)
+                item_changes[i] = changes[start:]
+
+        self._commit_batch("added", results, item_changes)
+        return results
+
+    @SERVICE_CALL_DURATION.timed("rent_cars")
+    def rent_cars(self, registrations: List[str]) -> List[Dict[str, Any]]:
+        """
+        Rent a batch of cars, persisting once for the whole batch.
+
+        Args:
+            registrations (List[str]): Registration numbers of the cars to rent
+
+        Returns:
+            List[Dict[str, Any]]: One result per registration, in order
+        """
+        return self._set_availability_batch(registrations, False)
+
+    @SERVICE_CALL_DURATION.timed("return_cars")
+    def return_cars(self, registrations: List[str]) -> List[Dict[str, Any]]:
+        """
+        Return a batch of rented cars, persisting once for the whole batch.
+
+        Args:
+            registrations (List[str]): Registration numbers of the cars to return
+
+        Returns:
+            List[Dict[str, Any]]: One result per registration, in order
+        """
+        return self._set_availability_batch(registrations, True)
+
+    def _add_car_locked(
+        self, brand: str, model: str, year: int, registration: str
+    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Add a car; the caller holds its lock and commits."""
+        try:
+            # Check if car already exists
+            taken = self.repository.get(registration) is not None
+
+            # Create and add the car
+            car = Car(brand, model, year, registration)
+            added = not taken and self.repository.add(car)
+        except OSError as e:
+            return self._persistence_failure(e)
+        if taken:
+            return False, None, f"Car with registration {registration} already exists"
+        if not added:
+            return False, None, "Failed to add car"
+        return True, self.car_to_dict(car), None
+
+    def _set_availability_locked(
+        self, registration: str, availability: bool
+    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Rent or return a car; the caller holds its lock and commits."""
+        state = "available" if availability else "rented"
+
+        try:
+            # Check if car exists
+            car = self.repository.get(registration)
+            if not car:
+                return False, None, f"Car with registration {registration} not found"
+
+            # Check if car is already in the requested state
+            if car.is_available() == availability:
+                return False, None, f"Car {registration} is already {state}"
+
+            # The change is conditional on the current state, so another process
+            # sharing the storage cannot have beaten us to it
+            car = self.repository.set_availability(registration, availability)
+        except OSError as e:
+            return self._persistence_failure(e)
+        if not car:
+            return False, None, f"Car {registration} is already {state}"
+        return True, self.car_to_dict(car), None
+
+    def _remove_car_locked(
+        self, registration: str
+    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Delete a car; the caller holds its lock and commits."""
+        try:
+            car = self.repository.remove(registration)
+        except OSError as e:
+            return self._persistence_failure(e)
+        if not car:
             return False, None, f"Car with registration {registration} not found"
+        return True, self.car_to_dict(car), None
+
+    @staticmethod
+    def _persistence_failure(
+        error: OSError,
+    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Fail a change the repository could not record."""
+        logger.error("%s: %s", PERSISTENCE_ERROR, error)
+        return False, None, f"{PERSISTENCE_ERROR}: {error}"
 
-        # Check if car is rented
-        if car_dict["availability"]:
-            return False, None, f"Car {registration} is already available"
+    def _set_availability_batch(
+        self, registrations: List[str], availability: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Rent or return a batch of cars under their locks, then commit once.
+
+        Args:
+            registrations (List[str]): Registration numbers of the cars
+            availability (bool): True to return the cars, False to rent them
+
+        Returns:
+            List[Dict[str, Any]]: One result per registration, in order
+        """
+        results: List[Dict[str, Any]] = []
+        normalised = [
+            registration.upper() if isinstance(registration, str) else None
+            for registration in registrations
+        ]
+
+        item_changes: List[List[TrackedChange]] = []
+        with (
+            tracking_changes() as changes,
+            self._car_locks.hold_many(r for r in normalised if r is not None),
+        ):
+            for registration in normalised:
+                start = len(changes)
+                if registration is None:
+                    result = (False, None, "Registration must be a string")
+                else:
+                    result = self._set_availability_locked(registration, availability)
+                results.append(self._batch_result(registration, result))
+                item_changes.append(changes[start:])
+
+        self._commit_batch(
+            "returned" if availability else "rented", results, item_changes
+        )
+        return results
+
+    def _commit_batch(
+        self,
+        action: str,
+        results: List[Dict[str, Any]],
+        item_changes: List[List[TrackedChange]],
+    ) -> None:
+        """
+        Make a batch durable if any of its items changed the fleet.
 
-        # Return the car
-        if self.agency.return_car(registration):
-            self.save_to_json()  # Auto-save
-            updated_car = self.find_car_by_registration(registration)
-            return True, updated_car, None
+        Args:
+            action (str): What was done to the cars, for the log
+            results (List[Dict[str, Any]]): The items' results, updated in place
+                for changes that could not be persisted
+            item_changes (List[List[TrackedChange]]): The changes each item made
+        """
+        succeeded = sum(result["success"] for result in results)
+        if succeeded:
+            commit = self._commit()
+            errors = []
+            for i, result in enumerate(results):
+                if not result["success"]:
+                    continue
+                error = self._persistence_error(item_changes[i], commit)
+                if error:
+                    results[i] = self._batch_result(
+                        result["registration"], (False, None, error)
+                    )
+                    errors.append(error)
+            if errors:
+                logger.error("%s", errors[0])
+            succeeded -= len(errors)
+        logger.info(
+            "Batch of cars %s: %d of %d succeeded",
+            action,
+            succeeded,
+            len(results),
+            extra={"requested": len(results), "succeeded": succeeded},
+        )
+
+    def _committed(
+        self,
+        result: tuple[bool, Optional[Dict[str, Any]], Optional[str]],
+        changes: List[TrackedChange],
+    ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
+        """Make a successful change durable; fail it if that is not possible."""
+        if result[0]:
+            error = self._persistence_error(changes, self._commit())
+            if error:
+                logger.error("%s", error)
+                return False, None, error
+        return result
+
+    def _commit(self) -> tuple[bool, Optional[str]]:
+        """
+        Make the changes so far durable, unless the caller commits itself.
 
-        return False, None, "Failed to return car"
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        if not self.auto_commit:
+            return True, None
+        return self.repository.commit()  # Auto-save
 
+    @staticmethod
+    def _persistence_error(
+        changes: List[TrackedChange], commit: tuple[bool, Optional[str]]
+    ) -> Optional[str]:
+        """
+        Check whether a commit persisted the given changes.
+
+        A failed snapshot undoes the changes it held, which may not be the
+        ones of the caller that waited for it.
+
+        Returns:
+            Optional[str]: Why the changes could not be persisted, or None
+        """
+        success, error = commit_outcome(changes, commit)
+        return None if success else f"{PERSISTENCE_ERROR}: {error}"
+
+    @staticmethod
+    def _log_result(
+        action: str,
+        registration: str,
+        result: tuple[bool, Optional[Dict[str, Any]], Optional[str]],
+    ) -> None:
+        """Log a change to one car; rejected changes only at DEBUG."""
+        success, _, error = result
+        if success:
+            logger.info(
+                "Car %s %s", registration, action, extra={"registration": registration}
+            )
+        else:
+            logger.debug(
+                "Car %s not %s: %s",
+                registration,
+                action,
+                error,
+                extra={"registration": registration, "error": error},
+            )
+
+    @staticmethod
+    def _car_data_error(data: Any) -> Optional[str]:
+        """
+        Validate one car of a batch.
+
+        Returns:
+            Optional[str]: Why the car is invalid, or None if it is valid
+        """
+        if not isinstance(data, dict):
+            return "Car must be an object"
+
+        required_fields = ["brand", "model", "year", "registration"]
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            return f"Missing required fields: {', '.join(missing_fields)}"
+
+        if not isinstance(data["registration"], str):
+            return "Registration must be a string"
+        try:
+            int(data["year"])
+        except (TypeError, ValueError):
+            return f"Invalid year value: {data['year']}"
+        return None
+
+    @staticmethod
+    def _batch_result(
+        registration: Optional[str],
+        result: tuple[bool, Optional[Dict[str, Any]], Optional[str]],
+    ) -> Dict[str, Any]:
+        """Turn a (success, car_dict, error_message) tuple into a batch item."""
+        success, car, error = result
+        if success:
+            return {"registration": registration, "success": True, "car": car}
+        return {"registration": registration, "success": False, "error": error}
+
+    @SERVICE_CALL_DURATION.timed("delete_car")
     def delete_car(
         self, registration: str
     ) -> tuple[bool, Optional[Dict[str, Any]], Optional[str]]:
@@ -246,28 +681,28 @@ class CarsRentalService:
         """
         registration = registration.upper()
 
-        # Find and delete the car
-        for i, car in enumerate(self.agency.cars):
-            if car.registration == registration:
-                deleted_car = self.car_to_dict(car)
-                del self.agency.cars[i]
-                self.save_to_json()  # Auto-save
-                return True, deleted_car, None
+        with tracking_changes() as changes, self._car_locks.hold(registration):
+            result = self._remove_car_locked(registration)
 
-        return False, None, f"Car with registration {registration} not found"
+        result = self._committed(result, changes)
+        self._log_result("deleted", registration, result)
+        return result
 
+    @SERVICE_CALL_DURATION.timed("get_fleet_stats")
     def get_fleet_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the fleet.
 
+        Counts are maintained as the fleet changes, so this does not scan cars.
+
         Returns:
-            Dict[str, Any]: Statistics including total, available, and rented cars
+            Dict[str, Any]: Statistics including total, available, and rented cars,
+                broken down by brand, model and year
         """
-        total_cars = len(self.agency.cars)
-        available_cars = len([car for car in self.agency.cars if car.is_available()])
+        total_cars, available_cars = self.repository.counts()
         rented_cars = total_cars - available_cars
 
-        return {
+        stats = {
             "total_cars": total_cars,
             "available_cars": available_cars,
             "rented_cars": rented_cars,
@@ -275,3 +710,13 @@ class CarsRentalService:
             if total_cars > 0
             else "0%",
         }
+        for field, counts in self.repository.breakdowns().items():
+            stats[f"by_{field}"] = {
+                str(value): {
+                    "total": total,
+                    "available": available,
+                    "rented": total - available,
+                }
+                for value, (total, available) in sorted(counts.items())
+            }
+        return stats
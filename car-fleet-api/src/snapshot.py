@@ -0,0 +1,294 @@
+"""
+Binary Snapshot module
+Compact, columnar fleet snapshots that load without building a record per car
+"""
+
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence
+
+from .car import Car
+
+SNAPSHOT_MAGIC = b"CARFLEET"
+SNAPSHOT_VERSION = 1
+
+# Car fields stored as a table of distinct values plus one table index per car
+TABLE_FIELDS = ("brand", "model", "year")
+
+_HEADER = struct.Struct("<8sHQ")  # magic, version, number of cars
+_SECTION = struct.Struct("<Q")  # length of the section that follows
+_INDEX_TYPE = "I"  # unsigned 32-bit row and table indexes
+
+
+class FleetSnapshot:
+    """A fleet read from a binary snapshot, kept as columns until cars are needed."""
+
+    # File layout, little-endian: a header, then length-prefixed sections for
+    # - registrations, in fleet order (JSON array)
+    # - index keys of the rows whose registration is not already upper-case
+    #   (JSON object, row -> key)
+    # - row numbers ordered by index key (uint32 array)
+    # - availability, one byte per row
+    # - per field in TABLE_FIELDS, its distinct values (JSON array) and each
+    #   row's index into them (uint32 array)
+    # - the fleet's counters (JSON object)
+    # The key order makes lookups a binary search, so no per-car dict has to be
+    # built, and stored counters spare a pass over the fleet. Strings stay
+    # JSON-encoded so any value round-trips and a column decodes in one C call.
+
+    def __init__(
+        self,
+        registrations: List[str],
+        keys: List[str],
+        by_key: Sequence[int],
+        availability: bytes,
+        tables: Dict[str, tuple[List[Any], Sequence[int]]],
+        counters: Dict[str, Any],
+    ):
+        """
+        Initialize the FleetSnapshot.
+
+        Args:
+            registrations (List[str]): Each row's registration, in fleet order
+            keys (List[str]): Each row's index key (upper-cased registration)
+            by_key (Sequence[int]): Row numbers in ascending key order
+            availability (bytes): 1 for each available row, 0 for each rented one
+            tables (Dict[str, tuple[List[Any], Sequence[int]]]): For each field
+                in TABLE_FIELDS, (distinct values, each row's index into them)
+            counters (Dict[str, Any]): Available cars and per-field breakdowns,
+                as written by write_snapshot
+        """
+        self.registrations = registrations
+        self.keys = keys
+        self.by_key = by_key
+        self.sorted_keys = list(map(keys.__getitem__, by_key))
+        self.availability = availability
+        self.tables = tables
+        self.counters = counters
+
+    def __len__(self) -> int:
+        """Number of cars in the snapshot."""
+        return len(self.registrations)
+
+    def row(self, key: str) -> Optional[int]:
+        """
+        Find the row holding a car.
+
+        Args:
+            key (str): The car's index key (upper-cased registration)
+
+        Returns:
+            Optional[int]: The row number, or None if the snapshot lacks the car
+        """
+        index = bisect_left(self.sorted_keys, key)
+        if index < len(self.sorted_keys) and self.sorted_keys[index] == key:
+            return self.by_key[index]
+        return None
+
+    def car(self, row: int) -> Car:
+        """
+        Build the Car stored in one row.
+
+        Args:
+            row (int): The row number
+
+        Returns:
+            Car: A new Car object
+        """
+        brands, brand_ids = self.tables["brand"]
+        models, model_ids = self.tables["model"]
+        years, year_ids = self.tables["year"]
+        car = Car(
+            brands[brand_ids[row]],
+            models[model_ids[row]],
+            years[year_ids[row]],
+            self.registrations[row],
+        )
+        car.availability = bool(self.availability[row])
+        return car
+
+    def cars(self) -> Iterator[Car]:
+        """Build every car, in fleet order."""
+        brands, brand_ids = self.tables["brand"]
+        models, model_ids = self.tables["model"]
+        years, year_ids = self.tables["year"]
+        for brand, model, year, registration, available in zip(
+            map(brands.__getitem__, brand_ids),
+            map(models.__getitem__, model_ids),
+            map(years.__getitem__, year_ids),
+            self.registrations,
+            self.availability,
+        ):
+            car = Car(brand, model, year, registration)
+            if not available:
+                car.availability = False
+            yield car
+
+    def tallies(self) -> tuple[int, Dict[str, Dict[Any, List[int]]]]:
+        """
+        Read the stored counters, without building any cars.
+
+        Returns:
+            tuple[int, Dict[str, Dict[Any, List[int]]]]: (available cars, for
+                each field in TABLE_FIELDS a map of value -> [total, available])
+        """
+        breakdowns = {
+            field: {value: [total, available] for value, total, available in rows}
+            for field, rows in self.counters["breakdowns"].items()
+        }
+        return self.counters["available"], breakdowns
+
+
+def write_snapshot(f: BinaryIO, records: Sequence[Dict[str, Any]]) -> None:
+    """
+    Write car records as a binary snapshot.
+
+    Args:
+        f (BinaryIO): File opened for binary writing
+        records (Sequence[Dict[str, Any]]): Stored car representations, with
+            unique registrations, in fleet order
+    """
+    registrations = [record["registration"] for record in records]
+    keys = [registration.upper() for registration in registrations]
+    by_key = array(_INDEX_TYPE, sorted(range(len(keys)), key=keys.__getitem__))
+    availability = bytes(bool(r.get("availability", True)) for r in records)
+
+    f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(records)))
+    _write_section(f, _encode(registrations))
+    _write_section(
+        f,
+        _encode(
+            {
+                row: key
+                for row, (key, registration) in enumerate(zip(keys, registrations))
+                if key != registration
+            }
+        ),
+    )
+    _write_section(f, _array_bytes(by_key))
+    _write_section(f, availability)
+
+    breakdowns = {}
+    for field in TABLE_FIELDS:
+        table: Dict[Any, int] = {}
+        ids = array(
+            _INDEX_TYPE, [table.setdefault(r[field], len(table)) for r in records]
+        )
+        counts = [[value, 0, 0] for value in table]
+        for (index, available), count in Counter(zip(ids, availability)).items():
+            counts[index][1] += count
+            if available:
+                counts[index][2] += count
+        breakdowns[field] = counts
+        _write_section(f, _encode(list(table)))
+        _write_section(f, _array_bytes(ids))
+
+    _write_section(
+        f, _encode({"available": availability.count(1), "breakdowns": breakdowns})
+    )
+
+
+def read_snapshot(path: Path) -> FleetSnapshot:
+    """
+    Read a binary snapshot.
+
+    Args:
+        path (Path): The snapshot file
+
+    Returns:
+        FleetSnapshot: The snapshot's columns
+
+    Raises:
+        ValueError: If the file is not a snapshot this version can read
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated snapshot header")
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a binary fleet snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    sections = iter(_read_sections(data, _HEADER.size, 5 + 2 * len(TABLE_FIELDS)))
+    registrations = json.loads(next(sections))
+    keys = registrations
+    patches = json.loads(next(sections))
+    if patches:
+        keys = list(registrations)
+        for row, key in patches.items():
+            keys[int(row)] = key
+    by_key = _array_from(next(sections))
+    availability = next(sections)
+    tables = {
+        field: (json.loads(next(sections)), _array_from(next(sections)))
+        for field in TABLE_FIELDS
+    }
+    counters = json.loads(next(sections))
+
+    columns = [registrations, by_key, availability]
+    columns += [ids for _, ids in tables.values()]
+    if any(len(column) != count for column in columns):
+        raise ValueError("Snapshot columns do not match its car count")
+    return FleetSnapshot(registrations, keys, by_key, availability, tables, counters)
+
+
+def is_binary_snapshot(path: Path) -> bool:
+    """Check whether a file starts like a binary snapshot."""
+    with open(path, "rb") as f:
+        return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def _encode(value: Any) -> bytes:
+    """Encode a column or the counters as compact JSON."""
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _array_bytes(values: array) -> bytes:
+    """Encode an index array as little-endian bytes."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from(payload: bytes) -> array:
+    """Decode an index array from little-endian bytes."""
+    values = array(_INDEX_TYPE)
+    values.frombytes(payload)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _write_section(f: BinaryIO, payload: bytes) -> None:
+    """Write one length-prefixed section."""
+    f.write(_SECTION.pack(len(payload)))
+    f.write(payload)
+
+
+def _read_sections(data: bytes, offset: int, count: int) -> List[bytes]:
+    """
+    Split the length-prefixed sections that follow the header.
+
+    Raises:
+        ValueError: If a section runs past the end of the file
+    """
+    sections = []
+    for _ in range(count):
+        if offset + _SECTION.size > len(data):
+            raise ValueError("Truncated snapshot")
+        (length,) = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        if offset + length > len(data):
+            raise ValueError("Truncated snapshot")
+        sections.append(data[offset : offset + length])
+        offset += length
+    return sections
@@ -0,0 +1,401 @@
+"""
+SQLite Repository module
+Car storage in an SQLite database, queried on demand instead of held in memory
+"""
+
+import json
+import queue
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .agency import STAT_FIELDS
+from .car import Car
+from .repository import CarRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cars (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    registration TEXT NOT NULL UNIQUE,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    availability INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_cars_availability ON cars (availability);
+CREATE INDEX IF NOT EXISTS idx_cars_year ON cars (year);
+-- Brand and model filters are case-insensitive
+DROP INDEX IF EXISTS idx_cars_brand;
+CREATE INDEX IF NOT EXISTS idx_cars_brand_nocase ON cars (brand COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_cars_model_nocase ON cars (model COLLATE NOCASE);
+
+-- Running counts kept by the triggers below; field '' holds the fleet totals
+CREATE TABLE IF NOT EXISTS car_stats (
+    field TEXT NOT NULL,
+    value NOT NULL,
+    total INTEGER NOT NULL,
+    available INTEGER NOT NULL,
+    PRIMARY KEY (field, value)
+);
+CREATE TRIGGER IF NOT EXISTS cars_stats_insert AFTER INSERT ON cars
+BEGIN
+    INSERT INTO car_stats (field, value, total, available)
+    VALUES ('', '', 1, NEW.availability),
+           ('brand', NEW.brand, 1, NEW.availability),
+           ('model', NEW.model, 1, NEW.availability),
+           ('year', NEW.year, 1, NEW.availability)
+    ON CONFLICT (field, value) DO UPDATE SET
+        total = total + excluded.total,
+        available = available + excluded.available;
+END;
+CREATE TRIGGER IF NOT EXISTS cars_stats_delete AFTER DELETE ON cars
+BEGIN
+    UPDATE car_stats
+    SET total = total - 1, available = available - OLD.availability
+    WHERE (field, value) IN (
+        ('', ''), ('brand', OLD.brand), ('model', OLD.model), ('year', OLD.year)
+    );
+    DELETE FROM car_stats
+    WHERE total = 0 AND (field, value) IN (
+        ('brand', OLD.brand), ('model', OLD.model), ('year', OLD.year)
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS cars_stats_update AFTER UPDATE OF availability ON cars
+WHEN NEW.availability != OLD.availability
+BEGIN
+    UPDATE car_stats
+    SET available = available + NEW.availability - OLD.availability
+    WHERE (field, value) IN (
+        ('', ''), ('brand', NEW.brand), ('model', NEW.model), ('year', NEW.year)
+    );
+END;
+
+-- Single-row change counter, so every process sharing the file sees changes
+CREATE TABLE IF NOT EXISTS fleet_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO fleet_version (id, version) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS cars_version_insert AFTER INSERT ON cars
+BEGIN
+    UPDATE fleet_version SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cars_version_delete AFTER DELETE ON cars
+BEGIN
+    UPDATE fleet_version SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cars_version_update AFTER UPDATE ON cars
+BEGIN
+    UPDATE fleet_version SET version = version + 1;
+END;
+"""
+
+# Fills car_stats for databases created before it existed
+REBUILD_STATS = """
+INSERT INTO car_stats (field, value, total, available)
+SELECT '', '', COUNT(*), COALESCE(SUM(availability), 0) FROM cars
+UNION ALL
+SELECT 'brand', brand, COUNT(*), SUM(availability) FROM cars GROUP BY brand
+UNION ALL
+SELECT 'model', model, COUNT(*), SUM(availability) FROM cars GROUP BY model
+UNION ALL
+SELECT 'year', year, COUNT(*), SUM(availability) FROM cars GROUP BY year
+"""
+
+# Statements are constant strings so sqlite3 reuses each prepared statement
+# from the per-connection cache instead of re-parsing the SQL
+COLUMNS = "brand, model, year, registration, availability"
+SELECT_ONE = f"SELECT {COLUMNS} FROM cars WHERE registration = ?"
+SELECT_ALL = f"SELECT {COLUMNS} FROM cars ORDER BY id"
+SELECT_AVAILABLE = f"SELECT {COLUMNS} FROM cars WHERE availability = 1 ORDER BY id"
+# Filter conditions for find(); each combination yields one fixed statement
+FILTERS = (
+    ("brand", "brand = ? COLLATE NOCASE"),
+    ("model", "model = ? COLLATE NOCASE"),
+    ("year_min", "year >= ?"),
+    ("year_max", "year <= ?"),
+    ("available", "availability = ?"),
+)
+PAGE_FILTERS = (("after", "registration > ?"), *FILTERS)
+COUNTS = "SELECT total, available FROM car_stats WHERE field = '' AND value = ''"
+VERSION = "SELECT version FROM fleet_version"
+BREAKDOWNS = "SELECT field, value, total, available FROM car_stats WHERE field != ''"
+INSERT = (
+    "INSERT OR IGNORE INTO cars (brand, model, year, registration, availability) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SET_AVAILABILITY = (
+    "UPDATE cars SET availability = ? WHERE registration = ? AND availability = ?"
+)
+DELETE = "DELETE FROM cars WHERE registration = ?"
+
+
+def _row_to_car(row: tuple) -> Car:
+    """Build a Car object from a result row in COLUMNS order."""
+    brand, model, year, registration, availability = row
+    car = Car(brand, model, year, registration)
+    car.availability = bool(availability)
+    return car
+
+
+class SqliteCarRepository(CarRepository):
+    """Stores cars in an SQLite database in WAL mode."""
+
+    def __init__(
+        self,
+        db_file: str = "data/cars.db",
+        seed_file: Optional[str] = None,
+        busy_timeout: float = 5.0,
+        pool_size: int = 8,
+    ):
+        """
+        Initialize the SqliteCarRepository.
+
+        Args:
+            db_file (str): Path to the SQLite database file
+            seed_file (Optional[str]): JSON data file imported into an empty
+                database on load
+            busy_timeout (float): Seconds to wait for another writer's lock
+            pool_size (int): Idle connections kept open for reuse
+        """
+        self.db_file = Path(db_file)
+        self.seed_file = Path(seed_file) if seed_file else None
+        self.busy_timeout = busy_timeout
+        # Idle connections; each is used by one thread at a time
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    def load(self) -> tuple[bool, Optional[str]]:
+        """
+        Create the schema, seeding an empty database from the JSON data file.
+
+        Returns:
+            tuple[bool, Optional[str]]: (success, error_message)
+        """
+        try:
+            with self._connection() as conn:
+                conn.executescript(SCHEMA)
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    stats = conn.execute("SELECT 1 FROM car_stats LIMIT 1")
+                    if stats.fetchone() is None:
+                        conn.execute(REBUILD_STATS)
+
+            if self.seed_file is not None and self.seed_file.exists():
+                total, _ = self.counts()
+                if total == 0:
+                    with open(self.seed_file, "r") as f:
+                        data = json.load(f)
+                    with self._connection() as conn, conn:
+                        conn.executemany(
+                            INSERT,
+                            (
+                                (
+                                    car_data["brand"],
+                                    car_data["model"],
+                                    car_data["year"],
+                                    car_data["registration"].upper(),
+                                    int(car_data.get("availability", True)),
+                                )
+                                for car_data in data.get("cars", [])
+                            ),
+                        )
+
+            return True, None
+        except json.JSONDecodeError as e:
+            return False, f"Invalid JSON format: {str(e)}"
+        except Exception as e:
+            return False, f"Error loading data: {str(e)}"
+
+    def save(self) -> tuple[bool, Optional[str]]:
+        """Every change is committed as it happens, so there is nothing to save."""
+        return True, None
+
+    def get(self, registration: str) -> Optional[Car]:
+        """Look up a car by registration number."""
+        with self._connection() as conn:
+            row = conn.execute(SELECT_ONE, (registration.upper(),)).fetchone()
+        return _row_to_car(row) if row else None
+
+    def all(self) -> List[Car]:
+        """Get every car in the fleet."""
+        with self._connection() as conn:
+            return [_row_to_car(row) for row in conn.execute(SELECT_ALL)]
+
+    def available(self) -> List[Car]:
+        """Get every available car, using the availability index."""
+        with self._connection() as conn:
+            return [_row_to_car(row) for row in conn.execute(SELECT_AVAILABLE)]
+
+    def find(
+        self,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Select the matching cars, letting SQLite pick the best index."""
+        values = {
+            "brand": brand,
+            "model": model,
+            "year_min": year_min,
+            "year_max": year_max,
+            "available": None if available is None else int(available),
+        }
+        conditions = [sql for name, sql in FILTERS if values[name] is not None]
+        params = [values[name] for name, _ in FILTERS if values[name] is not None]
+
+        query = f"SELECT {COLUMNS} FROM cars"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+
+        with self._connection() as conn:
+            return [_row_to_car(row) for row in conn.execute(query, params)]
+
+    def find_page(
+        self,
+        after: Optional[str],
+        limit: int,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        available: Optional[bool] = None,
+    ) -> List[Car]:
+        """Select one page in registration order, seeking via the unique index."""
+        values = {
+            "after": None if after is None else after.upper(),
+            "brand": brand,
+            "model": model,
+            "year_min": year_min,
+            "year_max": year_max,
+            "available": None if available is None else int(available),
+        }
+        conditions = [sql for name, sql in PAGE_FILTERS if values[name] is not None]
+        params = [values[name] for name, _ in PAGE_FILTERS if values[name] is not None]
+
+        query = f"SELECT {COLUMNS} FROM cars"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY registration LIMIT ?"
+
+        with self._connection() as conn:
+            return [_row_to_car(row) for row in conn.execute(query, [*params, limit])]
+
+    def counts(self) -> tuple[int, int]:
+        """Read the fleet totals kept up to date by triggers."""
+        with self._connection() as conn:
+            row = conn.execute(COUNTS).fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def breakdowns(self) -> Dict[str, Dict[Any, tuple[int, int]]]:
+        """Read the per-field counts kept up to date by triggers."""
+        result: Dict[str, Dict[Any, tuple[int, int]]] = {
+            field: {} for field in STAT_FIELDS
+        }
+        with self._connection() as conn:
+            for field, value, total, available in conn.execute(BREAKDOWNS):
+                result[field][value] = (total, available)
+        return result
+
+    def version(self) -> int:
+        """Read the change counter maintained by triggers."""
+        with self._connection() as conn:
+            (version,) = conn.execute(VERSION).fetchone()
+        return version
+
+    def add(self, car: Car) -> bool:
+        """Insert a car unless its registration is already taken."""
+        with self._connection() as conn, conn:
+            cursor = conn.execute(
+                INSERT,
+                (
+                    car.brand,
+                    car.model,
+                    car.year,
+                    car.registration.upper(),
+                    int(car.availability),
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def set_availability(self, registration: str, availability: bool) -> Optional[Car]:
+        """Rent or return a car with a conditional update, safe across processes."""
+        registration = registration.upper()
+        with self._connection() as conn, conn:
+            cursor = conn.execute(
+                SET_AVAILABILITY,
+                (int(availability), registration, int(not availability)),
+            )
+            if cursor.rowcount != 1:
+                return None
+            # Still inside the write transaction, so this reads our own update
+            row = conn.execute(SELECT_ONE, (registration,)).fetchone()
+        return _row_to_car(row)
+
+    def remove(self, registration: str) -> Optional[Car]:
+        """Delete a car, returning what was deleted."""
+        registration = registration.upper()
+        with self._connection() as conn, conn:
+            # Take the write lock first so the row cannot change before deletion
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(SELECT_ONE, (registration,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(DELETE, (registration,))
+        return _row_to_car(row)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection for the duration of a with-block.
+
+        Yields:
+            sqlite3.Connection: A connection configured for WAL mode
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        Open a new connection to the database.
+
+        Returns:
+            sqlite3.Connection: A connection configured for WAL mode
+        """
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=self.busy_timeout,
+            cached_statements=64,
+            # Pooled connections move between request threads, one at a time
+            check_same_thread=False,
+        )
+        # WAL lets readers run alongside the single writer; with NORMAL
+        # synchronous a power cut may drop the last commits, never corrupt
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
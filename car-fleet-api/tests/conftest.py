@@ -0,0 +1,111 @@
+"""
+Shared fixtures for the car-fleet-api tests
+"""
+
+import json
+import sys
+
+import pytest
+from fakeredis import FakeRedis, FakeServer
+
+from app import create_app
+from src import (
+    Agency,
+    CarsRentalService,
+    RedisCarRepository,
+    SqliteCarRepository,
+)
+
+# Every storage backend: JSON persistence modes, then the shared stores
+BACKENDS = ("snapshot", "journal", "sqlite", "redis")
+
+SEED_CARS = [
+    {
+        "brand": "Renault",
+        "model": "Clio",
+        "year": 2022,
+        "registration": "AB-123-CD",
+        "availability": True,
+    },
+    {
+        "brand": "Peugeot",
+        "model": "208",
+        "year": 2023,
+        "registration": "EF-456-GH",
+        "availability": True,
+    },
+    {
+        "brand": "Citroën",
+        "model": "C3",
+        "year": 2021,
+        "registration": "IJ-789-KL",
+        "availability": False,
+    },
+]
+
+
+@pytest.fixture
+def open_service(tmp_path):
+    """
+    Open services over one store per backend, closed after the test.
+
+    Services opened for the same backend share its store, as replicas or
+    restarts of one process do.
+
+    Returns:
+        Callable: Given a backend from BACKENDS and CarsRentalService
+            arguments, returns a loaded service
+    """
+    redis_server = FakeServer()
+    # fakeredis creates a database on first use without a lock, so threads
+    # racing to use it first can end up with one each; create it up front
+    FakeRedis(server=redis_server).dbsize()
+    services = []
+
+    def open_(backend, **kwargs):
+        repository = None
+        if backend == "sqlite":
+            repository = SqliteCarRepository(str(tmp_path / "cars.db"))
+        elif backend == "redis":
+            redis = FakeRedis(server=redis_server, decode_responses=True)
+            repository = RedisCarRepository(redis)
+
+        service = CarsRentalService(
+            Agency("Test Rental"),
+            data_file=str(tmp_path / "cars.json"),
+            persistence="journal" if backend == "journal" else "snapshot",
+            repository=repository,
+            **kwargs,
+        )
+        service.load_from_json()  # A new store starts empty
+        services.append(service)
+        return service
+
+    yield open_
+    for service in services:
+        service.close()
+
+
+@pytest.fixture
+def fast_thread_switching():
+    """Switch threads as often as possible to widen any check-then-act window."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """A JSON data file holding SEED_CARS."""
+    path = tmp_path / "cars.json"
+    path.write_text(json.dumps({"cars": SEED_CARS}))
+    return path
+
+
+@pytest.fixture
+def client(data_file):
+    """A Flask test client for an app serving SEED_CARS from the JSON store."""
+    app = create_app({"DATA_FILE": str(data_file), "LOG_LEVEL": "WARNING"})
+    yield app.test_client()
+    app.extensions["rental_service"].close()
@@ -0,0 +1,85 @@
+"""
+Group Commit Tests
+
+Concurrent callers share commits, and each is told the outcome of its own.
+"""
+
+import threading
+import time
+
+from src.commit import GroupCommit
+
+
+class TestGroupCommit:
+    """Batching of concurrent commit requests."""
+
+    def test_concurrent_callers_share_commits(self):
+        """A burst of callers costs far fewer commits than callers."""
+        calls = []
+
+        def commit():
+            calls.append(1)
+            time.sleep(0.01)
+            return True, None
+
+        group = GroupCommit(commit)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(group.commit()))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [(True, None)] * 20
+        assert len(calls) < 20
+
+    def test_each_batch_reports_its_own_result(self):
+        """
+        A caller woken late still gets its batch's result, not the next one's.
+
+        The waiter of the first, failing batch only runs again after a second
+        batch has succeeded.
+        """
+        outcomes = iter([(False, "batch 1 failed"), (True, None)])
+
+        def commit():
+            time.sleep(0.05)
+            return next(outcomes)
+
+        class SlowWaker(threading.Condition):
+            """Delays the waiter thread after each wake-up."""
+
+            def wait(self, timeout=None):
+                woken = super().wait(timeout)
+                if threading.current_thread().name == "waiter":
+                    self.release()
+                    time.sleep(0.5)
+                    self.acquire()
+                return woken
+
+        group = GroupCommit(commit, window=0.05)
+        group._cond = SlowWaker()
+        results = {}
+
+        def run():
+            results[threading.current_thread().name] = group.commit()
+
+        first = threading.Thread(target=run, name="first")
+        first.start()
+        time.sleep(0.02)
+        waiter = threading.Thread(target=run, name="waiter")
+        waiter.start()
+        time.sleep(0.2)
+        second = threading.Thread(target=run, name="second")
+        second.start()
+        for thread in (first, waiter, second):
+            thread.join()
+
+        assert results == {
+            "first": (False, "batch 1 failed"),
+            "waiter": (False, "batch 1 failed"),
+            "second": (True, None),
+        }
@@ -0,0 +1,81 @@
+"""
+Concurrency Tests
+
+Threads, and replicas sharing a store, race to rent and return the same cars.
+"""
+
+import threading
+from collections import Counter
+
+import pytest
+from conftest import BACKENDS
+
+THREADS = 16
+CARS = 50
+
+
+def race(services, action, registrations):
+    """
+    Have every thread attempt `action` on every registration.
+
+    Args:
+        services: Services the threads are spread over
+        action: Name of the service method, "rent_car" or "return_car"
+        registrations: Registration numbers of the cars
+
+    Returns:
+        Counter: Successful attempts per registration
+    """
+    successes = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker(index):
+        service = services[index % len(services)]
+        start.wait()
+        for registration in registrations:
+            success, _, _ = getattr(service, action)(registration)
+            if success:
+                with lock:
+                    successes[registration] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return successes
+
+
+@pytest.mark.usefixtures("fast_thread_switching")
+class TestNoDoubleRent:
+    """Each car changes exactly once however many callers race for it."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_each_car_rented_and_returned_once(self, open_service, backend):
+        """Every car is rented by one caller, then returned by one caller."""
+        # The JSON store lives in one process; the others are shared by replicas
+        replicas = 1 if backend in ("snapshot", "journal") else 2
+        services = [open_service(backend) for _ in range(replicas)]
+        registrations = [f"RC-{i:03d}" for i in range(CARS)]
+        for registration in registrations:
+            assert services[0].add_car("Renault", "Clio", 2022, registration)[0]
+
+        for action in ("rent_car", "return_car"):
+            successes = race(services, action, registrations)
+            assert successes == Counter(dict.fromkeys(registrations, 1)), action
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_persisted_fleet_matches_memory(self, open_service, backend):
+        """A restarted service sees the fleet as the racing callers left it."""
+        service = open_service(backend)
+        registrations = [f"RC-{i:03d}" for i in range(CARS)]
+        for registration in registrations:
+            service.add_car("Renault", "Clio", 2022, registration)
+
+        race([service], "rent_car", registrations[::2])
+        expected = service.get_all_cars()
+        service.close()
+
+        assert open_service(backend).get_all_cars() == expected
+        assert open_service(backend).get_fleet_counts() == (CARS, CARS // 2)
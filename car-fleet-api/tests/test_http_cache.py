@@ -0,0 +1,69 @@
+"""
+HTTP Caching Tests
+
+Read responses carry an ETag; a client's cached copy is confirmed with a 304
+until a change makes it stale.
+"""
+
+import pytest
+
+READ_URLS = ["/api/cars", "/api/cars/available", "/api/stats", "/api/cars?limit=2"]
+
+
+class TestConditionalRequests:
+    """ETag and If-None-Match handling on read endpoints."""
+
+    @pytest.mark.parametrize("url", READ_URLS)
+    def test_unchanged_fleet_answers_304(self, client, url):
+        """A request with the current ETag gets an empty 304."""
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.data == b""
+        assert cached.headers["ETag"] == etag
+
+    @pytest.mark.parametrize("url", READ_URLS)
+    def test_write_invalidates_etag(self, client, url):
+        """After a rental, the old ETag no longer matches and the body is new."""
+        response = client.get(url)
+        etag = response.headers["ETag"]
+
+        assert client.put("/api/cars/AB-123-CD/rent").status_code == 200
+
+        fresh = client.get(url, headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.headers["ETag"] != etag
+        assert fresh.data != response.data
+
+    def test_failed_write_keeps_etag(self, client):
+        """A rejected change leaves the fleet, and so the ETag, as it was."""
+        etag = client.get("/api/cars").headers["ETag"]
+
+        assert client.put("/api/cars/IJ-789-KL/rent").status_code == 400
+
+        cached = client.get("/api/cars", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+    def test_same_content_same_etag(self, client):
+        """A rental undone by a return gives back the original ETag."""
+        response = client.get("/api/cars")
+
+        client.put("/api/cars/AB-123-CD/rent")
+        client.put("/api/cars/AB-123-CD/return")
+
+        again = client.get(
+            "/api/cars", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert again.status_code == 304
+
+    def test_cached_body_reflects_write(self, client):
+        """The listing read after a rental shows the car rented."""
+        client.get("/api/cars/available")
+        client.put("/api/cars/AB-123-CD/rent")
+
+        available = client.get("/api/cars/available").get_json()
+        registrations = [car["registration"] for car in available["cars"]]
+        assert registrations == ["EF-456-GH"]
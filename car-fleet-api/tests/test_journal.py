@@ -0,0 +1,94 @@
+"""
+Journal Persistence Tests
+
+Changes are appended to a journal, replayed on load and compacted into the
+data file.
+"""
+
+import json
+
+
+class TestJournalReplay:
+    """A restart rebuilds the fleet from the data file plus the journal."""
+
+    def test_changes_replayed_without_snapshot(self, open_service, tmp_path):
+        """Journalled changes alone rebuild the fleet."""
+        service = open_service("journal")
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+        service.add_car("Peugeot", "208", 2023, "EF-456-GH")
+        service.rent_car("AB-123-CD")
+        service.delete_car("EF-456-GH")
+        service.close()
+
+        assert not (tmp_path / "cars.json").exists()
+        reopened = open_service("journal")
+        assert reopened.get_all_cars() == [
+            {
+                "brand": "Renault",
+                "model": "Clio",
+                "year": 2022,
+                "registration": "AB-123-CD",
+                "availability": False,
+            }
+        ]
+        assert reopened.get_fleet_counts() == (1, 0)
+
+    def test_changes_replayed_on_top_of_snapshot(self, open_service, tmp_path):
+        """Changes journalled after the last snapshot are applied to it."""
+        service = open_service("journal")
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+        assert service.compact() == (True, None)
+        service.rent_car("AB-123-CD")
+        service.close()
+
+        snapshot = json.loads((tmp_path / "cars.json").read_text())
+        assert snapshot["cars"][0]["availability"] is True
+
+        reopened = open_service("journal")
+        assert reopened.find_car_by_registration("AB-123-CD")["availability"] is False
+
+    def test_torn_last_record_skipped(self, open_service, tmp_path):
+        """A record cut short by a crash is ignored; earlier ones still apply."""
+        service = open_service("journal")
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+        service.close()
+        with open(tmp_path / "cars.journal", "a", encoding="utf-8") as f:
+            f.write('{"op":"del","registr')
+
+        reopened = open_service("journal")
+        assert reopened.find_car_by_registration("AB-123-CD") is not None
+
+
+class TestJournalCompaction:
+    """A journal past its threshold is folded into the data file."""
+
+    def test_compaction_writes_snapshot_and_truncates_journal(
+        self, open_service, tmp_path
+    ):
+        """The snapshot holds every change and the journal starts over."""
+        service = open_service("journal", journal_max_records=5)
+        for i in range(12):
+            service.add_car("Renault", "Clio", 2022, f"CP-{i:03d}")
+        service.rent_car("CP-000")
+        expected = service.get_all_cars()
+        service.close()
+
+        snapshot = json.loads((tmp_path / "cars.json").read_text())
+        assert len(snapshot["cars"]) >= 10
+        journal = tmp_path / "cars.journal"
+        assert len(journal.read_text().splitlines()) < 5
+        assert not (tmp_path / "cars.journal.1").exists()
+
+        assert open_service("journal").get_all_cars() == expected
+
+    def test_compaction_threshold_by_size(self, open_service, tmp_path):
+        """The byte threshold triggers compaction as well as the record count."""
+        service = open_service("journal", journal_max_bytes=500)
+        for i in range(10):
+            service.add_car("Renault", "Clio", 2022, f"CP-{i:03d}")
+        service.close()
+
+        assert (tmp_path / "cars.json").exists()
+        journal = tmp_path / "cars.journal"
+        assert not journal.exists() or journal.stat().st_size < 500
+        assert len(open_service("journal").get_all_cars()) == 10
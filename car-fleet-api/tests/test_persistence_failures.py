@@ -0,0 +1,218 @@
+"""
+Persistence Failure Tests
+
+A change that cannot be persisted fails, and leaves the fleet as it is on disk.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+import pytest
+
+from src.service import PERSISTENCE_ERROR
+
+
+def stored_cars(path):
+    """Read the cars of a JSON data file, by registration."""
+    return {car["registration"]: car for car in json.loads(path.read_text())["cars"]}
+
+
+class TestJournalAppendFailure:
+    """A change the journal cannot record is undone."""
+
+    @pytest.fixture
+    def service(self, open_service, monkeypatch):
+        """A journal-mode service whose journal cannot be written."""
+        service = open_service("journal")
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+
+        def append(record):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(service.repository.journal, "append", append)
+        return service
+
+    def test_add_undone(self, service):
+        """A car that could not be journalled is not added."""
+        success, _, error = service.add_car("Peugeot", "208", 2023, "EF-456-GH")
+        assert not success
+        assert error.startswith(PERSISTENCE_ERROR)
+        assert service.find_car_by_registration("EF-456-GH") is None
+        assert service.get_fleet_counts() == (1, 1)
+
+    def test_rent_undone(self, service, monkeypatch):
+        """A rental that could not be journalled is undone, so a retry works."""
+        success, _, error = service.rent_car("AB-123-CD")
+        assert not success
+        assert error.startswith(PERSISTENCE_ERROR)
+        assert service.find_car_by_registration("AB-123-CD")["availability"] is True
+
+        monkeypatch.undo()
+        assert service.rent_car("AB-123-CD")[0]
+
+    def test_delete_undone(self, service):
+        """A car whose deletion could not be journalled is kept."""
+        assert not service.delete_car("AB-123-CD")[0]
+        assert service.find_car_by_registration("AB-123-CD") is not None
+
+    def test_batch_items_failed(self, service):
+        """Every item of a batch reports the failure."""
+        results = service.rent_cars(["AB-123-CD", "NOPE"])
+        assert [result["success"] for result in results] == [False, False]
+        assert results[0]["error"].startswith(PERSISTENCE_ERROR)
+        assert service.get_fleet_counts() == (1, 1)
+
+
+class TestSnapshotWriteFailure:
+    """The changes a failed snapshot held are undone."""
+
+    @pytest.fixture
+    def service(self, open_service):
+        """A snapshot-mode service with one saved car."""
+        service = open_service("snapshot")
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+        return service
+
+    @staticmethod
+    def fail_writes(monkeypatch):
+        """Make renaming a written snapshot into place fail."""
+
+        def replace(src, dst):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(os, "replace", replace)
+
+    def test_rent_undone(self, service, monkeypatch, tmp_path):
+        """A failed rental leaves memory as on disk, so a retry works."""
+        self.fail_writes(monkeypatch)
+        success, _, error = service.rent_car("AB-123-CD")
+        assert not success
+        assert error.startswith(PERSISTENCE_ERROR)
+        assert service.find_car_by_registration("AB-123-CD")["availability"] is True
+        assert service.get_fleet_counts() == (1, 1)
+
+        monkeypatch.undo()
+        assert service.rent_car("AB-123-CD")[0]
+        assert stored_cars(tmp_path / "cars.json")["AB-123-CD"]["availability"] is False
+
+    def test_add_and_delete_undone(self, service, monkeypatch):
+        """Failed additions and deletions are undone too."""
+        self.fail_writes(monkeypatch)
+        assert not service.add_car("Peugeot", "208", 2023, "EF-456-GH")[0]
+        assert not service.delete_car("AB-123-CD")[0]
+        assert service.find_car_by_registration("EF-456-GH") is None
+        assert service.find_car_by_registration("AB-123-CD") is not None
+
+    def test_batch_items_failed(self, service, monkeypatch):
+        """Every changed item of a failed batch is undone and reported failed."""
+        service.add_car("Peugeot", "208", 2023, "EF-456-GH")
+        self.fail_writes(monkeypatch)
+        results = service.rent_cars(["AB-123-CD", "EF-456-GH"])
+        assert not any(result["success"] for result in results)
+        assert service.get_fleet_counts() == (2, 2)
+
+    def test_file_changed_on_disk(self, open_service, tmp_path):
+        """A change refused over an edited file is undone, and the edit loaded."""
+        service = open_service("snapshot", watch_interval=60)
+        service.add_car("Renault", "Clio", 2022, "AB-123-CD")
+        service.add_car("Peugeot", "208", 2023, "EF-456-GH")
+
+        path = tmp_path / "cars.json"
+        time.sleep(0.01)  # So the edit has a new modification time
+        data = json.loads(path.read_text())
+        data["cars"][1]["brand"] = "Changed"
+        path.write_text(json.dumps(data))
+
+        assert not service.rent_car("AB-123-CD")[0]
+        assert service.find_car_by_registration("AB-123-CD")["availability"] is True
+
+        assert service.repository.reload_if_changed() == (True, None)
+        assert service.find_car_by_registration("EF-456-GH")["brand"] == "Changed"
+        assert service.rent_car("AB-123-CD")[0]
+        assert stored_cars(path)["AB-123-CD"]["availability"] is False
+
+    def test_change_held_by_earlier_failed_snapshot(
+        self, service, monkeypatch, tmp_path
+    ):
+        """
+        A change captured by a failed snapshot fails, even though its caller
+        waited for the next, successful commit.
+        """
+        service.add_car("Peugeot", "208", 2023, "EF-456-GH")
+        repository = service.repository
+        write_snapshot = repository._write_snapshot
+        failures = iter([(False, "Error saving data: disk full")])
+        monkeypatch.setattr(
+            repository,
+            "_write_snapshot",
+            lambda data: next(failures, None) or write_snapshot(data),
+        )
+        results = {}
+
+        def rent(registration):
+            results[registration] = service.rent_car(registration)
+
+        first = threading.Thread(target=rent, args=("AB-123-CD",))
+        second = threading.Thread(target=rent, args=("EF-456-GH",))
+        # Holding the write lock stops the first commit before it captures the
+        # fleet, until the second rental has been made in memory
+        with repository._write_lock:
+            first.start()
+            while not repository._committer._leader:
+                time.sleep(0.001)
+            second.start()
+            while repository.get("EF-456-GH").availability:
+                time.sleep(0.001)
+        first.join()
+        second.join()
+
+        assert not results["AB-123-CD"][0]
+        assert not results["EF-456-GH"][0]
+        assert service.get_fleet_counts() == (2, 2)
+        stored = stored_cars(tmp_path / "cars.json")
+        assert [car["availability"] for car in stored.values()] == [True, True]
+
+    @pytest.mark.parametrize("commit_window", [0, 0.002])
+    def test_each_caller_told_its_own_outcome(
+        self, open_service, tmp_path, commit_window
+    ):
+        """
+        Under concurrent changes and random write failures, a change reported
+        successful is on disk and one reported failed is not.
+
+        Callers share commits, so a caller's change may have been held by an
+        earlier snapshot than the one it waited for.
+        """
+        service = open_service("snapshot", commit_window=commit_window)
+        repository = service.repository
+        write_snapshot = repository._write_snapshot
+        chance = random.Random(4)
+
+        def flaky_write(data):
+            time.sleep(0.001)
+            if chance.random() < 0.4:
+                return False, "Error saving data: disk full"
+            return write_snapshot(data)
+
+        repository._write_snapshot = flaky_write
+        added = {}
+
+        def worker(index):
+            for i in range(20):
+                registration = f"FL-{index}-{i:02d}"
+                added[registration] = service.add_car("B", "M", 2020, registration)[0]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        repository._write_snapshot = write_snapshot
+        assert service.save_to_json() == (True, None)
+
+        on_disk = set(stored_cars(tmp_path / "cars.json"))
+        assert {registration for registration, ok in added.items() if ok} == on_disk
+        assert {car["registration"] for car in service.get_all_cars()} == on_disk
@@ -4,30 +4,207 @@ This module contains shared fixtures used across all test modules.
 """
 
 import os
-import time
+import socket
 
 import pytest
+import urllib3
+import yaml
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
-# Global variables (set by test_k8s_e2e.py main)
+from informers import Informer
+from waiters import delete_pod, pod_is_ready, wait_for_pod
+
+# Defaults, overridden by the --k8s-* options (passed by test_k8s_e2e.py)
 NAMESPACE = "test-auto"
 POD_NAME = "nginx-healthcheck"
 POD_YAML_PATH = "nginx-healthcheck.yaml"
 TIMEOUT = 300
 CLUSTER_CONFIG = {}
 
+# Labels on namespaces created for pytest-xdist workers, to find leftovers
+WORKER_LABEL = "k8s-e2e-tests/worker"
+RUN_LABEL = "k8s-e2e-tests/run"
 
-@pytest.fixture(scope="module")
-def k8s_clients():
+# Characters of the pytest-xdist run id that make worker names unique per run
+RUN_ID_LENGTH = 8
+
+# Longest Kubernetes object name (DNS-1123 label)
+MAX_NAME_LENGTH = 63
+
+# API connection pool defaults, overridable per cluster in configs.yml
+POOL_MAXSIZE = 4
+RETRIES = 3
+
+
+def pytest_addoption(parser):
     """
-    Initialize Kubernetes clients.
+    Add the test settings as command line options.
+
+    Options reach pytest-xdist workers too, unlike module globals set by the
+    process that starts pytest.
+    """
+    group = parser.getgroup("k8s", "Kubernetes E2E tests")
+    group.addoption("--k8s-config", help="Path to cluster configuration YAML file")
+    group.addoption("--k8s-cluster", help="Cluster name from the config file")
+    group.addoption("--k8s-namespace", help="Kubernetes namespace for tests")
+    group.addoption("--k8s-pod-name", help="Name of the test pod")
+    group.addoption("--k8s-pod-yaml", help="Path to the pod YAML manifest")
+    group.addoption(
+        "--k8s-timeout", type=int, help="Timeout for pod operations in seconds"
+    )
+
+
+def load_config_from_file(config_file, cluster="local"):
+    """
+    Load cluster configuration from YAML file.
+
+    Args:
+        config_file: Path to the configuration YAML file
+        cluster: Cluster name (local, development, staging, production, ci, custom)
 
     Returns:
-        tuple: (CoreV1Api, AppsV1Api) clients
+        dict: Configuration dictionary or None if file doesn't exist
+    """
+    if not os.path.exists(config_file):
+        return None
+
+    try:
+        with open(config_file, "r") as f:
+            all_configs = yaml.safe_load(f)
+
+        if cluster not in all_configs:
+            print(f"Warning: Cluster '{cluster}' not found in {config_file}")
+            print(f"Available clusters: {', '.join(all_configs.keys())}")
+            return None
+
+        return all_configs[cluster]
+    except Exception as e:
+        print(f"Error loading config file {config_file}: {e}")
+        return None
+
+
+def worker_name(name, run_id, worker_id):
+    """
+    Make a name unique to a pytest-xdist worker of one run.
+
+    Args:
+        name: Base namespace or pod name
+        run_id: Id of the test run, shared by its workers
+        worker_id: Worker id, e.g. "gw0"
+
+    Returns:
+        str: The name with the run and worker ids appended, within the
+            length limit
+    """
+    suffix = f"-{run_id[:RUN_ID_LENGTH]}-{worker_id}"
+    return name[: MAX_NAME_LENGTH - len(suffix)].rstrip("-") + suffix
+
+
+@pytest.fixture(scope="session")
+def e2e_config(request):
+    """
+    Resolve the test settings from the command line options.
+
+    Under pytest-xdist each worker gets its own namespace and pod name, so
+    workers can deploy and break their pods without affecting each other,
+    or the workers of another run against the same cluster.
+
+    Returns:
+        dict: namespace, pod_name, pod_yaml_path, timeout, cluster_config,
+            and run_id and worker_id (None when not running under pytest-xdist)
     """
-    # Get cluster configuration from global variable
-    cluster_config = globals().get("CLUSTER_CONFIG", {})
+    options = request.config.option
+
+    cluster_config = CLUSTER_CONFIG
+    if options.k8s_cluster:
+        config_file = options.k8s_config or "configs.yml"
+        cluster_config = load_config_from_file(config_file, options.k8s_cluster) or {}
+
+    # The command line overrides the cluster config's timeout
+    if options.k8s_timeout is not None:
+        timeout = options.k8s_timeout
+    else:
+        timeout = cluster_config.get("timeout", TIMEOUT)
+
+    namespace = options.k8s_namespace or NAMESPACE
+    pod_name = options.k8s_pod_name or POD_NAME
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    run_id = os.environ.get("PYTEST_XDIST_TESTRUNUID")
+    if worker_id:
+        namespace = worker_name(namespace, run_id, worker_id)
+        pod_name = worker_name(pod_name, run_id, worker_id)
+
+    return {
+        "namespace": namespace,
+        "pod_name": pod_name,
+        "pod_yaml_path": options.k8s_pod_yaml or POD_YAML_PATH,
+        "timeout": timeout,
+        "cluster_config": cluster_config,
+        "run_id": run_id if worker_id else None,
+        "worker_id": worker_id,
+    }
+
+
+class ClusterConfiguration(client.Configuration):
+    """Client configuration whose configs.yml settings override the kubeconfig."""
+
+    def __init__(self, cluster_config):
+        """
+        Initialize the configuration.
+
+        Args:
+            cluster_config: Cluster configuration from configs.yml
+        """
+        super().__init__()
+        self.cluster_config = cluster_config
+
+    def apply_cluster_settings(self):
+        """Apply the cluster config's api_server, verify_ssl and certificates."""
+        cluster_config = self.cluster_config
+        if cluster_config.get("api_server"):
+            self.host = cluster_config["api_server"]
+        if "verify_ssl" in cluster_config:
+            self.verify_ssl = bool(cluster_config["verify_ssl"])
+        if cluster_config.get("certificate_authority"):
+            self.ssl_ca_cert = os.path.expanduser(
+                cluster_config["certificate_authority"]
+            )
+        if cluster_config.get("client_certificate"):
+            self.cert_file = os.path.expanduser(cluster_config["client_certificate"])
+        if cluster_config.get("client_key"):
+            self.key_file = os.path.expanduser(cluster_config["client_key"])
+
+    def get_api_key_with_prefix(self, identifier, alias=None):
+        """
+        Get the API key, refreshing it first if it expired.
+
+        The kubeconfig loader's refresh hook, run before each request, also
+        re-applies the kubeconfig's host and certificates, so the cluster
+        config's settings are applied again after it.
+        """
+        key = super().get_api_key_with_prefix(identifier, alias)
+        self.apply_cluster_settings()
+        return key
+
+
+def create_api_client(cluster_config):
+    """
+    Create an API client for a cluster, with its own connection pool.
+
+    Settings from the cluster config (api_server, verify_ssl and the
+    certificate paths) override those from the kubeconfig.
+
+    Args:
+        cluster_config: Cluster configuration from configs.yml, or {} to use
+            in-cluster config falling back to the default kubeconfig
+
+    Returns:
+        ApiClient: The client; close it when done
+    """
+    configuration = ClusterConfiguration(cluster_config)
 
     try:
         if cluster_config:
@@ -38,7 +215,7 @@ def k8s_clients():
             if not kubeconfig_path and not context_name:
                 # Use in-cluster config (for CI/CD environments)
                 print("Using in-cluster Kubernetes configuration")
-                config.load_incluster_config()
+                config.load_incluster_config(client_configuration=configuration)
             else:
                 # Load from kubeconfig file
                 kubeconfig_path = (
@@ -49,43 +226,163 @@ def k8s_clients():
                 )
                 if context_name:
                     print(f"Using context: {context_name}")
-                    config.load_kube_config(
-                        config_file=kubeconfig_path, context=context_name
-                    )
-                else:
-                    config.load_kube_config(config_file=kubeconfig_path)
+                config.load_kube_config(
+                    config_file=kubeconfig_path,
+                    context=context_name or None,
+                    client_configuration=configuration,
+                )
         else:
             # No cluster config provided, use default behavior
             try:
-                config.load_incluster_config()
+                config.load_incluster_config(client_configuration=configuration)
                 print("Using in-cluster Kubernetes configuration")
             except config.ConfigException:
-                config.load_kube_config()
+                config.load_kube_config(client_configuration=configuration)
                 print("Using default kubeconfig")
 
     except Exception as e:
         print(f"Error loading Kubernetes configuration: {e}")
         raise
 
-    core_v1 = client.CoreV1Api()
-    apps_v1 = client.AppsV1Api()
+    # Connection settings from configs.yml
+    configuration.apply_cluster_settings()
+    if not configuration.verify_ssl:
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    # Pool tuning: a few reused connections per test process, TCP keep-alive
+    # so idle connections and long watches survive proxies, and retries for
+    # failed connections and transient server errors
+    configuration.connection_pool_maxsize = cluster_config.get(
+        "connection_pool_maxsize", POOL_MAXSIZE
+    )
+    configuration.socket_options = keepalive_socket_options()
+    configuration.retries = Retry(
+        total=cluster_config.get("retries", RETRIES),
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # Once retries run out, return the last reply so the client raises
+        # ApiException with its status, as it does without retries
+        raise_on_status=False,
+    )
+
+    return client.ApiClient(configuration)
+
+
+def keepalive_socket_options():
+    """
+    Socket options for API connections: urllib3's defaults plus TCP keep-alive.
+
+    Returns:
+        list: (level, option, value) tuples
+    """
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Where supported, probe a connection idle for 30s every 10s, 3 times
+    for name, value in (
+        ("TCP_KEEPIDLE", 30),
+        ("TCP_KEEPINTVL", 10),
+        ("TCP_KEEPCNT", 3),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+@pytest.fixture(scope="session")
+def api_client(e2e_config):
+    """
+    Create the API client shared by every test module in the session.
+
+    The kubeconfig is loaded once, and connections (and their TLS sessions)
+    are reused across modules.
+
+    Args:
+        e2e_config: Test settings
+
+    Yields:
+        ApiClient: The shared client
+    """
+    api = create_api_client(e2e_config["cluster_config"])
+    yield api
+    api.close()
+
+
+@pytest.fixture(scope="session")
+def k8s_clients(api_client):
+    """
+    Initialize Kubernetes clients.
+
+    Args:
+        api_client: The shared ApiClient
+
+    Returns:
+        tuple: (CoreV1Api, AppsV1Api) clients
+    """
+    core_v1 = client.CoreV1Api(api_client)
+    apps_v1 = client.AppsV1Api(api_client)
 
     return core_v1, apps_v1
 
 
-@pytest.fixture(scope="module")
-def setup_namespace(k8s_clients):
+@pytest.fixture(scope="session")
+def node_informer(k8s_clients):
+    """
+    Cache the cluster's nodes for read-only assertions.
+
+    Args:
+        k8s_clients: Kubernetes client tuple
+
+    Yields:
+        Informer: The node cache
+    """
+    core_v1, _ = k8s_clients
+    informer = Informer(core_v1.list_node, "nodes")
+    informer.start()
+    yield informer
+    informer.stop()
+
+
+@pytest.fixture(scope="session")
+def pod_informer(k8s_clients, e2e_config):
+    """
+    Cache the pods of the test namespace for read-only assertions.
+
+    Args:
+        k8s_clients: Kubernetes client tuple
+        e2e_config: Test settings
+
+    Yields:
+        Informer: The pod cache
+    """
+    core_v1, _ = k8s_clients
+    informer = Informer(
+        core_v1.list_namespaced_pod, "pods", namespace=e2e_config["namespace"]
+    )
+    informer.start()
+    yield informer
+    informer.stop()
+
+
+@pytest.fixture(scope="session")
+def setup_namespace(k8s_clients, e2e_config):
     """
     Create the test namespace if it doesn't exist.
 
+    A namespace created for a pytest-xdist worker belongs to that run alone,
+    so the worker deletes it, with anything left in it, when its session
+    ends. Other namespaces are kept for later runs.
+
     Args:
         k8s_clients: Kubernetes client tuple
+        e2e_config: Test settings
 
     Yields:
         str: Namespace name
     """
     core_v1, _ = k8s_clients
-    namespace = globals().get("NAMESPACE", "test-auto")
+    namespace = e2e_config["namespace"]
+    worker_id = e2e_config["worker_id"]
+    created = False
 
     # Check if namespace exists
     try:
@@ -94,64 +391,74 @@ def setup_namespace(k8s_clients):
     except ApiException as e:
         if e.status == 404:
             # Create namespace
-            ns = client.V1Namespace(metadata=client.V1ObjectMeta(name=namespace))
+            labels = {}
+            if worker_id:
+                labels[WORKER_LABEL] = worker_id
+                labels[RUN_LABEL] = e2e_config["run_id"]
+            ns = client.V1Namespace(
+                metadata=client.V1ObjectMeta(name=namespace, labels=labels)
+            )
             core_v1.create_namespace(body=ns)
+            created = True
             print(f"Namespace '{namespace}' created")
 
     yield namespace
 
-    # Cleanup is handled in the test_cleanup function
+    if created and worker_id:
+        try:
+            core_v1.delete_namespace(name=namespace)
+            print(f"Namespace '{namespace}' deleted")
+        except ApiException as e:
+            if e.status != 404:
+                print(f"Failed to delete namespace '{namespace}': {e.reason}")
 
 
 @pytest.fixture(scope="module")
-def deploy_pod(k8s_clients, setup_namespace):
+def deploy_pod(k8s_clients, setup_namespace, e2e_config):
     """
     Deploy the test pod from YAML file.
 
     Args:
         k8s_clients: Kubernetes client tuple
         setup_namespace: The namespace to deploy to
+        e2e_config: Test settings
 
     Yields:
-        str: Pod name
+        V1Pod: The pod as created; its UID tells it apart from an earlier pod
+            of the same name still in an informer's cache
     """
-    import yaml
-
     core_v1, _ = k8s_clients
-    namespace = globals().get("NAMESPACE", "test-auto")
-    pod_name = globals().get("POD_NAME", "nginx-healthcheck")
-    pod_yaml_path = globals().get("POD_YAML_PATH", "nginx-healthcheck.yaml")
+    namespace = setup_namespace
+    pod_name = e2e_config["pod_name"]
+    timeout = e2e_config["timeout"]
 
-    # Load pod definition from YAML
-    with open(pod_yaml_path, "r") as f:
+    # Load pod definition from YAML, named for this run
+    with open(e2e_config["pod_yaml_path"], "r") as f:
         pod_manifest = yaml.safe_load(f)
+    pod_manifest.setdefault("metadata", {})
+    pod_manifest["metadata"]["name"] = pod_name
+    pod_manifest["metadata"]["namespace"] = namespace
 
-    # Check if pod already exists and delete it
-    try:
-        core_v1.delete_namespaced_pod(
-            name=pod_name, namespace=namespace, body=client.V1DeleteOptions()
-        )
+    # Check if pod already exists and delete it, waiting until it is gone
+    if delete_pod(core_v1, pod_name, namespace, timeout=timeout):
         print(f"Existing pod '{pod_name}' deleted")
-        time.sleep(10)  # Wait for deletion
-    except ApiException as e:
-        if e.status != 404:
-            raise
 
     # Create the pod
-    core_v1.create_namespaced_pod(namespace=namespace, body=pod_manifest)
+    pod = core_v1.create_namespaced_pod(namespace=namespace, body=pod_manifest)
     print(f"Pod '{pod_name}' created")
 
     # Wait for pod to be ready
-    timeout = globals().get("TIMEOUT", 300)
     wait_for_pod_ready(core_v1, pod_name, namespace, timeout=timeout)
 
-    yield pod_name
+    yield pod
 
 
 def wait_for_pod_ready(core_v1, pod_name, namespace, timeout=300):
     """
     Wait for a pod to be in Ready state.
 
+    Watches the pod, so this returns as soon as it becomes ready.
+
     Args:
         core_v1: CoreV1Api client
         pod_name: Name of the pod
@@ -159,30 +466,18 @@ def wait_for_pod_ready(core_v1, pod_name, namespace, timeout=300):
         timeout: Maximum time to wait in seconds
 
     Returns:
-        bool: True if pod is ready, False otherwise
-    """
-    start_time = time.time()
+        bool: True once the pod is ready
 
-    while time.time() - start_time < timeout:
-        try:
-            pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-
-            if pod.status.phase == "Running":
-                # Check if all containers are ready
-                if pod.status.conditions:
-                    for condition in pod.status.conditions:
-                        if condition.type == "Ready" and condition.status == "True":
-                            print(f"Pod '{pod_name}' is ready")
-                            return True
-
-            time.sleep(2)
-        except ApiException as e:
-            if e.status == 404:
-                print(f"Waiting for pod '{pod_name}' to be created...")
-                time.sleep(2)
-            else:
-                raise
-
-    raise TimeoutError(
-        f"Pod '{pod_name}' did not become ready within {timeout} seconds"
+    Raises:
+        TimeoutError: If the pod is not ready within the timeout
+    """
+    wait_for_pod(
+        core_v1,
+        pod_name,
+        namespace,
+        pod_is_ready,
+        timeout=timeout,
+        description="become ready",
     )
+    print(f"Pod '{pod_name}' is ready")
+    return True
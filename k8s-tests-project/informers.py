@@ -0,0 +1,217 @@
+"""
+Informers for Kubernetes E2E tests.
+Keep a local cache of pods or nodes current with one list-watch, so tests can
+assert against it instead of each reading the objects from the API again.
+"""
+
+import threading
+import time
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError
+
+from waiters import WATCH_TIMEOUT
+
+# Longest a read waits for the cache to show the state it expects
+MAX_STALENESS = 10
+
+# Seconds before retrying a failed watch or list
+RETRY_INTERVAL = 1
+
+# Seconds between lists once the informer has fallen back to polling
+RELIST_INTERVAL = 2
+
+
+class Informer:
+    """
+    A local cache of one kind of object, kept current by a watch.
+
+    The objects are listed once, then watched from the list's
+    resourceVersion, and every event updates the cache. Reads never call the
+    API, unless the cluster forbids watches, in which case each read lists
+    the objects again.
+
+    A read can state the result it expects with `until`. The read then waits
+    up to `timeout` seconds for the watch to deliver that state, so a cache
+    a few events behind the API server does not fail an assertion.
+    """
+
+    def __init__(self, list_func, kind, **list_kwargs):
+        """
+        Initialize the Informer; call start() to fill the cache.
+
+        Args:
+            list_func: API list function, e.g. CoreV1Api.list_node
+            kind: Name of the objects, for messages, e.g. "nodes"
+            **list_kwargs: Arguments for list_func, e.g. namespace
+        """
+        self._list_func = list_func
+        self.kind = kind
+        self._list_kwargs = list_kwargs
+        self._objects = {}
+        self._resource_version = None
+        self._changed = threading.Condition()
+        self._stopped = threading.Event()
+        self._watching = False
+
+    def start(self):
+        """List the objects, then keep them current from a watch thread."""
+        self._relist()
+        self._watching = True
+        thread = threading.Thread(
+            target=self._run, name=f"{self.kind}-informer", daemon=True
+        )
+        thread.start()
+
+    def stop(self):
+        """Stop updating the cache; the watch ends with its current request."""
+        self._stopped.set()
+
+    def get(self, name, until=None, timeout=MAX_STALENESS, uid=None):
+        """
+        Get an object from the cache.
+
+        Args:
+            name: Name of the object
+            until: Predicate the object (or None if absent) is expected to
+                satisfy; the read waits for the cache to catch up with it
+            timeout: Maximum time to wait for `until` in seconds
+            uid: UID of the object expected; an object recreated under the
+                same name has a new UID, so until the cache has seen the new
+                object, the old one reads as absent and the read waits for it
+
+        Returns:
+            The cached object, or None if there is none; if `until` still
+            does not hold after the timeout, the object as last cached
+        """
+        if uid is None:
+            return self._read(lambda objects: objects.get(name), until, timeout)
+
+        def select(objects):
+            obj = objects.get(name)
+            return obj if obj is not None and obj.metadata.uid == uid else None
+
+        # Wait at least for the object to appear
+        return self._read(select, until or (lambda obj: obj is not None), timeout)
+
+    def list(self, until=None, timeout=MAX_STALENESS):
+        """
+        List the objects in the cache.
+
+        Args:
+            until: Predicate the list of objects is expected to satisfy; the
+                read waits for the cache to catch up with it
+            timeout: Maximum time to wait for `until` in seconds
+
+        Returns:
+            list: The cached objects; if `until` still does not hold after
+                the timeout, the objects as last cached
+        """
+        return self._read(lambda objects: list(objects.values()), until, timeout)
+
+    def _read(self, select, until, timeout):
+        """
+        Select from the cache, waiting for `until` to hold.
+
+        Args:
+            select: Called with the objects by name; returns the result
+            until: Predicate for the result, or None to return it at once
+            timeout: Maximum time to wait for `until` in seconds
+
+        Returns:
+            The result of select
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self._watching:
+                self._relist()
+            with self._changed:
+                result = select(self._objects)
+                if until is None or until(result):
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return result
+                if not self._watching:
+                    remaining = min(remaining, RELIST_INTERVAL)
+                self._changed.wait(remaining)
+
+    def _relist(self):
+        """Replace the cache with a fresh list of the objects."""
+        result = self._list_func(**self._list_kwargs)
+        with self._changed:
+            self._objects = {obj.metadata.name: obj for obj in result.items}
+            self._resource_version = result.metadata.resource_version
+            self._changed.notify_all()
+
+    def _run(self):
+        """Apply watch events to the cache until stopped."""
+        try:
+            self._watch_until_stopped()
+        finally:
+            # Whatever ended the watch, reads now list the objects themselves
+            # rather than wait on a cache nothing updates any more
+            with self._changed:
+                self._watching = False
+                self._changed.notify_all()
+
+    def _watch_until_stopped(self):
+        """Run the watch, resuming or relisting after failures, until stopped."""
+        while not self._stopped.is_set():
+            watcher = watch.Watch()
+            try:
+                if self._resource_version is None:
+                    self._relist()
+                for event in watcher.stream(
+                    self._list_func,
+                    resource_version=self._resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=WATCH_TIMEOUT,
+                    _request_timeout=WATCH_TIMEOUT + 5,
+                    **self._list_kwargs,
+                ):
+                    if self._stopped.is_set():
+                        watcher.stop()
+                        break
+                    self._apply(event, watcher.resource_version)
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resourceVersion is too old to resume from
+                    self._resource_version = None
+                    continue
+                if e.status in (403, 405):
+                    print(f"Cannot watch {self.kind} ({e.reason}), listing instead")
+                    return
+                print(f"Watch on {self.kind} failed ({e.reason}), retrying")
+                self._stopped.wait(RETRY_INTERVAL)
+            except HTTPError as e:
+                # Dropped connection; resume from the last version seen
+                print(f"Watch on {self.kind} interrupted ({e}), resuming")
+                self._stopped.wait(RETRY_INTERVAL)
+            except Exception as e:
+                # E.g. an event that cannot be decoded; the cache may have
+                # missed it, so start again from a fresh list
+                print(f"Watch on {self.kind} failed ({e!r}), relisting")
+                self._resource_version = None
+                self._stopped.wait(RETRY_INTERVAL)
+
+    def _apply(self, event, resource_version):
+        """
+        Update the cache from one watch event.
+
+        Args:
+            event: The event from Watch.stream
+            resource_version: The watcher's latest resourceVersion
+        """
+        with self._changed:
+            self._resource_version = resource_version
+            # Bookmarks only move the resourceVersion on
+            if event["type"] == "BOOKMARK":
+                return
+            obj = event["object"]
+            if event["type"] == "DELETED":
+                self._objects.pop(obj.metadata.name, None)
+            else:
+                self._objects[obj.metadata.name] = obj
+            self._changed.notify_all()
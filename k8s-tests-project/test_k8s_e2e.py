@@ -12,11 +12,11 @@ This script performs end-to-end tests on a Kubernetes cluster to verify:
 """
 
 import argparse
-import os
 import sys
 
 import pytest
-import yaml
+
+from conftest import load_config_from_file
 
 # Default Configuration
 DEFAULT_NAMESPACE = "test-auto"
@@ -26,35 +26,6 @@ DEFAULT_TIMEOUT = 300  # 5 minutes timeout for pod operations
 DEFAULT_CONFIG_FILE = "configs.yml"
 
 
-def load_config_from_file(config_file, cluster="local"):
-    """
-    Load cluster configuration from YAML file.
-
-    Args:
-        config_file: Path to the configuration YAML file
-        cluster: Cluster name (local, development, staging, production, ci, custom)
-
-    Returns:
-        dict: Configuration dictionary or None if file doesn't exist
-    """
-    if not os.path.exists(config_file):
-        return None
-
-    try:
-        with open(config_file, "r") as f:
-            all_configs = yaml.safe_load(f)
-
-        if cluster not in all_configs:
-            print(f"Warning: Cluster '{cluster}' not found in {config_file}")
-            print(f"Available clusters: {', '.join(all_configs.keys())}")
-            return None
-
-        return all_configs[cluster]
-    except Exception as e:
-        print(f"Error loading config file {config_file}: {e}")
-        return None
-
-
 def parse_arguments():
     """
     Parse command line arguments.
@@ -84,6 +55,9 @@ Examples:
 
   # Pass additional pytest arguments
   python test_k8s_e2e.py --cluster ci --namespace ci-test --pod-name test -k TestClusterStatus
+
+  # Run test classes in parallel, one namespace per worker
+  python test_k8s_e2e.py --cluster local --namespace test --pod-name nginx --workers 4
         """,
     )
 
@@ -129,6 +103,14 @@ Examples:
         help="Timeout for pod operations in seconds (overrides cluster config)",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default=None,
+        help="Run test classes in parallel on N pytest-xdist workers, or 'auto' "
+        "for one per CPU; each worker gets its own namespace and pod",
+    )
+
     # Parse known args to allow passing remaining args to pytest
     args, pytest_args = parser.parse_known_args()
 
@@ -151,24 +133,13 @@ if __name__ == "__main__":
     else:
         config_source = "default kubeconfig"
 
-    # Set test parameters - update conftest module
-    import conftest
-
-    conftest.NAMESPACE = args.namespace
-    conftest.POD_NAME = args.pod_name
-    conftest.POD_YAML_PATH = args.pod_yaml
-
     # Set timeout from cluster config or command line arg
     if args.timeout is not None:
-        conftest.TIMEOUT = args.timeout
+        timeout = args.timeout
     elif cluster_config and "timeout" in cluster_config:
-        conftest.TIMEOUT = cluster_config["timeout"]
+        timeout = cluster_config["timeout"]
     else:
-        conftest.TIMEOUT = DEFAULT_TIMEOUT
-
-    # Set cluster config
-    if cluster_config:
-        conftest.CLUSTER_CONFIG = cluster_config
+        timeout = DEFAULT_TIMEOUT
 
     # Print configuration
     print("=" * 70)
@@ -180,13 +151,30 @@ if __name__ == "__main__":
         context = cluster_config.get("context", "default")
         print(f"Kubeconfig:     {kubeconfig}")
         print(f"Context:        {context}")
-    print(f"Namespace:      {conftest.NAMESPACE}")
-    print(f"Pod Name:       {conftest.POD_NAME}")
-    print(f"Pod YAML:       {conftest.POD_YAML_PATH}")
-    print(f"Timeout:        {conftest.TIMEOUT}s")
+    print(f"Namespace:      {args.namespace}")
+    print(f"Pod Name:       {args.pod_name}")
+    print(f"Pod YAML:       {args.pod_yaml}")
+    print(f"Timeout:        {timeout}s")
+    if args.workers:
+        print(f"Workers:        {args.workers} (names suffixed with the worker id)")
     print("=" * 70)
     print()
 
+    # Pass the settings as options, so pytest-xdist workers receive them too
+    pytest_cmd = [
+        "tests/",
+        "-v",
+        "-s",
+        f"--k8s-namespace={args.namespace}",
+        f"--k8s-pod-name={args.pod_name}",
+        f"--k8s-pod-yaml={args.pod_yaml}",
+        f"--k8s-timeout={timeout}",
+    ]
+    if cluster_config:
+        pytest_cmd += [f"--k8s-config={args.config}", f"--k8s-cluster={args.cluster}"]
+    if args.workers:
+        # Keep each test class on one worker, so it shares that worker's pod
+        pytest_cmd += ["-n", args.workers, "--dist", "loadscope"]
+
     # Run pytest with tests directory and any additional pytest arguments
-    pytest_cmd = ["tests/", "-v", "-s"] + pytest_args
-    sys.exit(pytest.main(pytest_cmd))
+    sys.exit(pytest.main(pytest_cmd + pytest_args))
@@ -4,55 +4,32 @@ Cleanup Tests
 Tests for cleanup of test resources.
 """
 
-import time
-
 import pytest
-from kubernetes import client
 from kubernetes.client.rest import ApiException
 
-
-# Get global variables from conftest
-def get_namespace():
-    import conftest
-
-    return conftest.NAMESPACE
-
-
-def get_pod_name():
-    import conftest
-
-    return conftest.POD_NAME
+from waiters import delete_pod
 
 
 class TestCleanup:
     """Cleanup test resources."""
 
-    def test_delete_pod(self, k8s_clients):
+    def test_delete_pod(self, k8s_clients, e2e_config):
         """Delete the test pod after all tests."""
         core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        namespace = e2e_config["namespace"]
+        pod_name = e2e_config["pod_name"]
 
         try:
-            core_v1.delete_namespaced_pod(
-                name=pod_name, namespace=namespace, body=client.V1DeleteOptions()
+            # Waits for the DELETED event, so this also verifies the deletion
+            deleted = delete_pod(
+                core_v1, pod_name, namespace, timeout=e2e_config["timeout"]
             )
-            print(f"Pod '{pod_name}' deleted successfully")
-
-            # Wait for pod to be deleted
-            time.sleep(10)
-
-            # Verify deletion
-            try:
-                core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-                pytest.fail(f"Pod '{pod_name}' still exists after deletion")
-            except ApiException as e:
-                if e.status == 404:
-                    print(f"Pod '{pod_name}' deletion confirmed")
-                else:
-                    raise
+        except TimeoutError:
+            pytest.fail(f"Pod '{pod_name}' still exists after deletion")
         except ApiException as e:
-            if e.status == 404:
-                print(f"Pod '{pod_name}' does not exist")
-            else:
-                pytest.fail(f"Failed to delete pod: {e}")
+            pytest.fail(f"Failed to delete pod: {e}")
+
+        if deleted:
+            print(f"Pod '{pod_name}' deleted, deletion confirmed")
+        else:
+            print(f"Pod '{pod_name}' does not exist")
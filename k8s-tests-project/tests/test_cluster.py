@@ -6,6 +6,8 @@ Tests for cluster accessibility and node status.
 
 import pytest
 
+from waiters import node_is_ready
+
 
 class TestClusterStatus:
     """Test cluster accessibility and node status."""
@@ -21,17 +23,17 @@ class TestClusterStatus:
         except Exception as e:
             pytest.fail(f"Failed to access Kubernetes API: {e}")
 
-    def test_nodes_ready(self, k8s_clients):
+    def test_nodes_ready(self, node_informer):
         """Test if cluster nodes are in Ready state."""
-        core_v1, _ = k8s_clients
-
-        nodes = core_v1.list_node()
-        assert len(nodes.items) > 0, "No nodes found in the cluster"
+        nodes = node_informer.list(
+            until=lambda nodes: any(node_is_ready(node) for node in nodes)
+        )
+        assert len(nodes) > 0, "No nodes found in the cluster"
 
         ready_nodes = []
         not_ready_nodes = []
 
-        for node in nodes.items:
+        for node in nodes:
             node_ready = False
             if node.status.conditions:
                 for condition in node.status.conditions:
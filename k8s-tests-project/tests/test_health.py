@@ -6,30 +6,25 @@ Tests for pod health checks (Liveness and Readiness Probes).
 
 import pytest
 
+from waiters import pod_is_ready
 
-# Get global variables from conftest
-def get_namespace():
-    import conftest
 
-    return conftest.NAMESPACE
-
-
-def get_pod_name():
-    import conftest
-
-    return conftest.POD_NAME
+def container_is_ready(pod):
+    """Check whether the pod's first container is ready."""
+    if pod is None or not pod.status or not pod.status.container_statuses:
+        return False
+    return pod.status.container_statuses[0].ready
 
 
 class TestHealthChecks:
     """Test pod health checks (Liveness and Readiness Probes)."""
 
-    def test_pod_has_probes(self, k8s_clients, deploy_pod):
+    def test_pod_has_probes(self, deploy_pod, pod_informer):
         """Test if the pod has Liveness and Readiness Probes configured."""
-        core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        pod_name = deploy_pod.metadata.name
 
-        pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        pod = pod_informer.get(pod_name, uid=deploy_pod.metadata.uid)
+        assert pod is not None, f"Pod '{pod_name}' not found"
 
         # Get the first container
         assert len(pod.spec.containers) > 0, "No containers found in pod"
@@ -43,13 +38,14 @@ class TestHealthChecks:
         assert container.readiness_probe is not None, "Readiness Probe not configured"
         print(f"Readiness Probe configured: {container.readiness_probe.http_get.path}")
 
-    def test_readiness_probe_passes(self, k8s_clients, deploy_pod):
+    def test_readiness_probe_passes(self, deploy_pod, pod_informer):
         """Test if the Readiness Probe passes (Pod is Ready)."""
-        core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        pod_name = deploy_pod.metadata.name
 
-        pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        pod = pod_informer.get(
+            pod_name, uid=deploy_pod.metadata.uid, until=pod_is_ready
+        )
+        assert pod is not None, f"Pod '{pod_name}' not found"
 
         # Check pod conditions
         ready = False
@@ -62,13 +58,14 @@ class TestHealthChecks:
         assert ready, "Readiness Probe is not passing"
         print(f"Readiness Probe is passing - Pod is Ready")
 
-    def test_liveness_probe_working(self, k8s_clients, deploy_pod):
+    def test_liveness_probe_working(self, deploy_pod, pod_informer):
         """Test if the Liveness Probe is working."""
-        core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        pod_name = deploy_pod.metadata.name
 
-        pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        pod = pod_informer.get(
+            pod_name, uid=deploy_pod.metadata.uid, until=container_is_ready
+        )
+        assert pod is not None, f"Pod '{pod_name}' not found"
 
         # Check container status
         assert len(pod.status.container_statuses) > 0, "No container statuses found"
@@ -4,34 +4,20 @@ Liveness Probe Failure Tests
 Tests for automatic pod restart on Liveness Probe failure.
 """
 
-import time
-
+import pytest
+from kubernetes import client
 from kubernetes.stream import stream
 
-
-# Get global variables from conftest
-def get_namespace():
-    import conftest
-
-    return conftest.NAMESPACE
-
-
-def get_pod_name():
-    import conftest
-
-    return conftest.POD_NAME
-
-
-def get_timeout():
-    import conftest
-
-    return conftest.TIMEOUT
+from conftest import create_api_client
+from waiters import restart_count_above, wait_for_pod
 
 
 class TestLivenessProbeFailure:
     """Test automatic pod restart on Liveness Probe failure."""
 
-    def test_simulate_liveness_failure(self, k8s_clients, deploy_pod):
+    def test_simulate_liveness_failure(
+        self, k8s_clients, setup_namespace, deploy_pod, e2e_config
+    ):
         """
         Simulate a Liveness Probe failure and verify automatic restart.
 
@@ -42,19 +28,22 @@ class TestLivenessProbeFailure:
         4. Verifying the restart count increased
         """
         core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        namespace = setup_namespace
+        pod_name = deploy_pod.metadata.name
 
         # Get initial restart count
         pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
         initial_restart_count = pod.status.container_statuses[0].restart_count
         print(f"Initial restart count: {initial_restart_count}")
 
-        # Execute command to stop nginx inside the container
+        # Execute command to stop nginx inside the container. stream() swaps
+        # the client's request method for a websocket one while it runs, so it
+        # gets a client of its own rather than the one the informers share
+        exec_client = create_api_client(e2e_config["cluster_config"])
         try:
             exec_command = ["/bin/sh", "-c", "nginx -s stop"]
             resp = stream(
-                core_v1.connect_get_namespaced_pod_exec,
+                client.CoreV1Api(exec_client).connect_get_namespaced_pod_exec,
                 pod_name,
                 namespace,
                 command=exec_command,
@@ -63,36 +52,34 @@ class TestLivenessProbeFailure:
                 stdout=True,
                 tty=False,
             )
-            print(f"Stopped nginx service to trigger Liveness Probe failure")
-            print(f"Command output: {resp}")
         except Exception as e:
-            print(f"Error stopping nginx: {e}")
-
-        # Wait for Kubernetes to detect the failure and restart the pod
+            pytest.fail(f"Could not stop nginx to fail the Liveness Probe: {e}")
+        finally:
+            exec_client.close()
+        print("Stopped nginx service to trigger Liveness Probe failure")
+        print(f"Command output: {resp}")
+
+        # Wait for Kubernetes to detect the failure and restart the pod: the
+        # probe has to fail (initial delay + period), then the container restarts
         print("Waiting for Kubernetes to detect Liveness Probe failure...")
-        time.sleep(30)  # Wait for probe to fail (initial delay + period)
-
-        # Check if restart count increased
-        max_wait = 60
-        start_time = time.time()
-        restart_detected = False
-
-        while time.time() - start_time < max_wait:
-            pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-            current_restart_count = pod.status.container_statuses[0].restart_count
-
-            if current_restart_count > initial_restart_count:
-                restart_detected = True
-                print(f"Pod restarted! New restart count: {current_restart_count}")
-                break
-
-            time.sleep(5)
-
-        assert restart_detected, "Pod did not restart after Liveness Probe failure"
+        max_wait = 90
+        try:
+            pod = wait_for_pod(
+                core_v1,
+                pod_name,
+                namespace,
+                restart_count_above(initial_restart_count),
+                timeout=max_wait,
+                description="restart",
+            )
+        except TimeoutError:
+            pytest.fail("Pod did not restart after Liveness Probe failure")
+        current_restart_count = pod.status.container_statuses[0].restart_count
+        print(f"Pod restarted! New restart count: {current_restart_count}")
 
         # Wait for pod to be ready again after restart
         from conftest import wait_for_pod_ready
 
-        timeout = get_timeout()
+        timeout = e2e_config["timeout"]
         wait_for_pod_ready(core_v1, pod_name, namespace, timeout=timeout)
         print("Pod is ready again after restart")
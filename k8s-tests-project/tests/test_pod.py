@@ -8,26 +8,13 @@ import pytest
 from kubernetes.client.rest import ApiException
 
 
-# Get global variables from conftest
-def get_namespace():
-    import conftest
-
-    return conftest.NAMESPACE
-
-
-def get_pod_name():
-    import conftest
-
-    return conftest.POD_NAME
-
-
 class TestPodStatus:
     """Test pod status and deployment."""
 
     def test_namespace_exists(self, k8s_clients, setup_namespace):
         """Test if the test namespace exists."""
         core_v1, _ = k8s_clients
-        namespace = get_namespace()
+        namespace = setup_namespace
 
         try:
             ns = core_v1.read_namespace(name=namespace)
@@ -36,28 +23,27 @@ class TestPodStatus:
         except ApiException as e:
             pytest.fail(f"Namespace '{namespace}' does not exist: {e}")
 
-    def test_pod_exists(self, k8s_clients, deploy_pod):
+    def test_pod_exists(self, setup_namespace, deploy_pod, pod_informer):
         """Test if the nginx pod exists in the namespace."""
-        core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        namespace = setup_namespace
+        pod_name = deploy_pod.metadata.name
 
-        pods = core_v1.list_namespaced_pod(namespace=namespace)
-        pod_names = [pod.metadata.name for pod in pods.items]
+        pod = pod_informer.get(pod_name, uid=deploy_pod.metadata.uid)
 
-        assert pod_name in pod_names, (
-            f"Pod '{pod_name}' not found in namespace '{namespace}'"
-        )
+        assert pod is not None, f"Pod '{pod_name}' not found in namespace '{namespace}'"
         print(f"Pod '{pod_name}' exists in namespace '{namespace}'")
 
-    def test_pod_running(self, k8s_clients, deploy_pod):
+    def test_pod_running(self, deploy_pod, pod_informer):
         """Test if the nginx pod is in Running state."""
-        core_v1, _ = k8s_clients
-        namespace = get_namespace()
-        pod_name = get_pod_name()
+        pod_name = deploy_pod.metadata.name
 
-        pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        pod = pod_informer.get(
+            pod_name,
+            uid=deploy_pod.metadata.uid,
+            until=lambda pod: pod is not None and pod.status.phase == "Running",
+        )
 
+        assert pod is not None, f"Pod '{pod_name}' not found"
         assert pod.status.phase == "Running", (
             f"Pod is in {pod.status.phase} state, expected Running"
         )
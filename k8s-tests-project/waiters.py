@@ -0,0 +1,284 @@
+"""
+Waiters for Kubernetes E2E tests.
+Wait for pod conditions with the watch API, returning as soon as the condition
+is met instead of sleeping between polls.
+"""
+
+import time
+
+from kubernetes import client, watch
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError
+
+# Longest single watch request; the waiter resumes from the last
+# resourceVersion when the server ends it
+WATCH_TIMEOUT = 60
+
+# Seconds between reads once the waiter has fallen back to polling: the first
+# retry comes quickly, then the interval doubles up to the maximum
+POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 5
+
+
+def pod_is_ready(pod):
+    """
+    Check whether a pod is Running with its Ready condition True.
+
+    Args:
+        pod: V1Pod, or None if the pod does not exist
+
+    Returns:
+        bool: True if the pod is ready
+    """
+    if pod is None or pod.status is None or pod.status.phase != "Running":
+        return False
+    return any(
+        condition.type == "Ready" and condition.status == "True"
+        for condition in pod.status.conditions or []
+    )
+
+
+def node_is_ready(node):
+    """
+    Check whether a node's Ready condition is True.
+
+    Args:
+        node: V1Node
+
+    Returns:
+        bool: True if the node is ready
+    """
+    return any(
+        condition.type == "Ready" and condition.status == "True"
+        for condition in (node.status and node.status.conditions) or []
+    )
+
+
+def restart_count_above(count):
+    """
+    Build a predicate for a pod whose first container restarted over `count` times.
+
+    Args:
+        count: Restart count to exceed
+
+    Returns:
+        callable: Predicate taking a V1Pod or None
+    """
+
+    def restarted(pod):
+        if pod is None or not pod.status or not pod.status.container_statuses:
+            return False
+        return pod.status.container_statuses[0].restart_count > count
+
+    return restarted
+
+
+def pod_is_gone(uid=None):
+    """
+    Build a predicate for a pod that no longer exists.
+
+    Args:
+        uid: UID of the deleted pod; a pod recreated under the same name has
+            a new UID, so it does not count as the deleted one still existing
+
+    Returns:
+        callable: Predicate taking a V1Pod or None
+    """
+
+    def gone(pod):
+        return pod is None or (uid is not None and pod.metadata.uid != uid)
+
+    return gone
+
+
+def wait_for_pod(
+    core_v1,
+    pod_name,
+    namespace,
+    predicate,
+    timeout=300,
+    description="meet the condition",
+):
+    """
+    Wait until a pod satisfies a predicate.
+
+    The pod is listed once, then watched from the list's resourceVersion, so
+    every change is seen as it happens. Expired watches are re-listed, and if
+    the API refuses watches the waiter polls instead.
+
+    Args:
+        core_v1: CoreV1Api client
+        pod_name: Name of the pod
+        namespace: Namespace of the pod
+        predicate: Called with the V1Pod, or None while the pod does not
+            exist; the wait ends when it returns True
+        timeout: Maximum time to wait in seconds
+        description: What the pod should do, e.g. "become ready", for the
+            timeout message
+
+    Returns:
+        The pod (or None) that satisfied the predicate
+
+    Raises:
+        TimeoutError: If the predicate is not met within the timeout
+    """
+    deadline = time.monotonic() + timeout
+    field_selector = f"metadata.name={pod_name}"
+    resource_version = None
+
+    while time.monotonic() < deadline:
+        if resource_version is None:
+            # List to get the current state and a version to watch from
+            pods = core_v1.list_namespaced_pod(
+                namespace=namespace, field_selector=field_selector
+            )
+            pod = pods.items[0] if pods.items else None
+            if predicate(pod):
+                return pod
+            resource_version = pods.metadata.resource_version
+
+        remaining = deadline - time.monotonic()
+        watch_seconds = max(1, int(min(remaining, WATCH_TIMEOUT)))
+        watcher = watch.Watch()
+        try:
+            for event in watcher.stream(
+                core_v1.list_namespaced_pod,
+                namespace=namespace,
+                field_selector=field_selector,
+                resource_version=resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=watch_seconds,
+                _request_timeout=watch_seconds + 5,
+            ):
+                # The watcher tracks the latest version, bookmarks included;
+                # bookmark objects are left as raw dicts
+                resource_version = watcher.resource_version
+                if event["type"] == "BOOKMARK":
+                    continue
+                pod = None if event["type"] == "DELETED" else event["object"]
+                if predicate(pod):
+                    watcher.stop()
+                    return pod
+        except ApiException as e:
+            if e.status == 410:
+                # Our resourceVersion is too old to resume from
+                resource_version = None
+                continue
+            if e.status in (403, 405):
+                print(f"Cannot watch pods ({e.reason}), polling instead")
+                return _poll_for_pod(
+                    core_v1,
+                    pod_name,
+                    namespace,
+                    predicate,
+                    deadline,
+                    timeout,
+                    description,
+                )
+            raise
+        except HTTPError as e:
+            # Dropped connection; resume from the last version seen
+            print(f"Watch on pod '{pod_name}' interrupted ({e}), resuming")
+
+    raise TimeoutError(
+        f"Pod '{pod_name}' did not {description} within {timeout} seconds"
+    )
+
+
+def _poll_for_pod(
+    core_v1, pod_name, namespace, predicate, deadline, timeout, description
+):
+    """
+    Read a pod until it satisfies a predicate, backing off between reads.
+
+    Args:
+        core_v1: CoreV1Api client
+        pod_name: Name of the pod
+        namespace: Namespace of the pod
+        predicate: As for wait_for_pod
+        deadline: time.monotonic() value to give up at
+        timeout: The whole wait's timeout, for the timeout message
+        description: As for wait_for_pod
+
+    Returns:
+        The pod (or None) that satisfied the predicate
+
+    Raises:
+        TimeoutError: If the predicate is not met by the deadline
+    """
+    interval = POLL_INTERVAL
+    while True:
+        try:
+            pod = core_v1.read_namespaced_pod(name=pod_name, namespace=namespace)
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            pod = None
+        if predicate(pod):
+            return pod
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(
+                f"Pod '{pod_name}' did not {description} within {timeout} seconds"
+            )
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+def delete_pod(
+    core_v1,
+    pod_name,
+    namespace,
+    timeout=300,
+    grace_period_seconds=None,
+    propagation_policy=None,
+):
+    """
+    Delete a pod and wait until it is gone.
+
+    Returns as soon as the API server reports the pod deleted, so the wait
+    takes as long as the deletion does rather than a fixed sleep.
+
+    Args:
+        core_v1: CoreV1Api client
+        pod_name: Name of the pod
+        namespace: Namespace of the pod
+        timeout: Maximum time to wait for the deletion in seconds
+        grace_period_seconds: Seconds the containers get to shut down; None
+            uses the pod's terminationGracePeriodSeconds, 0 deletes at once
+        propagation_policy: "Foreground", "Background" or "Orphan"; with
+            "Foreground" the pod is only removed after its dependents
+
+    Returns:
+        bool: True if the pod was deleted, False if it did not exist
+
+    Raises:
+        TimeoutError: If the pod still exists after the timeout
+    """
+    try:
+        pod = core_v1.delete_namespaced_pod(
+            name=pod_name,
+            namespace=namespace,
+            body=client.V1DeleteOptions(
+                grace_period_seconds=grace_period_seconds,
+                propagation_policy=propagation_policy,
+            ),
+        )
+    except ApiException as e:
+        if e.status == 404:
+            return False
+        raise
+
+    # The response is the pod being deleted; its UID tells it apart from a
+    # pod created later under the same name
+    uid = pod.metadata.uid if pod and pod.metadata else None
+    wait_for_pod(
+        core_v1,
+        pod_name,
+        namespace,
+        pod_is_gone(uid),
+        timeout=timeout,
+        description="disappear",
+    )
+    return True